@@ -0,0 +1,257 @@
+"""
+点击引擎基准测试：在记录或空后端上扫描不同的点击间隔和抖动设置，
+报告实际点击速率、周期误差分布、累积漂移、进程CPU时间和停止延迟，
+并对比每次新建线程（冷启动）与常驻工作线程（热启动）从启动请求到首次点击的延迟。
+
+用法（在项目根目录下运行）:
+    python -m benchmarks.bench_clicker
+    python -m benchmarks.bench_clicker --intervals 1,10,100 --jitter 0,20 --output result.json
+    python -m benchmarks.bench_clicker --baseline old.json
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+from array import array
+
+from core.click_backend import create_backend
+from core.timing_engine import TimingEngine
+from utils.constants import JITTER_DISTRIBUTIONS, DEFAULT_JITTER_DISTRIBUTION
+
+DEFAULT_INTERVALS = "1,2,5,10,20,50,100,200,500,1000"
+DEFAULT_JITTERS = "0,20"
+
+def percentile(sorted_values, fraction):
+    """
+    获取已排序序列的分位数
+
+    参数:
+        sorted_values (list): 升序排列的数值
+        fraction (float): 0到1之间的分位
+
+    返回:
+        float: 分位数，序列为空时返回0
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run_case(interval, jitter_percent, duration, backend_name, min_clicks,
+             distribution=DEFAULT_JITTER_DISTRIBUTION, seed=None):
+    """
+    运行一组基准测试
+
+    参数:
+        interval (int): 点击间隔，单位为毫秒
+        jitter_percent (int): 抖动幅度百分比，0表示不启用抖动
+        duration (float): 最短运行时间，单位为秒
+        backend_name (str): "recording" 或 "null"
+        min_clicks (int): 至少采集的点击数，间隔较长时会相应延长运行时间
+        distribution (str): 抖动分布
+        seed (int): 抖动随机种子
+
+    返回:
+        dict: 测试结果
+    """
+    duration = max(duration, interval / 1000.0 * min_clicks)
+    capacity = int(duration * 1000.0 / interval) + 1000
+    backend = create_backend(backend_name)
+    engine = TimingEngine(interval, jitter_percent > 0, jitter_percent,
+                          jitter_distribution=distribution, jitter_seed=seed)
+
+    # 记录每次点击的实际时间和计划截止时间（点击期间 next_deadline 即为当前认领的截止时间）
+    actual = array('d', bytes(8 * capacity))
+    scheduled = array('d', bytes(8 * capacity))
+    count = [0]
+    clock = time.perf_counter
+    click = backend.click
+
+    def dispatch():
+        i = count[0]
+        if i < capacity:
+            actual[i] = clock()
+            scheduled[i] = engine.next_deadline
+            count[0] = i + 1
+        click("left")
+
+    thread = threading.Thread(target=engine.run, args=(dispatch,), daemon=True)
+    cpu_start = time.process_time()
+    wall_start = clock()
+    thread.start()
+    time.sleep(duration)
+
+    stop_start = clock()
+    engine.stop()
+    thread.join()
+    stop_latency = clock() - stop_start
+    wall = stop_start - wall_start
+    cpu = time.process_time() - cpu_start
+
+    n = count[0]
+    errors = sorted(abs((actual[i] - actual[i - 1]) - (scheduled[i] - scheduled[i - 1])) for i in range(1, n))
+    drift = (actual[n - 1] - actual[0]) - (scheduled[n - 1] - scheduled[0]) if n > 1 else 0.0
+    span = actual[n - 1] - actual[0] if n > 1 else 0.0
+    expected = wall * 1000.0 / interval
+
+    return {
+        "interval_ms": interval,
+        "jitter_percent": jitter_percent,
+        "jitter_distribution": distribution,
+        "jitter_seed": engine.get_jitter_seed(),
+        "duration_s": wall,
+        "clicks": n,
+        "expected_clicks": expected,
+        "clicks_per_sec": (n - 1) / span if span else 0.0,
+        "target_clicks_per_sec": 1000.0 / interval,
+        "period_error_p50_ms": percentile(errors, 0.50) * 1000.0,
+        "period_error_p99_ms": percentile(errors, 0.99) * 1000.0,
+        "period_error_max_ms": (errors[-1] if errors else 0.0) * 1000.0,
+        "cumulative_drift_ms": drift * 1000.0,
+        "skipped": engine.skipped_count,
+        "cpu_time_s": cpu,
+        "cpu_percent": cpu / wall * 100.0 if wall else 0.0,
+        "stop_latency_ms": stop_latency * 1000.0
+    }
+
+def measure_start_latency(trials, backend_name, interval=1000):
+    """
+    测量从启动请求到首次点击的延迟
+
+    参数:
+        trials (int): 启停次数
+        backend_name (str): "recording" 或 "null"
+        interval (int): 点击间隔，单位为毫秒；每次只等待首次点击
+
+    返回:
+        dict: 冷启动与热启动延迟的 p50/p99/max（毫秒）
+    """
+    clock = time.perf_counter
+
+    # 冷启动：每次新建后端、引擎和线程
+    cold = []
+    for _ in range(trials):
+        first_click = threading.Event()
+        requested_at = clock()
+        backend = create_backend(backend_name)
+        engine = TimingEngine(interval)
+        click = backend.click
+
+        def dispatch():
+            click("left")
+            first_click.set()
+
+        thread = threading.Thread(target=engine.run, args=(dispatch,), daemon=True)
+        thread.start()
+        first_click.wait()
+        cold.append(engine.stats.start_latency + (engine.stats.start_time - requested_at))
+        engine.stop()
+        thread.join()
+
+    # 热启动：常驻线程在空闲状态等待 start()
+    warm = []
+    backend = create_backend(backend_name)
+    engine = TimingEngine(interval)
+    first_click = threading.Event()
+    click = backend.click
+
+    def dispatch():
+        click("left")
+        first_click.set()
+
+    thread = threading.Thread(target=engine.serve, args=(dispatch,), daemon=True)
+    thread.start()
+    for _ in range(trials):
+        first_click.clear()
+        engine.start(clock())
+        first_click.wait()
+        warm.append(engine.stats.start_latency)
+        engine.stop()
+    engine.shutdown()
+    thread.join()
+
+    cold.sort()
+    warm.sort()
+    return {
+        "trials": trials,
+        "cold_p50_ms": percentile(cold, 0.50) * 1000.0,
+        "cold_p99_ms": percentile(cold, 0.99) * 1000.0,
+        "cold_max_ms": cold[-1] * 1000.0 if cold else 0.0,
+        "warm_p50_ms": percentile(warm, 0.50) * 1000.0,
+        "warm_p99_ms": percentile(warm, 0.99) * 1000.0,
+        "warm_max_ms": warm[-1] * 1000.0 if warm else 0.0
+    }
+
+def print_results(results, baseline=None):
+    """以表格形式输出结果，提供基准结果时同时输出与其的差异"""
+    previous = {}
+    if baseline:
+        for item in baseline.get("results", []):
+            previous[(item["interval_ms"], item["jitter_percent"])] = item
+
+    header = f"{'间隔ms':>8} {'抖动%':>6} {'CPS':>10} {'目标':>8} {'p50ms':>8} {'p99ms':>8} {'maxms':>8} {'漂移ms':>9} {'CPU%':>6} {'停止ms':>7}"
+    print(header)
+    for r in results:
+        line = (f"{r['interval_ms']:>8} {r['jitter_percent']:>6} {r['clicks_per_sec']:>10.2f} "
+                f"{r['target_clicks_per_sec']:>8.1f} {r['period_error_p50_ms']:>8.3f} "
+                f"{r['period_error_p99_ms']:>8.3f} {r['period_error_max_ms']:>8.3f} "
+                f"{r['cumulative_drift_ms']:>9.3f} {r['cpu_percent']:>6.1f} {r['stop_latency_ms']:>7.3f}")
+        old = previous.get((r["interval_ms"], r["jitter_percent"]))
+        if old:
+            line += (f"  ΔCPS {r['clicks_per_sec'] - old['clicks_per_sec']:+.2f}"
+                     f"  Δp99 {r['period_error_p99_ms'] - old['period_error_p99_ms']:+.3f}ms")
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="点击引擎基准测试")
+    parser.add_argument("--intervals", default=DEFAULT_INTERVALS, help="逗号分隔的点击间隔（毫秒）")
+    parser.add_argument("--jitter", default=DEFAULT_JITTERS, help="逗号分隔的抖动幅度百分比，0表示不启用")
+    parser.add_argument("--duration", type=float, default=2.0, help="每组测试的最短运行时间（秒）")
+    parser.add_argument("--distribution", choices=JITTER_DISTRIBUTIONS, default=DEFAULT_JITTER_DISTRIBUTION, help="抖动分布")
+    parser.add_argument("--seed", type=int, help="抖动随机种子，用于复现")
+    parser.add_argument("--min-clicks", type=int, default=20, help="每组测试至少采集的点击数")
+    parser.add_argument("--backend", choices=("recording", "null"), default="recording", help="点击后端")
+    parser.add_argument("--start-trials", type=int, default=50, help="启动延迟测试的启停次数，0表示跳过")
+    parser.add_argument("--output", default="bench_clicker.json", help="JSON结果输出路径")
+    parser.add_argument("--baseline", help="用于对比的历史JSON结果")
+    args = parser.parse_args(argv)
+
+    intervals = [int(v) for v in args.intervals.split(",") if v.strip()]
+    jitters = [int(v) for v in args.jitter.split(",") if v.strip()]
+
+    results = []
+    for interval in intervals:
+        for jitter in jitters:
+            results.append(run_case(interval, jitter, args.duration, args.backend, args.min_clicks,
+                                    args.distribution, args.seed))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    start_latency = None
+    if args.start_trials > 0:
+        start_latency = measure_start_latency(args.start_trials, args.backend)
+        print(f"启动到首次点击: 冷启动 p50 {start_latency['cold_p50_ms']:.3f}ms p99 {start_latency['cold_p99_ms']:.3f}ms, "
+              f"热启动 p50 {start_latency['warm_p50_ms']:.3f}ms p99 {start_latency['warm_p99_ms']:.3f}ms")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "backend": args.backend
+        },
+        "results": results,
+        "start_latency": start_latency
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入: {args.output}")
+
+if __name__ == "__main__":
+    main()
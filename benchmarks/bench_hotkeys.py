@@ -0,0 +1,251 @@
+"""
+热键匹配基准测试：在不同数量的热键绑定下向注册表输入模拟的键盘事件流，
+报告每秒可处理的事件数，并与逐个热键检查 all(k in pressed_keys) 的旧匹配方式对比；
+同时测量自动点击产生的点击在鼠标钩子回调中消耗的CPU时间。
+
+用法（在项目根目录下运行）:
+    python -m benchmarks.bench_hotkeys
+    python -m benchmarks.bench_hotkeys --bindings 1,10,100,1000 --events 200000 --output result.json
+    python -m benchmarks.bench_hotkeys --cps 100,1000
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+from core.hotkey_registry import HotkeyRegistry
+from core.input_hub import InputHub, SyntheticTracker, MOUSE_CLICK
+
+DEFAULT_BINDINGS = "1,8,64,512"
+DEFAULT_CPS = "100,1000"
+MODIFIER_PREFIXES = ("", "Ctrl+", "Shift+", "Alt+", "Ctrl+Shift+", "Ctrl+Alt+", "Shift+Alt+", "Ctrl+Shift+Alt+")
+MODIFIER_KEYS = {"Ctrl+": Key.ctrl_l, "Shift+": Key.shift_l, "Alt+": Key.alt_l}
+FIRST_TRIGGER_VK = 2000  # 热键触发键使用的虚拟键码，不与普通字符键冲突
+
+class LegacyMatcher:
+    """旧的匹配方式：按下集合保存按键名称，每个事件检查每个热键的所有按键"""
+
+    def __init__(self, registry, hotkeys):
+        self.registry = registry
+        self.hotkeys = [(action, registry.parse_hotkey(hotkey)) for action, hotkey in hotkeys.items()]
+        self.pressed_keys = set()
+
+    def press(self, key):
+        key_str = self.registry.normalize_key(key)
+        self.pressed_keys.add(key_str)
+        for action, keys in self.hotkeys:
+            if all(k in self.pressed_keys for k in keys):
+                self.pressed_keys.remove(key_str)
+                return action
+        return None
+
+    def release(self, key):
+        key_str = self.registry.normalize_key(key)
+        if key_str in self.pressed_keys:
+            self.pressed_keys.remove(key_str)
+
+def make_hotkeys(count):
+    """生成指定数量的热键绑定，触发键按修饰键组合分组"""
+    hotkeys = {}
+    for i in range(count):
+        prefix = MODIFIER_PREFIXES[i % len(MODIFIER_PREFIXES)]
+        vk = FIRST_TRIGGER_VK + i // len(MODIFIER_PREFIXES)
+        hotkeys[f"action_{i}"] = f"{prefix}KeyCode({vk})"
+    return hotkeys
+
+def make_events(hotkeys, count, chord_fraction, seed):
+    """
+    生成事件流：大部分为普通字符键的按下和松开，少部分为完整的热键组合
+
+    返回:
+        list: (是否按下, 按键对象)
+    """
+    rng = random.Random(seed)
+    letters = [KeyCode.from_char(c) for c in "abcdefghijklmnopqrstuvwxyz0123456789"]
+    chords = []
+    for hotkey in hotkeys.values():
+        prefix, _, trigger = hotkey.rpartition("+")
+        modifiers = [MODIFIER_KEYS[part + "+"] for part in prefix.split("+") if part]
+        vk = int(trigger[len("KeyCode("):-1])
+        chords.append((modifiers, KeyCode.from_vk(vk)))
+
+    events = []
+    while len(events) < count:
+        if rng.random() < chord_fraction:
+            modifiers, trigger = rng.choice(chords)
+            keys = modifiers + [trigger]
+            events.extend((True, key) for key in keys)
+            events.extend((False, key) for key in reversed(keys))
+        else:
+            key = rng.choice(letters)
+            events.append((True, key))
+            events.append((False, key))
+    return events[:count]
+
+def run_matcher(matcher, events):
+    """
+    向匹配器输入事件流
+
+    返回:
+        tuple: (每秒事件数, 触发次数)
+    """
+    press = matcher.press
+    release = matcher.release
+    fired = 0
+    start = time.perf_counter()
+    for pressed, key in events:
+        if pressed:
+            if press(key) is not None:
+                fired += 1
+        else:
+            release(key)
+    elapsed = time.perf_counter() - start
+    return len(events) / elapsed if elapsed else 0.0, fired
+
+def run_case(count, events_count, chord_fraction, seed, legacy):
+    """
+    运行一组基准测试
+
+    参数:
+        count (int): 热键绑定数
+        events_count (int): 事件数
+        chord_fraction (float): 热键组合在事件流中所占的比例
+        seed (int): 事件流随机种子
+        legacy (bool): 是否同时测试旧的匹配方式
+
+    返回:
+        dict: 测试结果
+    """
+    hotkeys = make_hotkeys(count)
+    events = make_events(hotkeys, events_count, chord_fraction, seed)
+
+    registry = HotkeyRegistry()
+    for action, hotkey in hotkeys.items():
+        registry.bind(action, hotkey)
+    # 预热：首次出现的按键需要解析并缓存
+    run_matcher(registry, events[:1000])
+    events_per_sec, fired = run_matcher(registry, events)
+
+    result = {
+        "bindings": count,
+        "events": len(events),
+        "events_per_sec": events_per_sec,
+        "ns_per_event": 1e9 / events_per_sec if events_per_sec else 0.0,
+        "fired": fired
+    }
+    if legacy:
+        legacy_eps, legacy_fired = run_matcher(LegacyMatcher(registry, hotkeys), events)
+        result["legacy_events_per_sec"] = legacy_eps
+        result["legacy_fired"] = legacy_fired
+        result["speedup"] = events_per_sec / legacy_eps if legacy_eps else 0.0
+    return result
+
+def measure_synthetic_clicks(clicks):
+    """
+    测量每次自动点击（按下和松开两个事件）在鼠标钩子回调中消耗的CPU时间
+
+    钩子回调直接调用，不经过系统钩子，因此只包含Python回调本身的开销。
+
+    参数:
+        clicks (int): 点击次数
+
+    返回:
+        dict: 各种情况下每次点击的CPU时间（微秒）
+    """
+    def cpu_per_click(hub, backend_tracker):
+        on_click = hub.on_click
+        button = Button.left
+        start = time.thread_time()
+        for _ in range(clicks):
+            if backend_tracker is not None:
+                backend_tracker.expect("left", True)
+                backend_tracker.expect("left", False)
+            on_click(0, 0, button, True)
+            on_click(0, 0, button, False)
+        return (time.thread_time() - start) / clicks * 1e6
+
+    def make_hub(matcher, tracker):
+        hub = InputHub()
+        hub.synthetic = tracker
+        hub.subscribe(MOUSE_CLICK, lambda x, y, b, p: matcher.press(b) if p else matcher.release(b))
+        return hub
+
+    registry = HotkeyRegistry()
+    registry.bind("toggle", "F6")
+    registry.bind("macro_record", "mouse_middle")
+    legacy = LegacyMatcher(registry, registry.get_bindings())
+
+    # 旧方式：每个合成点击都经过 normalize_key 和集合修改
+    legacy_us = cpu_per_click(make_hub(legacy, None), None)
+    # 不过滤合成点击，只使用索引匹配
+    unfiltered_us = cpu_per_click(make_hub(registry, None), None)
+    # 后端登记、钩子抵消：合成点击在分发给订阅者之前丢弃（包含后端登记的开销）
+    tracker = SyntheticTracker()
+    tracker.set_enabled(True)
+    filtered_us = cpu_per_click(make_hub(registry, tracker), tracker)
+    return {
+        "clicks": clicks,
+        "legacy_us_per_click": legacy_us,
+        "unfiltered_us_per_click": unfiltered_us,
+        "filtered_us_per_click": filtered_us,
+        # 没有热键使用鼠标按钮时不安装鼠标钩子，回调开销为0
+        "no_mouse_binding_us_per_click": 0.0
+    }
+
+def print_results(results):
+    """以表格形式输出结果"""
+    print(f"{'热键数':>8} {'事件/秒':>12} {'ns/事件':>9} {'触发':>7} {'旧方式事件/秒':>14} {'加速':>7}")
+    for r in results:
+        line = f"{r['bindings']:>8} {r['events_per_sec']:>12.0f} {r['ns_per_event']:>9.0f} {r['fired']:>7}"
+        if "legacy_events_per_sec" in r:
+            line += f" {r['legacy_events_per_sec']:>14.0f} {r['speedup']:>6.1f}x"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="热键匹配基准测试")
+    parser.add_argument("--bindings", default=DEFAULT_BINDINGS, help="逗号分隔的热键绑定数")
+    parser.add_argument("--events", type=int, default=200000, help="每组测试的事件数")
+    parser.add_argument("--chord-fraction", type=float, default=0.1, help="热键组合在事件流中所占的比例")
+    parser.add_argument("--seed", type=int, default=1, help="事件流随机种子")
+    parser.add_argument("--no-legacy", action="store_true", help="不测试旧的匹配方式")
+    parser.add_argument("--cps", default=DEFAULT_CPS, help="逗号分隔的点击速率，用于换算合成点击的回调CPU占用")
+    parser.add_argument("--synthetic-clicks", type=int, default=100000, help="合成点击测试的点击次数，0表示跳过")
+    parser.add_argument("--output", default="bench_hotkeys.json", help="JSON结果输出路径")
+    args = parser.parse_args(argv)
+
+    counts = [int(v) for v in args.bindings.split(",") if v.strip()]
+    results = [run_case(count, args.events, args.chord_fraction, args.seed, not args.no_legacy) for count in counts]
+    print_results(results)
+
+    synthetic = None
+    if args.synthetic_clicks > 0:
+        synthetic = measure_synthetic_clicks(args.synthetic_clicks)
+        synthetic["cpu_percent"] = {}
+        print(f"{'每秒点击':>8} {'旧方式CPU%':>11} {'不过滤CPU%':>11} {'过滤CPU%':>10} {'无鼠标热键':>10}")
+        for cps in (int(v) for v in args.cps.split(",") if v.strip()):
+            usage = {key: synthetic[key + "_us_per_click"] * cps / 1e4
+                     for key in ("legacy", "unfiltered", "filtered", "no_mouse_binding")}
+            synthetic["cpu_percent"][cps] = usage
+            print(f"{cps:>8} {usage['legacy']:>11.3f} {usage['unfiltered']:>11.3f} "
+                  f"{usage['filtered']:>10.3f} {usage['no_mouse_binding']:>10.3f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform()
+        },
+        "results": results,
+        "synthetic_clicks": synthetic
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入: {args.output}")
+
+if __name__ == "__main__":
+    main()
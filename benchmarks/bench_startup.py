@@ -0,0 +1,158 @@
+"""
+启动基准测试：在全新的解释器进程中测量读取配置所需的时间（包括模块导入），
+对比导入 PyYAML 并解析 config.yaml 的旧方式、没有缓存时的首次启动（解析YAML并生成缓存）
+和读取JSON缓存的正常启动。
+
+用法（在项目根目录下运行）:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --trials 50 --output result.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_clicker import percentile
+from core.config_manager import ConfigManager
+from utils.constants import CONFIG_CACHE_FILE_NAME
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行的代码，输出读取配置耗时（秒）和是否导入了 yaml
+# 旧方式的导入与原来的 config_manager 模块相同
+LEGACY_CODE = """
+import sys, time
+start = time.perf_counter()
+import os
+import yaml
+from pathlib import Path
+with open({config_file!r}, 'r', encoding='utf-8') as f:
+    config = yaml.safe_load(f)
+print(time.perf_counter() - start, int('yaml' in sys.modules))
+"""
+CONFIG_MANAGER_CODE = """
+import sys, time
+start = time.perf_counter()
+from core.config_manager import ConfigManager
+ConfigManager({config_dir!r})
+print(time.perf_counter() - start, int('yaml' in sys.modules))
+"""
+
+def make_config_dir(samples):
+    """
+    创建临时配置目录并写入一份典型的配置文件
+
+    参数:
+        samples (int): 录制的点击间隔数，用于模拟较大的配置
+
+    返回:
+        str: 配置目录
+    """
+    config_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    manager = ConfigManager(config_dir)
+    manager.set_hotkey_bindings({"start": "Ctrl+F6", "stop": "Ctrl+F7", "pause": "F8"})
+    manager.set_click_sequence("click left 100 200; wait 120ms; repeat 10\n  click\n  wait 50ms\nend")
+    manager.set_jitter_samples([80 + i % 40 for i in range(samples)])
+    manager.save_config()
+    manager.flush_config()
+    return config_dir
+
+def run_trial(code):
+    """
+    在新进程中运行一次测试代码
+
+    返回:
+        tuple: (读取配置耗时, 进程总耗时, 是否导入了 yaml)，时间单位为秒
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    wall = time.perf_counter() - start
+    elapsed, yaml_imported = output.split()[-2:]
+    return float(elapsed), wall, yaml_imported == "1"
+
+def run_case(name, code, trials, before_trial=None):
+    """
+    运行一组测试
+
+    参数:
+        name (str): 测试名称
+        code (str): 子进程中执行的代码
+        trials (int): 次数
+        before_trial (callable): 每次运行前调用，用于删除缓存
+
+    返回:
+        dict: 测试结果
+    """
+    loads = []
+    walls = []
+    yaml_imported = False
+    for _ in range(trials):
+        if before_trial is not None:
+            before_trial()
+        elapsed, wall, imported = run_trial(code)
+        loads.append(elapsed)
+        walls.append(wall)
+        yaml_imported = yaml_imported or imported
+    loads.sort()
+    walls.sort()
+    return {
+        "case": name,
+        "trials": trials,
+        "load_p50_ms": percentile(loads, 0.50) * 1000.0,
+        "load_p90_ms": percentile(loads, 0.90) * 1000.0,
+        "process_p50_ms": percentile(walls, 0.50) * 1000.0,
+        "yaml_imported": yaml_imported
+    }
+
+def print_results(results):
+    """以表格形式输出结果"""
+    print(f"{'方式':<10} {'读取p50(ms)':>12} {'读取p90(ms)':>12} {'进程p50(ms)':>12} {'导入yaml':>9}")
+    for r in results:
+        print(f"{r['case']:<10} {r['load_p50_ms']:>12.2f} {r['load_p90_ms']:>12.2f} "
+              f"{r['process_p50_ms']:>12.2f} {str(r['yaml_imported']):>9}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="配置读取启动基准测试")
+    parser.add_argument("--trials", type=int, default=20, help="每种方式的运行次数")
+    parser.add_argument("--samples", type=int, default=200, help="配置中录制的点击间隔数")
+    parser.add_argument("--output", default="bench_startup.json", help="JSON结果输出路径")
+    args = parser.parse_args(argv)
+
+    config_dir = make_config_dir(args.samples)
+    config_file = os.path.join(config_dir, "config.yaml")
+    manager_code = CONFIG_MANAGER_CODE.format(config_dir=config_dir)
+
+    def remove_cache():
+        cache_file = os.path.join(config_dir, CONFIG_CACHE_FILE_NAME)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+    results = [
+        run_case("legacy", LEGACY_CODE.format(config_file=config_file), args.trials),
+        run_case("cold", manager_code, args.trials, remove_cache),
+        run_case("cached", manager_code, args.trials)
+    ]
+    print_results(results)
+    legacy = results[0]["load_p50_ms"]
+    cached = results[2]["load_p50_ms"]
+    print(f"读取配置节省: {legacy - cached:.2f}ms ({legacy / cached if cached else 0:.1f}x)")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入: {args.output}")
+
+if __name__ == "__main__":
+    main()
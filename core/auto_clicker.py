@@ -1,14 +1,24 @@
+from functools import partial
 
-import time
-import random
 from PyQt5.QtCore import QThread, pyqtSignal
-from pynput.mouse import Button, Controller
+
+from core.click_backend import PynputBackend
+from core.click_sequence import SequenceInterpreter
+from core.macro_player import MacroPlayer
+from core.timing_engine import TimingEngine
+from utils.constants import DEFAULT_CATCH_UP_POLICY, DEFAULT_JITTER_DISTRIBUTION
 
 class AutoClickerThread(QThread):
-    """自动点击线程，负责在后台执行连续点击操作"""
+    """
+    常驻的自动点击线程，负责在后台执行连续点击操作
+
+    线程和点击后端只创建一次：启动后在空闲状态等待，activate()/deactivate()
+    只是切换引擎状态，不会重新创建线程或 pynput 控制器。
+    """
 
     
-    def __init__(self, interval, jitter_enabled=False, jitter_percent=20):
+    def __init__(self, interval, jitter_enabled=False, jitter_percent=20, catch_up_policy=DEFAULT_CATCH_UP_POLICY, backend=None,
+                 jitter_distribution=DEFAULT_JITTER_DISTRIBUTION, jitter_seed=None, jitter_samples=None, sequence=None):
         """
         初始化自动点击线程
 
@@ -16,50 +26,55 @@ class AutoClickerThread(QThread):
             interval (int): 点击间隔，单位为毫秒
             jitter_enabled (bool): 是否启用随机抖动
             jitter_percent (int): 随机抖动幅度百分比
+            catch_up_policy (str): 点击落后时的处理策略
+            backend (ClickBackend): 点击后端，为None时使用pynput后端
+            jitter_distribution (str): 抖动分布
+            jitter_seed (int): 抖动随机种子，为None时随机选择
+            jitter_samples (list): 录制的真人点击间隔（毫秒）
+            sequence (ClickSequence): 编译后的点击序列，为None时按点击间隔连续单击左键
         """
         super().__init__()
-        self.mouse = Controller()
-        self.interval = interval / 1000.0  # 转换为秒
-        self.jitter_enabled = jitter_enabled
-        self.jitter_percent = jitter_percent
-        self.running = False
+        self.backend = backend if backend is not None else PynputBackend()
+        self.engine = TimingEngine(interval, jitter_enabled, jitter_percent, catch_up_policy,
+                                   jitter_distribution=jitter_distribution,
+                                   jitter_seed=jitter_seed,
+                                   jitter_samples=jitter_samples)
+        self.set_sequence(sequence)
 
     def run(self):
-        """线程主函数，执行连续点击"""
-        self.running = True
-        click_count = 0
-
-        while self.running:
-            # 执行鼠标点击
-            self.mouse.click(Button.left)
-            click_count += 1
-            
-            # 计算等待时间（考虑随机抖动）
-            wait_time = self.calculate_wait_time()
-            
-            
-            # 等待指定的间隔时间
-            time.sleep(wait_time)
-            
-    def calculate_wait_time(self):
-        """计算实际等待时间，考虑随机抖动"""
-        if not self.jitter_enabled:
-            return self.interval
-            
-        # 计算抖动范围
-        jitter_range = self.interval * (self.jitter_percent / 100.0)
-        
-        # 在基础间隔的基础上添加随机抖动（可正可负）
-        jitter = random.uniform(-jitter_range, jitter_range)
-        
-        # 确保最终间隔不小于0.01秒
-        return max(0.01, self.interval + jitter)
+        """线程主函数，在空闲和点击之间切换，直到 stop() 被调用"""
+        self.engine.serve(partial(self.backend.click, "left"))
+
+    def activate(self, requested_at=None):
+        """
+        开始点击
+
+        参数:
+            requested_at (float): 触发启动的 time.perf_counter() 时间，用于统计启动到首次点击的延迟
+        """
+        self.engine.start(requested_at)
+
+    def deactivate(self):
+        """停止点击，线程回到空闲状态"""
+        self.engine.stop()
+
+    def is_active(self):
+        """获取是否正在点击，点击序列执行完毕后返回False"""
+        return self.engine.running
 
     def stop(self):
-        """停止点击线程"""
-        self.running = False
+        """结束点击线程，引擎的等待可被立即打断，因此不会阻塞GUI线程"""
+        self.engine.shutdown()
         self.wait()  # 等待线程结束
 
+    def pause(self):
+        """暂停点击，线程保持存活"""
+        self.engine.pause()
+
+    def resume(self):
+        """恢复点击"""
+        self.engine.resume()
+
     def set_interval(self, interval):
         """
         更新点击间隔
@@ -67,7 +82,7 @@ class AutoClickerThread(QThread):
         参数:
             interval (int): 新的点击间隔，单位为毫秒
         """
-        self.interval = interval / 1000.0
+        self.engine.set_interval(interval)
         
     def set_jitter_enabled(self, enabled):
         """
@@ -76,7 +91,7 @@ class AutoClickerThread(QThread):
         参数:
             enabled (bool): 是否启用随机抖动
         """
-        self.jitter_enabled = enabled
+        self.engine.set_jitter_enabled(enabled)
         
     def set_jitter_percent(self, percent):
         """
@@ -85,4 +100,88 @@ class AutoClickerThread(QThread):
         参数:
             percent (int): 随机抖动幅度百分比
         """
-        self.jitter_percent = percent
+        self.engine.set_jitter_percent(percent)
+
+    def set_jitter_distribution(self, distribution, samples=None):
+        """
+        设置随机抖动分布
+
+        参数:
+            distribution (str): 见 JITTER_DISTRIBUTIONS
+            samples (list): 录制的真人点击间隔（毫秒）
+        """
+        self.engine.set_jitter_distribution(distribution, samples)
+
+    def set_catch_up_policy(self, policy):
+        """
+        设置点击落后时的处理策略
+
+        参数:
+            policy (str): 见 CATCH_UP_POLICIES
+        """
+        self.engine.set_catch_up_policy(policy)
+
+    def set_sequence(self, sequence):
+        """
+        设置点击序列，下一次开始点击时生效
+
+        参数:
+            sequence (ClickSequence): 编译后的点击序列，为None时恢复连续单击
+        """
+        self.engine.set_sequence(SequenceInterpreter(sequence, self.backend) if sequence is not None else None)
+
+    def get_drift_stats(self):
+        """获取定时引擎的漂移统计"""
+        return self.engine.get_drift_stats()
+
+    def get_stats(self):
+        """获取点击延迟、周期直方图和点击总数等运行统计的快照，可在GUI线程中轮询"""
+        return self.engine.get_stats()
+
+class MacroPlaybackThread(QThread):
+    """在后台回放宏文件的线程"""
+
+    finished_playback = pyqtSignal(dict)  # 回放结束时发出回放统计
+
+    def __init__(self, path, loops=1, speed=1.0, backend=None):
+        """
+        初始化宏回放线程
+
+        参数:
+            path (str): 宏文件路径
+            loops (int): 循环次数，0表示无限循环
+            speed (float): 速度倍率
+            backend (ClickBackend): 点击后端，为None时使用pynput后端
+        """
+        super().__init__()
+        self.loops = loops
+        self.speed = speed
+        self.player = MacroPlayer(backend if backend is not None else PynputBackend())
+        self.player.open(path)
+
+    def run(self):
+        """线程主函数，回放结束后关闭宏文件"""
+        try:
+            self.player.play(self.loops, self.speed)
+        finally:
+            stats = self.player.get_stats()
+            self.player.close()
+            self.finished_playback.emit(stats)
+
+    def stop(self):
+        """停止回放，按下中的按钮和按键会被松开"""
+        self.player.stop()
+        self.wait()
+
+    def set_speed(self, speed):
+        """
+        修改回放速度，当前位置保持不变
+
+        参数:
+            speed (float): 速度倍率
+        """
+        self.player.set_speed(speed)
+
+    def get_stats(self):
+        """获取回放进度和事件定时误差统计"""
+        return self.player.get_stats()
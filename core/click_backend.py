@@ -0,0 +1,263 @@
+import time
+from array import array
+
+from core.macro_format import MACRO_BUTTONS, SPECIAL_KEYS, KEY_SPECIAL, KEY_VK, KEY_CHAR
+from utils.constants import RECORDING_CAPACITY
+
+# 记录的事件类型
+EVENT_PRESS = 1
+EVENT_RELEASE = 2
+EVENT_CLICK = 3
+EVENT_MOVE = 4
+EVENT_SCROLL = 5
+EVENT_KEY_DOWN = 6
+EVENT_KEY_UP = 7
+
+# 按钮名称在记录中的编号
+BUTTON_CODES = {name: index for index, name in enumerate(MACRO_BUTTONS)}
+
+# 输入钩子需要抵消的自身点击事件: (按钮名称, 是否按下)，顺序即共享内存中计数的顺序
+SYNTHETIC_EVENTS = tuple((button, pressed) for button in MACRO_BUTTONS for pressed in (True, False))
+SYNTHETIC_EVENT_INDEX = {event: index for index, event in enumerate(SYNTHETIC_EVENTS)}
+
+class ClickBackend:
+    """
+    点击后端接口，引擎只通过它向系统发送输入事件
+
+    按钮使用 MACRO_BUTTONS 中的名称；按键使用宏文件中的 (编码, 编码方式) 表示，
+    见 core/macro_format.py。
+    """
+
+    def press(self, button):
+        """按下鼠标按钮"""
+        raise NotImplementedError
+
+    def release(self, button):
+        """松开鼠标按钮"""
+        raise NotImplementedError
+
+    def click(self, button, count=1):
+        """
+        点击鼠标按钮
+
+        参数:
+            button (str): 鼠标按钮名称
+            count (int): 连续点击次数
+        """
+        raise NotImplementedError
+
+    def move(self, x, y):
+        """将光标移动到屏幕坐标 (x, y)"""
+        raise NotImplementedError
+
+    def scroll(self, dx, dy):
+        """滚动鼠标滚轮"""
+        raise NotImplementedError
+
+    def key_down(self, code, encoding):
+        """按下按键"""
+        raise NotImplementedError
+
+    def key_up(self, code, encoding):
+        """松开按键"""
+        raise NotImplementedError
+
+class PynputBackend(ClickBackend):
+    """通过 pynput 向系统发送真实鼠标和键盘事件的后端"""
+
+    def __init__(self, synthetic=None):
+        """
+        初始化pynput后端，pynput只在此处导入，无显示环境下也可以使用其他后端
+
+        参数:
+            synthetic (SyntheticTracker): 登记自身发出的点击和按键，使输入钩子可以忽略它们；为None时不登记
+        """
+        from pynput import keyboard, mouse
+
+        self.mouse = mouse.Controller()
+        self.keyboard = None  # 只有回放宏时才需要，首次使用时创建
+        self.keyboard_module = keyboard
+        # x1/x2 只在部分平台上存在
+        self.buttons = {name: getattr(mouse.Button, name) for name in MACRO_BUTTONS if hasattr(mouse.Button, name)}
+        self.keys = {}
+        self.synthetic = synthetic
+
+    def press(self, button):
+        if self.synthetic is not None:
+            self.synthetic.expect(button, True)
+        self.mouse.press(self.buttons[button])
+
+    def release(self, button):
+        if self.synthetic is not None:
+            self.synthetic.expect(button, False)
+        self.mouse.release(self.buttons[button])
+
+    def click(self, button, count=1):
+        synthetic = self.synthetic
+        if synthetic is not None:
+            synthetic.expect(button, True, count)
+            synthetic.expect(button, False, count)
+        self.mouse.click(self.buttons[button], count)
+
+    def move(self, x, y):
+        self.mouse.position = (x, y)
+
+    def scroll(self, dx, dy):
+        self.mouse.scroll(dx, dy)
+
+    def key_down(self, code, encoding):
+        key = self.decode_key(code, encoding)
+        if key is not None:
+            if self.synthetic is not None:
+                self.synthetic.expect_key(True)
+            self.keyboard.press(key)
+
+    def key_up(self, code, encoding):
+        key = self.decode_key(code, encoding)
+        if key is not None:
+            if self.synthetic is not None:
+                self.synthetic.expect_key(False)
+            self.keyboard.release(key)
+
+    def decode_key(self, code, encoding):
+        """把宏文件中的按键编码还原为 pynput 按键，结果会被缓存"""
+        cache_key = (code, encoding)
+        key = self.keys.get(cache_key)
+        if key is None:
+            if self.keyboard is None:
+                self.keyboard = self.keyboard_module.Controller()
+            Key = self.keyboard_module.Key
+            KeyCode = self.keyboard_module.KeyCode
+            if encoding == KEY_SPECIAL and code < len(SPECIAL_KEYS):
+                key = getattr(Key, SPECIAL_KEYS[code], None)
+            elif encoding == KEY_VK:
+                key = KeyCode.from_vk(code)
+            elif encoding == KEY_CHAR:
+                key = KeyCode.from_char(chr(code))
+            self.keys[cache_key] = key
+        return key
+
+class NullBackend(ClickBackend):
+    """不产生任何效果的后端，用于测量引擎自身的调度开销"""
+
+    def press(self, button):
+        pass
+
+    def release(self, button):
+        pass
+
+    def click(self, button, count=1):
+        pass
+
+    def move(self, x, y):
+        pass
+
+    def scroll(self, dx, dy):
+        pass
+
+    def key_down(self, code, encoding):
+        pass
+
+    def key_up(self, code, encoding):
+        pass
+
+class RecordingBackend(ClickBackend):
+    """
+    记录每个事件发送时间的后端，用于无显示环境下的吞吐量和定时测试
+
+    所有列在创建时预先分配，记录一个事件只是几次数组赋值，不会分配新对象；
+    超出容量的事件只计数不记录。
+    """
+
+    def __init__(self, capacity=RECORDING_CAPACITY, clock=time.perf_counter):
+        """
+        初始化记录后端
+
+        参数:
+            capacity (int): 最多记录的事件数
+            clock (callable): 时间戳来源
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.kinds = array('B', bytes(capacity))
+        self.buttons = array('B', bytes(capacity))
+        self.xs = array('i', bytes(4 * capacity))
+        self.ys = array('i', bytes(4 * capacity))
+        self.count = 0
+        self.dropped = 0
+
+    def _record(self, kind, button=0, x=0, y=0):
+        """记录一个事件"""
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self.timestamps[i] = self.clock()
+        self.kinds[i] = kind
+        self.buttons[i] = button
+        self.xs[i] = x
+        self.ys[i] = y
+        self.count = i + 1
+
+    def press(self, button):
+        self._record(EVENT_PRESS, BUTTON_CODES[button])
+
+    def release(self, button):
+        self._record(EVENT_RELEASE, BUTTON_CODES[button])
+
+    def click(self, button, count=1):
+        code = BUTTON_CODES[button]
+        for _ in range(count):
+            self._record(EVENT_CLICK, code)
+
+    def move(self, x, y):
+        self._record(EVENT_MOVE, 0, x, y)
+
+    def scroll(self, dx, dy):
+        self._record(EVENT_SCROLL, 0, dx, dy)
+
+    def key_down(self, code, encoding):
+        self._record(EVENT_KEY_DOWN, encoding, code)
+
+    def key_up(self, code, encoding):
+        self._record(EVENT_KEY_UP, encoding, code)
+
+    def get_timestamps(self, kind=None):
+        """
+        获取已记录事件的时间戳
+
+        参数:
+            kind (int): 只返回该类型的事件，为None时返回全部
+
+        返回:
+            list: 时间戳列表
+        """
+        if kind is None:
+            return self.timestamps[:self.count].tolist()
+        kinds = self.kinds
+        return [t for i, t in enumerate(self.timestamps[:self.count]) if kinds[i] == kind]
+
+    def reset(self):
+        """清空记录，保留已分配的数组"""
+        self.count = 0
+        self.dropped = 0
+
+def create_backend(name, synthetic=None):
+    """
+    按名称创建点击后端
+
+    参数:
+        name (str): "pynput"、"null" 或 "recording"
+        synthetic: 登记自身发出的输入，见 PynputBackend，只用于 pynput 后端
+
+    返回:
+        ClickBackend: 点击后端
+    """
+    if name == "pynput":
+        return PynputBackend(synthetic)
+    if name == "null":
+        return NullBackend()
+    if name == "recording":
+        return RecordingBackend()
+    raise ValueError(f"未知的点击后端: {name}")
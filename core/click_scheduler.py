@@ -0,0 +1,288 @@
+import heapq
+import itertools
+import threading
+import time
+
+from core.click_backend import PynputBackend
+from utils.constants import MIN_INTERVAL, SPIN_THRESHOLD, CLICK_BUTTONS
+
+class ClickJob:
+    """单个点击任务：按钮、屏幕坐标和点击间隔"""
+
+    def __init__(self, job_id, interval, button="left", position=None):
+        """
+        初始化点击任务
+
+        参数:
+            job_id (int): 任务编号
+            interval (int): 点击间隔，单位为毫秒
+            button (str): 鼠标按钮，"left"、"right" 或 "middle"
+            position (tuple): 点击坐标 (x, y)，为None时在当前光标位置点击
+        """
+        self.job_id = job_id
+        self.interval = max(MIN_INTERVAL, interval) / 1000.0  # 转换为秒
+        self.button = button
+        self.position = position
+        self.paused = False
+
+        # 每次暂停、恢复或修改间隔都会使队列中的旧条目失效
+        self.generation = 0
+        self.next_deadline = 0.0
+        self.last_deadline = None  # 最近一次出堆派发的截止时间，尚未点击时为None
+
+        # 统计
+        self.click_count = 0
+        self.skipped_count = 0
+        self.last_drift = 0.0
+        self.max_drift = 0.0
+
+    def to_dict(self):
+        """
+        获取任务状态
+
+        返回:
+            dict: 任务参数与统计
+        """
+        return {
+            "job_id": self.job_id,
+            "interval": int(round(self.interval * 1000)),
+            "button": self.button,
+            "position": self.position,
+            "paused": self.paused,
+            "click_count": self.click_count,
+            "skipped_count": self.skipped_count,
+            "last_drift": self.last_drift,
+            "max_drift": self.max_drift
+        }
+
+class ClickScheduler(threading.Thread):
+    """
+    点击调度器：在单个线程上用按截止时间排序的堆驱动任意数量的点击任务
+
+    所有任务共享一个条件变量，增删、暂停、恢复任务都会立即唤醒调度线程。
+    堆中的条目采用惰性删除：任务被移除或其 generation 变化后，旧条目在出堆时丢弃，
+    因此每次操作的代价都是 O(log n)，与任务数量基本无关。
+    """
+
+    def __init__(self, backend=None, spin_threshold=SPIN_THRESHOLD):
+        """
+        初始化点击调度器
+
+        参数:
+            backend (ClickBackend): 点击后端，为None时在调度线程启动时创建pynput后端
+            spin_threshold (float): 截止前改为忙等待的时间，单位为秒
+        """
+        super().__init__(daemon=True)
+        self.backend = backend
+        self.spin_threshold = spin_threshold
+        self.condition = threading.Condition()
+        self.jobs = {}
+        self.heap = []
+        self.job_ids = itertools.count(1)
+        self.sequence = itertools.count()  # 截止时间相同时保持先进先出
+        self.running = False
+
+    def add_job(self, interval, button="left", position=None):
+        """
+        添加点击任务，任务会立即开始
+
+        参数:
+            interval (int): 点击间隔，单位为毫秒
+            button (str): 鼠标按钮，"left"、"right" 或 "middle"
+            position (tuple): 点击坐标 (x, y)，为None时在当前光标位置点击
+
+        返回:
+            int: 任务编号
+        """
+        if button not in CLICK_BUTTONS:
+            raise ValueError(f"不支持的鼠标按钮: {button}")
+
+        with self.condition:
+            job = ClickJob(next(self.job_ids), interval, button, position)
+            self.jobs[job.job_id] = job
+            self._push(job, time.perf_counter())
+            return job.job_id
+
+    def remove_job(self, job_id):
+        """
+        移除点击任务
+
+        参数:
+            job_id (int): 任务编号
+
+        返回:
+            bool: 任务存在并被移除时返回True
+        """
+        with self.condition:
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                return False
+            job.generation += 1
+            self.condition.notify_all()
+            return True
+
+    def pause_job(self, job_id):
+        """
+        暂停点击任务
+
+        参数:
+            job_id (int): 任务编号
+
+        返回:
+            bool: 任务存在时返回True
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return False
+            if not job.paused:
+                job.paused = True
+                job.generation += 1
+                self.condition.notify_all()
+            return True
+
+    def resume_job(self, job_id):
+        """
+        恢复点击任务，从当前时刻重新开始计时
+
+        参数:
+            job_id (int): 任务编号
+
+        返回:
+            bool: 任务存在时返回True
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return False
+            if job.paused:
+                job.paused = False
+                job.generation += 1
+                self._push(job, time.perf_counter())
+            return True
+
+    def set_job_interval(self, job_id, interval):
+        """
+        修改点击任务的间隔，待执行的点击会立即按新间隔重新调度
+
+        参数:
+            job_id (int): 任务编号
+            interval (int): 新的点击间隔，单位为毫秒
+
+        返回:
+            bool: 任务存在时返回True
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return False
+            job.interval = max(MIN_INTERVAL, interval) / 1000.0
+            if not job.paused:
+                # 派发期间 next_deadline 仍是正在执行的点击，因此以最近一次派发的截止时间为基准
+                if job.last_deadline is None:
+                    deadline = job.next_deadline
+                else:
+                    deadline = job.last_deadline + job.interval
+                job.generation += 1
+                self._push(job, max(deadline, time.perf_counter()))
+            return True
+
+    def get_jobs(self):
+        """
+        获取所有任务的状态
+
+        返回:
+            list: 每个任务的状态字典
+        """
+        with self.condition:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def _push(self, job, deadline):
+        """将任务的下一次点击放入堆中，调用方需持有 condition"""
+        job.next_deadline = deadline
+        heapq.heappush(self.heap, (deadline, next(self.sequence), job, job.generation))
+        self.condition.notify_all()
+
+    def _next_due(self):
+        """
+        等待堆顶任务到期并将其出堆
+
+        返回:
+            tuple: (截止时间, 任务, generation)；调度器停止时返回None
+        """
+        clock = time.perf_counter
+        heap = self.heap
+        condition = self.condition
+        with condition:
+            while self.running:
+                if not heap:
+                    condition.wait()
+                    continue
+                deadline, _, job, generation = heap[0]
+                if generation != job.generation:
+                    # 已失效的条目
+                    heapq.heappop(heap)
+                    continue
+                remaining = deadline - clock() - self.spin_threshold
+                if remaining > 0:
+                    condition.wait(remaining)
+                    continue
+                heapq.heappop(heap)
+                job.last_deadline = deadline
+                return deadline, job, generation
+        return None
+
+    def run(self):
+        """调度线程主函数"""
+        clock = time.perf_counter
+        condition = self.condition
+        if self.backend is None:
+            self.backend = PynputBackend()
+        backend = self.backend
+
+        while self.running:
+            due = self._next_due()
+            if due is None:
+                break
+            deadline, job, generation = due
+
+            while clock() < deadline:
+                pass
+
+            now = clock()
+            if job.position is not None:
+                backend.move(*job.position)
+            backend.click(job.button)
+
+            drift = now - deadline
+            job.click_count += 1
+            job.last_drift = drift
+            if drift > job.max_drift:
+                job.max_drift = drift
+
+            with condition:
+                if generation != job.generation:
+                    # 点击期间任务被暂停、移除或修改，已由对应操作重新调度
+                    continue
+                interval = job.interval
+                next_deadline = deadline + interval
+                behind = clock() - next_deadline
+                if behind > interval:
+                    # 落后超过一个周期，跳过错过的节拍
+                    missed = int(behind / interval)
+                    job.skipped_count += missed
+                    next_deadline += missed * interval
+                self._push(job, next_deadline)
+
+    def start(self):
+        """启动调度线程"""
+        self.running = True
+        super().start()
+
+    def stop(self):
+        """停止调度线程并等待其结束"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.is_alive():
+            self.join()
@@ -0,0 +1,265 @@
+from array import array
+
+from utils.constants import CLICK_BUTTONS, MAX_SEQUENCE_DEPTH
+
+# 点击序列语言，每行（或分号分隔）一条语句，# 之后为注释:
+#   click [按钮] [x y]          单击，可指定坐标
+#   double [按钮] [x y]         双击
+#   hold 按钮 时长 [x y]        按住按钮一段时间后松开
+#   move x y                    移动光标
+#   wait 时长                   等待，时长可写作 120ms、1.5s，或不带单位的毫秒数
+#   repeat 次数 ... end         重复执行，次数为0表示无限重复，此时循环体中必须有非零的等待
+# 例: "click left 100 200; wait 120ms; double right 300 200; hold right 500ms; repeat 50; click; wait 50; end"
+
+# 操作码，操作数紧随其后
+OP_END = 0       # 序列结束
+OP_MOVE = 1      # x, y
+OP_CLICK = 2     # 按钮编号, 次数
+OP_PRESS = 3     # 按钮编号
+OP_RELEASE = 4   # 按钮编号
+OP_WAIT = 5      # 微秒
+OP_LOOP = 6      # 计数器编号, 次数（0为无限）
+OP_NEXT = 7      # 计数器编号, 循环体起始位置
+
+def parse_duration(token, line):
+    """
+    解析时长
+
+    参数:
+        token (str): 如 "120ms"、"1.5s"、"120"
+        line (int): 所在行号，用于错误信息
+
+    返回:
+        int: 微秒数
+    """
+    try:
+        if token.endswith("ms"):
+            value = float(token[:-2]) * 1000
+        elif token.endswith("s"):
+            value = float(token[:-1]) * 1000000
+        else:
+            value = float(token) * 1000
+    except ValueError:
+        raise ValueError(f"第{line}行: 无效的时长 {token}")
+    if value < 0:
+        raise ValueError(f"第{line}行: 时长不能为负数")
+    return int(value)
+
+def parse_int(token, line):
+    """解析整数参数"""
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"第{line}行: 无效的数值 {token}")
+
+def parse_button(tokens, line):
+    """
+    从参数开头取出可选的按钮名称
+
+    返回:
+        tuple: (按钮编号, 剩余参数)
+    """
+    if tokens and tokens[0] in CLICK_BUTTONS:
+        return CLICK_BUTTONS.index(tokens[0]), tokens[1:]
+    if tokens and not tokens[0].lstrip("-").isdigit():
+        raise ValueError(f"第{line}行: 未知的按钮 {tokens[0]}")
+    return 0, tokens
+
+def emit_position(program, tokens, line):
+    """若参数中给出了坐标，生成移动指令"""
+    if not tokens:
+        return
+    if len(tokens) != 2:
+        raise ValueError(f"第{line}行: 坐标应为 x y")
+    program.extend((OP_MOVE, parse_int(tokens[0], line), parse_int(tokens[1], line)))
+
+def compile_sequence(text):
+    """
+    把点击序列编译为扁平的操作码数组，运行时不再做任何解析
+
+    参数:
+        text (str): 点击序列源码
+
+    返回:
+        ClickSequence: 编译结果
+    """
+    program = array('q')
+    loops = []  # 未闭合的 repeat: (计数器编号, 循环体起始位置, 行号, 次数)
+    counter_count = 0
+    last_wait = -1  # 最近一条非零等待的位置
+
+    for number, raw_line in enumerate(text.splitlines(), 1):
+        for statement in raw_line.split("#", 1)[0].split(";"):
+            tokens = statement.lower().split()
+            if not tokens:
+                continue
+            command, args = tokens[0], tokens[1:]
+
+            if command in ("click", "double"):
+                button, args = parse_button(args, number)
+                emit_position(program, args, number)
+                program.extend((OP_CLICK, button, 2 if command == "double" else 1))
+            elif command == "hold":
+                if not args or args[0] not in CLICK_BUTTONS and args[0][:1].isdigit():
+                    raise ValueError(f"第{number}行: hold 需要指定按钮")
+                button, args = parse_button(args, number)
+                if not args:
+                    raise ValueError(f"第{number}行: hold 需要指定时长")
+                duration = parse_duration(args[0], number)
+                emit_position(program, args[1:], number)
+                if duration:
+                    last_wait = len(program)
+                program.extend((OP_PRESS, button, OP_WAIT, duration, OP_RELEASE, button))
+            elif command == "move":
+                if not args:
+                    raise ValueError(f"第{number}行: move 需要指定坐标")
+                emit_position(program, args, number)
+            elif command == "wait":
+                if len(args) != 1:
+                    raise ValueError(f"第{number}行: wait 需要指定时长")
+                duration = parse_duration(args[0], number)
+                if duration:
+                    last_wait = len(program)
+                program.extend((OP_WAIT, duration))
+            elif command == "repeat":
+                if len(args) != 1:
+                    raise ValueError(f"第{number}行: repeat 需要指定次数")
+                count = parse_int(args[0].rstrip("x"), number)
+                if count < 0:
+                    raise ValueError(f"第{number}行: 重复次数不能为负数")
+                if len(loops) >= MAX_SEQUENCE_DEPTH:
+                    raise ValueError(f"第{number}行: repeat 嵌套过深")
+                program.extend((OP_LOOP, counter_count, count))
+                loops.append((counter_count, len(program), number, count))
+                counter_count += 1
+            elif command == "end":
+                if not loops:
+                    raise ValueError(f"第{number}行: 多余的 end")
+                counter, body, start, count = loops.pop()
+                if count == 0 and last_wait < body:
+                    # 没有等待的无限循环无法暂停，也会以最快速度不停点击
+                    raise ValueError(f"第{start}行: 无限重复的循环体中需要 wait 或 hold")
+                program.extend((OP_NEXT, counter, body))
+            else:
+                raise ValueError(f"第{number}行: 未知的指令 {command}")
+
+    if loops:
+        raise ValueError(f"第{loops[-1][2]}行: repeat 缺少 end")
+    program.append(OP_END)
+    return ClickSequence(text, program, counter_count)
+
+class ClickSequence:
+    """编译后的点击序列"""
+
+    def __init__(self, source, program, counter_count):
+        """
+        初始化点击序列
+
+        参数:
+            source (str): 序列源码
+            program (array): 操作码数组
+            counter_count (int): 循环计数器个数
+        """
+        self.source = source
+        self.program = program
+        self.counter_count = counter_count
+
+    def __len__(self):
+        """获取操作码数组的长度"""
+        return len(self.program)
+
+class SequenceInterpreter:
+    """
+    在定时引擎线程上执行点击序列的解释器
+
+    每一步只是一次数组读取和一个整数比较分支，后端方法和计时函数都预先绑定为局部变量；
+    等待基于序列开始时的绝对时间线计算截止时间，步骤本身的耗时不会累积成漂移。
+    """
+
+    def __init__(self, sequence, backend):
+        """
+        初始化解释器
+
+        参数:
+            sequence (ClickSequence): 编译后的点击序列
+            backend (ClickBackend): 点击后端
+        """
+        self.sequence = sequence
+        self.backend = backend
+
+    def run(self, engine):
+        """
+        执行一遍序列，由 TimingEngine.serve() 在引擎线程上调用
+
+        参数:
+            engine (TimingEngine): 提供可打断的等待和运行统计
+
+        返回:
+            bool: 序列执行完毕返回True，被停止时返回False
+        """
+        program = self.sequence.program
+        counters = [0] * self.sequence.counter_count
+        held = [False] * len(CLICK_BUTTONS)
+        buttons = CLICK_BUTTONS
+        backend = self.backend
+        click = backend.click
+        press = backend.press
+        release = backend.release
+        move = backend.move
+        wait_until = engine.wait_until
+        record_click = engine.stats.record_click
+        clock = engine.clock
+
+        deadline = clock()
+        pc = 0
+        completed = False
+        try:
+            while True:
+                op = program[pc]
+                if op == OP_CLICK:
+                    start = clock()
+                    click(buttons[program[pc + 1]], program[pc + 2])
+                    record_click(deadline, start, clock())
+                    pc += 3
+                elif op == OP_WAIT:
+                    deadline = wait_until(deadline + program[pc + 1] / 1000000.0)
+                    if deadline is None:
+                        return False
+                    pc += 2
+                elif op == OP_MOVE:
+                    move(program[pc + 1], program[pc + 2])
+                    pc += 3
+                elif op == OP_NEXT:
+                    # 每轮检查一次是否已停止，没有等待的循环也能在一轮之内停下
+                    if not engine.running:
+                        return False
+                    counter = program[pc + 1]
+                    if counters[counter] == 0:
+                        pc = program[pc + 2]
+                    elif counters[counter] > 1:
+                        counters[counter] -= 1
+                        pc = program[pc + 2]
+                    else:
+                        pc += 3
+                elif op == OP_LOOP:
+                    counters[program[pc + 1]] = program[pc + 2]
+                    pc += 3
+                elif op == OP_PRESS:
+                    button = program[pc + 1]
+                    press(buttons[button])
+                    held[button] = True
+                    pc += 2
+                elif op == OP_RELEASE:
+                    button = program[pc + 1]
+                    release(buttons[button])
+                    held[button] = False
+                    pc += 2
+                else:
+                    completed = True
+                    return True
+        finally:
+            # 被停止时松开仍按住的按钮
+            if not completed:
+                for button, pressed in enumerate(held):
+                    if pressed:
+                        release(buttons[button])
@@ -1,18 +1,55 @@
 
+import copy
+import json
 import os
-import yaml
-from pathlib import Path
 
-from utils.constants import DEFAULT_INTERVAL, DEFAULT_LANGUAGE, DEFAULT_HOTKEY, DEFAULT_JITTER_ENABLED, DEFAULT_JITTER_PERCENT
+from core.config_model import ConfigModel, CONFIG_FIELDS, CONFIG_DEFAULTS, validate_config
+from core.config_persister import ConfigPersister, write_atomic
+from core.config_watcher import ConfigWatcher
+
+from utils.constants import CONFIG_CACHE_FILE_NAME, PROFILE_FIELDS
+
+CONFIG_CACHE_VERSION = 2
+
+def content_hash(text):
+    """计算配置文件内容的摘要，用于判断文件内容是否真的变化"""
+    import hashlib  # 只在读取或写入YAML文件时需要
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
 
 class ConfigManager:
-    """配置管理器，负责保存和加载用户设置"""
+    """
+    配置管理器，负责保存和加载用户设置
+
+    用户可编辑的配置文件是YAML；启动时优先读取它旁边的JSON缓存，缓存记录了生成时
+    YAML文件的修改时间和大小，两者一致时不需要导入和运行YAML解析器。
+    只有YAML文件被外部修改过（或缓存不存在）以及保存配置时才会导入 yaml。
+    配置保存在 ConfigModel 中，任何配置项发生变化都会自动请求保存；
+    其他组件通过 subscribe() 只订阅自己用到的配置项。
+
+    start_watching() 之后，配置文件被外部修改时只把发生变化的配置项应用到配置模型。
+    文件的修改时间、大小和内容摘要记录的是本程序最近一次读取或写入的版本，
+    因此本程序自己的保存不会被当作外部修改；外部修改尚未应用时发生的保存会先合并外部修改，不会覆盖它。
+    """
 
-    def __init__(self):
-        """初始化配置管理器"""
+    def __init__(self, config_dir=None):
+        """
+        初始化配置管理器
+
+        参数:
+            config_dir (str): 配置目录，为None时使用用户目录下的 .mouse_auto_clicker
+        """
         # 获取用户文档目录下的配置文件路径
-        self.config_dir = os.path.join(Path.home(), ".mouse_auto_clicker")
+        self.config_dir = config_dir if config_dir else os.path.join(os.path.expanduser("~"), ".mouse_auto_clicker")
         self.config_file = os.path.join(self.config_dir, "config.yaml")
+        self.cache_file = os.path.join(self.config_dir, CONFIG_CACHE_FILE_NAME)
+        self.signature = None      # 最近一次读取或写入后配置文件的修改时间和大小
+        self.content_hash = None   # 同上，文件内容的摘要
+        self.file_config = {}      # 同上，文件中的配置
+        self.written_hash = None   # 正在写入的内容的摘要
+        self.unapplied = {}        # 已检测到但尚未应用到配置模型的外部修改
+        self.reloading = False
+        self.watcher = None
+        self.on_external_change = None
 
         # 确保配置目录存在
         if not os.path.exists(self.config_dir):
@@ -21,90 +58,412 @@ class ConfigManager:
         # 加载配置
         self.load_config()
 
+        # 保存请求在后台线程中合并写入
+        self.persister = ConfigPersister(self.config_file, self.dump_config, on_written=self.update_cache)
+        self.config.subscribe(CONFIG_FIELDS, self.on_config_changed)
+
     def load_config(self):
-        """加载配置"""
-        # 默认配置
-        self.config = {
-            "click_interval": DEFAULT_INTERVAL,
-            "hotkey": DEFAULT_HOTKEY,
-            "hotkey_enabled": True,
-            "language": DEFAULT_LANGUAGE,
-            "exit_on_close": False,
-            "jitter_enabled": DEFAULT_JITTER_ENABLED,
-            "jitter_percent": DEFAULT_JITTER_PERCENT
-        }
-
-        # 如果配置文件存在，则从文件加载
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_config = yaml.safe_load(f)
-                    if loaded_config and isinstance(loaded_config, dict):
-                        self.config.update(loaded_config)
-            except Exception as e:
-                print(f"加载配置文件时出错: {e}")
+        """加载配置，文件中缺少或无效的配置项使用默认值"""
+        # 如果配置文件存在，则从文件（或其缓存）加载
+        self.config = ConfigModel.from_dict(self.read_config_file())
 
-    def save_config(self):
-        """保存配置"""
+    def file_signature(self):
+        """
+        获取配置文件的修改时间和大小，用于判断缓存是否有效
+
+        返回:
+            list: [修改时间（纳秒）, 大小]，文件不存在时返回None
+        """
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def read_config_file(self):
+        """
+        读取配置文件，YAML文件自生成缓存后未被修改时直接使用缓存
+
+        返回:
+            dict: 文件中的配置，文件不存在或无效时返回None
+        """
+        signature = self.signature = self.file_signature()
+        if signature is None:
+            return None
+        cached = self.read_cache(signature)
+        if cached is not None:
+            self.file_config, self.content_hash = cached
+            return self.file_config
+
+        loaded_config, self.content_hash = self.parse_config_file()
+        if loaded_config is None:
+            return None
+        self.file_config = loaded_config
+        self.write_cache(signature, loaded_config, self.content_hash)
+        return loaded_config
+
+    def parse_config_file(self):
+        """
+        读取并解析YAML配置文件
+
+        返回:
+            tuple: (文件中的配置, 内容摘要)；文件无法读取时都为None，内容无效时配置为None
+        """
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            print(f"加载配置文件时出错: {e}")
+            return None, None
+        digest = content_hash(text)
+        try:
+            import yaml  # 只在需要解析YAML时导入
+            loaded_config = yaml.safe_load(text)
+        except Exception as e:
+            print(f"加载配置文件时出错: {e}")
+            return None, digest
+        if not loaded_config or not isinstance(loaded_config, dict):
+            return None, digest
+        return loaded_config, digest
+
+    def read_cache(self, signature):
+        """
+        读取配置缓存
+
+        参数:
+            signature (list): 当前YAML文件的修改时间和大小
+
+        返回:
+            tuple: (缓存的配置, YAML文件内容摘要)，缓存不存在、已过期或无效时返回None
+        """
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(cache, dict) or cache.get("version") != CONFIG_CACHE_VERSION
+                or cache.get("signature") != signature or not isinstance(cache.get("config"), dict)):
+            return None
+        return cache["config"], cache.get("hash")
+
+    def write_cache(self, signature, config, digest):
+        """
+        写入配置缓存
+
+        参数:
+            signature (list): 生成缓存时YAML文件的修改时间和大小
+            config (dict): 配置
+            digest (str): YAML文件内容摘要
+        """
+        try:
+            data = json.dumps({"version": CONFIG_CACHE_VERSION, "signature": signature, "hash": digest,
+                               "config": config}, ensure_ascii=False)
+            write_atomic(self.cache_file, data)
         except Exception as e:
-            print(f"保存配置文件时出错: {e}")
+            print(f"写入配置缓存时出错: {e}")
+
+    def update_cache(self, config):
+        """
+        保存配置后刷新缓存，由配置写入器在写入YAML文件后调用
+
+        参数:
+            config (dict): 刚写入的配置快照
+        """
+        self.signature = self.file_signature()
+        self.content_hash = self.written_hash
+        self.file_config = config
+        if self.signature is not None:
+            self.write_cache(self.signature, config, self.content_hash)
+
+    def save_config(self):
+        """请求保存配置，立即返回；短时间内的多次保存合并为一次后台写入"""
+        self.persister.save(self.config.to_dict())
+
+    def on_config_changed(self, name, old, new):
+        """任何配置项变化时请求保存；应用外部修改时文件已是新内容，只在有未写入的保存时重新保存"""
+        if self.reloading and not self.persister.has_pending():
+            return
+        self.save_config()
+
+    def start_watching(self, on_external_change):
+        """
+        开始监视配置文件的外部修改
+
+        参数:
+            on_external_change (callable): 检测到外部修改后在监视线程（或写入线程）中调用，不带参数；
+                调用方应在GUI线程中调用 reload_config()
+        """
+        self.on_external_change = on_external_change
+        if self.watcher is None:
+            self.watcher = ConfigWatcher(self.config_file, self.poll_external_changes)
+        self.watcher.start()
+
+    def stop_watching(self):
+        """停止监视配置文件"""
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def poll_external_changes(self):
+        """配置文件变化后由监视线程调用"""
+        if self.check_external_changes() and self.on_external_change is not None:
+            self.on_external_change()
+
+    def check_external_changes(self):
+        """
+        检查配置文件是否被外部修改，修改时间、大小或内容都未变化时不解析YAML；
+        检测到的修改记入 self.unapplied，等待 reload_config() 应用
+
+        返回:
+            dict: 本次检测到的变化（配置项 -> 新值），没有变化时返回None
+        """
+        # 与写入配置互斥，写入完成前不会把本程序正在写的文件当作外部修改
+        with self.persister.write_lock:
+            signature = self.file_signature()
+            if signature == self.signature:
+                return None
+            self.signature = signature
+            if signature is None:
+                return None  # 文件被删除时保留当前设置，下次保存时重新生成
+            config, digest = self.parse_config_file()
+            if digest is None:
+                return None
+            if digest == self.content_hash:
+                # 内容未变（如只更新了修改时间），刷新缓存记录的文件修改时间
+                self.write_cache(signature, self.file_config, digest)
+                return None
+            self.content_hash = digest
+            if config is None:
+                return None
+            self.write_cache(signature, config, digest)
+
+            # 只保留发生变化的配置项，文件中删除的配置项恢复默认值
+            changes = {name: value for name, value in config.items()
+                       if name not in self.file_config or self.file_config[name] != value}
+            for name in self.file_config:
+                if name not in config and name in CONFIG_DEFAULTS:
+                    changes[name] = copy.deepcopy(CONFIG_DEFAULTS[name])
+            self.file_config = config
+            self.unapplied.update(changes)
+            return changes or None
+
+    def reload_config(self):
+        """
+        把检测到的外部修改应用到配置模型，只通知发生变化的配置项，需在GUI线程中调用
+
+        返回:
+            list: 值发生变化的配置项名称
+        """
+        # 持有写入锁，应用完成前后台写入不会写出缺少外部修改的旧快照
+        with self.persister.write_lock:
+            changes = self.unapplied
+            self.unapplied = {}
+            if not changes:
+                return []
+            values, extra = validate_config(changes)
+            self.config.extra.update(extra)
+            self.reloading = True
+            try:
+                return self.config.update(values)
+            finally:
+                self.reloading = False
+
+    def subscribe(self, names, callback):
+        """
+        订阅配置项的变更，见 ConfigModel.subscribe()
+
+        参数:
+            names: 配置项名称，或名称的序列
+            callback (callable): callback(名称, 旧值, 新值)
+
+        返回:
+            int: 订阅编号
+        """
+        return self.config.subscribe(names, callback)
+
+    def unsubscribe(self, token):
+        """取消订阅配置项的变更"""
+        self.config.unsubscribe(token)
+
+    def flush_config(self):
+        """立即把尚未写入的配置写入磁盘，用于退出和重启前"""
+        self.persister.flush()
+
+    def dump_config(self, config):
+        """
+        把配置转换为YAML文本
+
+        参数:
+            config (dict): 配置快照
+
+        返回:
+            str: YAML文本
+        """
+        import yaml  # 只在写入配置时导入
+        # 由写入线程在写入前调用：先合并尚未应用的外部修改，避免用旧设置覆盖它们
+        if self.watcher is not None and self.check_external_changes() and self.on_external_change is not None:
+            self.on_external_change()
+        if self.unapplied:
+            values, extra = validate_config(self.unapplied)
+            config.update(extra)
+            config.update(values)
+        text = yaml.dump(config, default_flow_style=False, allow_unicode=True)
+        self.written_hash = content_hash(text)
+        return text
+
+    def get_save_stats(self):
+        """获取配置写入统计，见 ConfigPersister.get_stats()"""
+        return self.persister.get_stats()
 
     def get_click_interval(self):
         """获取点击间隔"""
-        return self.config["click_interval"]
+        return self.config.click_interval
 
     def set_click_interval(self, interval):
         """设置点击间隔"""
-        self.config["click_interval"] = interval
+        self.config.set("click_interval", interval)
+
+    def get_click_sequence(self):
+        """获取点击序列源码，为空时按点击间隔连续单击"""
+        return self.config.click_sequence
+
+    def set_click_sequence(self, sequence):
+        """设置点击序列源码"""
+        self.config.set("click_sequence", sequence)
 
     def get_hotkey(self):
         """获取热键"""
-        return self.config["hotkey"]
+        return self.config.hotkey
 
     def set_hotkey(self, hotkey):
         """设置热键"""
-        self.config["hotkey"] = hotkey
+        self.config.set("hotkey", hotkey)
+
+    def get_hotkey_bindings(self):
+        """获取切换热键以外的热键绑定（动作名 -> 热键字符串）"""
+        return self.config.hotkey_bindings
+
+    def set_hotkey_bindings(self, bindings):
+        """设置切换热键以外的热键绑定"""
+        self.config.set("hotkey_bindings", bindings)
 
     def get_hotkey_enabled(self):
         """获取热键启用状态"""
-        return self.config["hotkey_enabled"]
+        return self.config.hotkey_enabled
 
     def set_hotkey_enabled(self, enabled):
         """设置热键启用状态"""
-        self.config["hotkey_enabled"] = enabled
+        self.config.set("hotkey_enabled", enabled)
 
     def get_language(self):
         """获取语言"""
-        return self.config["language"]
+        return self.config.language
 
     def set_language(self, language):
         """设置语言"""
-        self.config["language"] = language
+        self.config.set("language", language)
 
     def get_exit_on_close(self):
         """获取关闭行为设置"""
-        return self.config["exit_on_close"]
+        return self.config.exit_on_close
 
     def set_exit_on_close(self, value):
         """设置关闭行为"""
-        self.config["exit_on_close"] = value
+        self.config.set("exit_on_close", value)
         
     def get_jitter_enabled(self):
         """获取随机抖动启用状态"""
-        return self.config["jitter_enabled"]
+        return self.config.jitter_enabled
         
     def set_jitter_enabled(self, enabled):
         """设置随机抖动启用状态"""
-        self.config["jitter_enabled"] = enabled
+        self.config.set("jitter_enabled", enabled)
         
     def get_jitter_percent(self):
         """获取随机抖动幅度百分比"""
-        return self.config["jitter_percent"]
+        return self.config.jitter_percent
         
     def set_jitter_percent(self, percent):
         """设置随机抖动幅度百分比"""
-        self.config["jitter_percent"] = percent
+        self.config.set("jitter_percent", percent)
+
+    def get_catch_up_policy(self):
+        """获取点击落后时的处理策略"""
+        return self.config.catch_up_policy
+
+    def set_catch_up_policy(self, policy):
+        """设置点击落后时的处理策略"""
+        self.config.set("catch_up_policy", policy)
+
+    def get_jitter_distribution(self):
+        """获取随机抖动分布"""
+        return self.config.jitter_distribution
+
+    def set_jitter_distribution(self, distribution):
+        """设置随机抖动分布"""
+        self.config.set("jitter_distribution", distribution)
+
+    def get_jitter_seed(self):
+        """获取随机抖动种子，为None时每次运行随机选择"""
+        return self.config.jitter_seed
+
+    def set_jitter_seed(self, seed):
+        """设置随机抖动种子"""
+        self.config.set("jitter_seed", seed)
+
+    def get_jitter_samples(self):
+        """获取录制的真人点击间隔（毫秒）"""
+        return self.config.jitter_samples
+
+    def set_jitter_samples(self, samples):
+        """设置录制的真人点击间隔（毫秒）"""
+        self.config.set("jitter_samples", samples)
+
+    def get_engine_mode(self):
+        """获取点击引擎运行方式（线程或独立进程）"""
+        return self.config.engine_mode
+
+    def set_engine_mode(self, mode):
+        """设置点击引擎运行方式，重启后生效"""
+        self.config.set("engine_mode", mode)
+
+    def get_macro_playback_speed(self):
+        """获取宏回放的速度倍率"""
+        return self.config.macro_playback_speed
+
+    def set_macro_playback_speed(self, speed):
+        """设置宏回放的速度倍率，正在进行的回放从当前位置起按新速度继续"""
+        self.config.set("macro_playback_speed", speed)
+
+    def get_click_jobs(self):
+        """获取多任务点击的任务列表"""
+        return self.config.click_jobs
+
+    def set_click_jobs(self, jobs):
+        """设置多任务点击的任务列表，正在运行的任务会按新列表重新创建"""
+        self.config.set("click_jobs", jobs)
+
+    def get_active_profile(self):
+        """获取当前使用的配置方案名称，未使用方案时为None"""
+        return self.config.active_profile
+
+    def set_active_profile(self, name):
+        """设置当前使用的配置方案名称"""
+        self.config.set("active_profile", name)
+
+    def get_profile_settings(self):
+        """
+        获取当前设置中属于配置方案的部分，用于保存为方案
+
+        返回:
+            dict: 设置项 -> 值（深拷贝）
+        """
+        return copy.deepcopy({field: self.config.get(field) for field in PROFILE_FIELDS})
+
+    def apply_profile_settings(self, settings):
+        """
+        用配置方案覆盖当前设置，方案中缺少或无效的设置项保持不变，变化的设置项会通知订阅者
 
+        参数:
+            settings (dict): 方案设置
+        """
+        self.config.apply({field: settings[field] for field in PROFILE_FIELDS if field in settings})
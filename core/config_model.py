@@ -0,0 +1,297 @@
+import copy
+
+from utils.constants import (DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL, DEFAULT_CLICK_SEQUENCE, DEFAULT_HOTKEY,
+                             DEFAULT_LANGUAGE, LANGUAGES, DEFAULT_JITTER_ENABLED, DEFAULT_JITTER_PERCENT,
+                             MIN_JITTER_PERCENT, MAX_JITTER_PERCENT, DEFAULT_CATCH_UP_POLICY, CATCH_UP_POLICIES,
+                             DEFAULT_JITTER_DISTRIBUTION, JITTER_DISTRIBUTIONS, DEFAULT_ENGINE_MODE, ENGINE_MODES,
+                             DEFAULT_PLAYBACK_SPEED, MIN_PLAYBACK_SPEED, MAX_PLAYBACK_SPEED, CLICK_BUTTONS)
+
+def check_int(low=None, high=None):
+    """生成整数检查函数，超出范围时报错"""
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"应为整数: {value!r}")
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"超出范围 [{low}, {high}]: {value}")
+        return value
+    return check
+
+def check_float(low=None, high=None):
+    """生成数值检查函数，整数会转换为浮点数，超出范围时报错"""
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"应为数值: {value!r}")
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"超出范围 [{low}, {high}]: {value}")
+        return float(value)
+    return check
+
+def check_bool(value):
+    """检查布尔值"""
+    if not isinstance(value, bool):
+        raise ValueError(f"应为true或false: {value!r}")
+    return value
+
+def check_str(value):
+    """检查字符串，None视为空字符串"""
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"应为字符串: {value!r}")
+    return value
+
+def check_choice(choices):
+    """生成取值检查函数，只接受 choices 中的值"""
+    def check(value):
+        if value not in choices:
+            raise ValueError(f"应为 {', '.join(map(str, choices))} 之一: {value!r}")
+        return value
+    return check
+
+def check_optional(check):
+    """生成允许None的检查函数"""
+    def check_optional_value(value):
+        return None if value is None else check(value)
+    return check_optional_value
+
+def check_bindings(value):
+    """检查热键绑定表（动作名 -> 热键字符串），None视为空表"""
+    if value is None:
+        return {}
+    if not isinstance(value, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in value.items()):
+        raise ValueError(f"应为 动作名: 热键 的映射: {value!r}")
+    return dict(value)
+
+def check_samples(value):
+    """检查录制的点击间隔列表，None视为空列表"""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0
+                                              for v in value):
+        raise ValueError("应为正数列表")
+    return list(value)
+
+def check_jobs(value):
+    """
+    检查点击任务列表，None视为空列表
+
+    每个任务为 {"interval": 毫秒, "button": 按钮, "position": [x, y]}，按钮默认为左键，
+    不指定坐标时在当前光标位置点击。
+    """
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"应为点击任务列表: {value!r}")
+    check_interval = check_int(MIN_INTERVAL, MAX_INTERVAL)
+    check_button = check_choice(CLICK_BUTTONS)
+    jobs = []
+    for job in value:
+        if not isinstance(job, dict) or "interval" not in job:
+            raise ValueError(f"点击任务应包含 interval: {job!r}")
+        position = job.get("position")
+        if position is not None:
+            if (not isinstance(position, (list, tuple)) or len(position) != 2
+                    or not all(isinstance(v, int) and not isinstance(v, bool) for v in position)):
+                raise ValueError(f"点击任务的坐标应为 [x, y]: {position!r}")
+            position = list(position)
+        jobs.append({
+            "interval": check_interval(job["interval"]),
+            "button": check_button(job.get("button", "left")),
+            "position": position
+        })
+    return jobs
+
+# 配置项: (名称, 默认值, 检查函数)
+CONFIG_SCHEMA = (
+    ("click_interval", DEFAULT_INTERVAL, check_int(MIN_INTERVAL, MAX_INTERVAL)),
+    ("click_sequence", DEFAULT_CLICK_SEQUENCE, check_str),
+    ("hotkey", DEFAULT_HOTKEY, check_str),
+    ("hotkey_enabled", True, check_bool),
+    ("hotkey_bindings", {}, check_bindings),
+    ("language", DEFAULT_LANGUAGE, check_choice(tuple(LANGUAGES))),
+    ("exit_on_close", False, check_bool),
+    ("jitter_enabled", DEFAULT_JITTER_ENABLED, check_bool),
+    ("jitter_percent", DEFAULT_JITTER_PERCENT, check_int(MIN_JITTER_PERCENT, MAX_JITTER_PERCENT)),
+    ("catch_up_policy", DEFAULT_CATCH_UP_POLICY, check_choice(CATCH_UP_POLICIES)),
+    ("jitter_distribution", DEFAULT_JITTER_DISTRIBUTION, check_choice(JITTER_DISTRIBUTIONS)),
+    ("jitter_seed", None, check_optional(check_int())),
+    ("jitter_samples", [], check_samples),
+    ("engine_mode", DEFAULT_ENGINE_MODE, check_choice(ENGINE_MODES)),
+    ("macro_playback_speed", DEFAULT_PLAYBACK_SPEED, check_float(MIN_PLAYBACK_SPEED, MAX_PLAYBACK_SPEED)),
+    ("click_jobs", [], check_jobs),
+    ("active_profile", None, check_optional(check_str))
+)
+CONFIG_FIELDS = tuple(name for name, _, _ in CONFIG_SCHEMA)
+CONFIG_CHECKS = {name: check for name, _, check in CONFIG_SCHEMA}
+CONFIG_DEFAULTS = {name: default for name, default, _ in CONFIG_SCHEMA}
+
+def validate_config(data):
+    """
+    检查配置字典，无效的配置项被丢弃并输出提示
+
+    参数:
+        data (dict): 从文件或配置方案读取的配置
+
+    返回:
+        tuple: (有效的已知配置项, 未知配置项)
+    """
+    values = {}
+    extra = {}
+    for name, value in data.items():
+        check = CONFIG_CHECKS.get(name)
+        if check is None:
+            extra[name] = value
+            continue
+        try:
+            values[name] = check(value)
+        except ValueError as e:
+            print(f"配置项 {name} 无效，已忽略: {e}")
+    return values, extra
+
+class ConfigModel:
+    """
+    带类型检查和变更通知的配置模型
+
+    每个配置项是一个 __slots__ 属性，读取就是普通的属性访问。配置只在从文件或配置方案载入时
+    检查一次（validate_config），之后的 set()/update() 只比较新旧值：值未变化时什么都不做，
+    变化时按配置项通知订阅者 callback(名称, 旧值, 新值)，每个订阅者只收到它订阅的配置项。
+    订阅表采用写时复制的元组；回调在调用 set()/update() 的线程（GUI线程）中执行。
+    """
+
+    __slots__ = CONFIG_FIELDS + ("extra", "listeners", "subscriptions", "next_token")
+
+    def __init__(self):
+        """初始化为默认配置"""
+        for name, default, _ in CONFIG_SCHEMA:
+            setattr(self, name, copy.deepcopy(default))
+        self.extra = {}  # 未知的配置项，保存时原样写回
+        self.listeners = {name: () for name in CONFIG_FIELDS}
+        self.subscriptions = {}  # 订阅编号 -> (配置项, 回调)
+        self.next_token = 1
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        从配置字典创建模型，缺少或无效的配置项使用默认值
+
+        参数:
+            data (dict): 从文件读取的配置
+
+        返回:
+            ConfigModel: 配置模型
+        """
+        model = cls()
+        values, model.extra = validate_config(data or {})
+        for name, value in values.items():
+            setattr(model, name, value)
+        return model
+
+    def get(self, name):
+        """获取配置项的值"""
+        return getattr(self, name)
+
+    def set(self, name, value):
+        """
+        修改配置项
+
+        参数:
+            name (str): 配置项名称
+            value: 新值
+
+        返回:
+            bool: 值是否发生变化
+        """
+        return bool(self.update({name: value}))
+
+    def update(self, changes):
+        """
+        修改多个配置项，全部修改完成后再逐项通知订阅者
+
+        参数:
+            changes (dict): 配置项名称 -> 新值
+
+        返回:
+            list: 值发生变化的配置项名称
+        """
+        diffs = []
+        for name, value in changes.items():
+            if name not in CONFIG_CHECKS:
+                raise ValueError(f"未知的配置项: {name}")
+            old = getattr(self, name)
+            if old == value:
+                continue
+            # 字典和列表保存副本，调用方之后修改原对象不会绕过变更通知
+            setattr(self, name, copy.deepcopy(value) if isinstance(value, (dict, list)) else value)
+            diffs.append((name, old, value))
+        for name, old, value in diffs:
+            for callback in self.listeners[name]:
+                callback(name, old, value)
+        return [name for name, _, _ in diffs]
+
+    def apply(self, data):
+        """
+        检查并应用外部配置（如配置方案或重新读取的配置文件），只通知发生变化的配置项
+
+        参数:
+            data (dict): 配置字典
+
+        返回:
+            list: 值发生变化的配置项名称
+        """
+        values, _ = validate_config(data)
+        return self.update(values)
+
+    def subscribe(self, names, callback):
+        """
+        订阅配置项的变更
+
+        参数:
+            names: 配置项名称，或名称的序列
+            callback (callable): callback(名称, 旧值, 新值)
+
+        返回:
+            int: 订阅编号，用于取消订阅
+        """
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            if name not in CONFIG_CHECKS:
+                raise ValueError(f"未知的配置项: {name}")
+        token = self.next_token
+        self.next_token += 1
+        self.subscriptions[token] = (tuple(names), callback)
+        for name in names:
+            self.listeners[name] = self.listeners[name] + (callback,)
+        return token
+
+    def unsubscribe(self, token):
+        """
+        取消订阅，订阅编号不存在时忽略
+
+        参数:
+            token (int): subscribe() 返回的订阅编号
+        """
+        subscription = self.subscriptions.pop(token, None)
+        if subscription is None:
+            return
+        names, callback = subscription
+        for name in names:
+            callbacks = list(self.listeners[name])
+            callbacks.remove(callback)
+            self.listeners[name] = tuple(callbacks)
+
+    def listener_count(self, name):
+        """获取配置项的订阅数"""
+        return len(self.listeners[name])
+
+    def to_dict(self):
+        """
+        导出为可保存的配置字典（深拷贝），包括未知的配置项
+
+        返回:
+            dict: 配置
+        """
+        data = copy.deepcopy(self.extra)
+        for name in CONFIG_FIELDS:
+            data[name] = copy.deepcopy(getattr(self, name))
+        return data
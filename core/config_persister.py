@@ -0,0 +1,190 @@
+import atexit
+import os
+import signal
+import threading
+import time
+
+from utils.constants import CONFIG_SAVE_DELAY
+
+# 进程被终止时先写入未保存的配置再退出的信号
+EXIT_SIGNALS = tuple(getattr(signal, name) for name in ("SIGTERM", "SIGINT", "SIGHUP", "SIGBREAK")
+                     if hasattr(signal, name))
+
+def write_atomic(path, data, newline=None):
+    """
+    原子地写入文件：先写入同目录下的临时文件并同步到磁盘，再替换目标文件，
+    写入过程中崩溃不会留下半个配置文件
+
+    参数:
+        path (str): 目标文件路径
+        data (str): 文件内容
+        newline (str): 换行符转换方式，同 open()；为""时原样写入
+    """
+    # 临时文件名包含进程号和线程号，同一目标文件的并发写入不会共用临时文件
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+class ConfigPersister:
+    """
+    延迟合并的配置写入器：保存请求只记录最新的配置快照，后台线程在 delay 秒后写入一次
+
+    连续的保存请求（如按住数值框箭头时每次 valueChanged 都保存）合并为一次磁盘写入，
+    序列化和写文件都在后台线程中进行，不占用GUI线程。
+    程序正常退出（atexit）、收到终止信号或调用 flush() 时，未写入的配置立即写入。
+    """
+
+    def __init__(self, path, serialize, delay=CONFIG_SAVE_DELAY, on_written=None):
+        """
+        初始化配置写入器，后台线程立即启动
+
+        参数:
+            path (str): 配置文件路径
+            serialize (callable): 把配置快照转换为文件内容的函数
+            delay (float): 第一次保存请求到实际写入的时间，单位为秒
+            on_written (callable): 每次成功写入后以写入的快照调用，在写入线程中执行
+        """
+        self.path = path
+        self.serialize = serialize
+        self.delay = delay
+        self.on_written = on_written
+        self.condition = threading.Condition()
+        # 后台写入和 flush() 不会同时写同一个文件；信号处理函数可能在主线程写入途中再次 flush()，因此可重入
+        self.write_lock = threading.RLock()
+        self.pending = None    # 尚未写入的配置快照
+        self.deadline = None   # 计划写入时间
+        self.closed = False
+        self.request_count = 0
+        self.write_count = 0
+        self.error_count = 0
+        self.previous_handlers = {}  # 信号 -> 安装前的处理函数
+
+        self.thread = threading.Thread(target=self.run, name="ConfigPersister", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def save(self, snapshot):
+        """
+        请求保存配置，立即返回
+
+        参数:
+            snapshot (dict): 配置快照，调用方之后不应再修改它
+        """
+        with self.condition:
+            self.request_count += 1
+            self.pending = snapshot
+            if self.deadline is None:
+                self.deadline = time.monotonic() + self.delay
+                self.condition.notify()
+
+    def has_pending(self):
+        """是否有尚未写入的保存请求"""
+        with self.condition:
+            return self.pending is not None
+
+    def run(self):
+        """后台线程主函数：等待到计划写入时间后写入最新的快照"""
+        condition = self.condition
+        while True:
+            with condition:
+                while not self.closed and (self.deadline is None or time.monotonic() < self.deadline):
+                    if self.deadline is None:
+                        condition.wait()
+                    else:
+                        condition.wait(self.deadline - time.monotonic())
+                if self.closed:
+                    return
+                snapshot = self.take_pending()
+            self.write(snapshot)
+
+    def take_pending(self):
+        """取出待写入的快照，调用方需持有 self.condition"""
+        snapshot = self.pending
+        self.pending = None
+        self.deadline = None
+        return snapshot
+
+    def write(self, snapshot):
+        """
+        写入配置快照
+
+        参数:
+            snapshot (dict): 配置快照，为None时不写入
+        """
+        if snapshot is None:
+            return
+        with self.write_lock:
+            try:
+                write_atomic(self.path, self.serialize(snapshot))
+                self.write_count += 1
+            except Exception as e:
+                self.error_count += 1
+                print(f"保存配置文件时出错: {e}")
+                return
+            if self.on_written is not None:
+                self.on_written(snapshot)
+
+    def flush(self):
+        """在调用线程中立即写入尚未写入的配置"""
+        with self.condition:
+            snapshot = self.take_pending()
+        self.write(snapshot)
+
+    def close(self):
+        """写入尚未写入的配置并结束后台线程，可重复调用"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.flush()
+
+    def install_signal_handlers(self):
+        """
+        在终止信号到来时先写入配置，再交给原来的处理方式，只能在主线程中调用
+
+        Qt事件循环运行期间，Python信号处理函数在下一次执行Python代码时才会被调用。
+        """
+        for signum in EXIT_SIGNALS:
+            try:
+                previous = signal.signal(signum, self.handle_signal)
+            except (ValueError, OSError) as e:
+                print(f"安装信号处理函数出错: {e}")
+                continue
+            self.previous_handlers[signum] = previous
+
+    def handle_signal(self, signum, frame):
+        """终止信号处理函数"""
+        self.flush()
+        previous = self.previous_handlers.get(signum)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.signal(signum, signal.SIG_DFL)
+            signal.raise_signal(signum)
+
+    def get_stats(self):
+        """
+        获取写入统计
+
+        返回:
+            dict: 保存请求数、实际写入次数、因合并而省去的写入次数和写入失败次数
+        """
+        with self.condition:
+            requests = self.request_count
+            pending = 1 if self.pending is not None else 0
+        writes = self.write_count
+        return {
+            "requests": requests,
+            "writes": writes,
+            "saved_writes": max(0, requests - writes - pending - self.error_count),
+            "errors": self.error_count
+        }
@@ -0,0 +1,207 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from utils.constants import CONFIG_WATCH_DEBOUNCE, CONFIG_WATCH_POLL_INTERVAL
+
+# inotify 事件掩码，见 <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+# 监视配置目录而不是文件本身：原子替换（包括本程序的保存）会换掉文件的 inode
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len，之后是 len 字节的文件名
+
+WATCH_INOTIFY = "inotify"
+WATCH_POLLING = "polling"
+
+def open_inotify(directory):
+    """
+    通过 ctypes 创建 inotify 实例并监视目录
+
+    参数:
+        directory (str): 要监视的目录
+
+    返回:
+        int: inotify 文件描述符，系统不支持时返回None
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    # ctypes.util 会导入 subprocess，只在需要时导入，不拖慢启动
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno))
+    except (OSError, AttributeError) as e:
+        print(f"无法使用inotify监视配置目录，改为定期检查: {e}")
+        return None
+    return fd
+
+class ConfigWatcher:
+    """
+    配置文件监视器：文件被外部修改后调用 on_change
+
+    Linux 上通过 inotify 等待配置目录的事件，没有事件时线程不占用CPU；
+    其他平台或 inotify 不可用时按 poll_interval 检查文件的修改时间和大小。
+    连续的事件（编辑器保存时常见的先截断再写入、写临时文件再改名）在文件停止变化
+    debounce 秒后合并为一次通知。on_change 在监视线程中调用。
+    """
+
+    def __init__(self, path, on_change, debounce=CONFIG_WATCH_DEBOUNCE, poll_interval=CONFIG_WATCH_POLL_INTERVAL):
+        """
+        初始化配置文件监视器
+
+        参数:
+            path (str): 配置文件路径
+            on_change (callable): 文件变化后调用，不带参数
+            debounce (float): 文件停止变化多久（秒）后才通知
+            poll_interval (float): 不支持 inotify 时检查文件的间隔（秒）
+        """
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.name = os.fsencode(os.path.basename(path))
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.mode = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.wake_read = self.wake_write = None  # 用于唤醒 select() 的管道
+        self.lock = threading.Lock()  # 保护唤醒管道，写入和关闭不会交错
+
+    def start(self):
+        """启动监视线程，已启动时忽略"""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        fd = open_inotify(self.directory)
+        if fd is None:
+            self.mode = WATCH_POLLING
+            # 在启动线程前记录文件状态，之后的修改都不会漏掉
+            target, args = self.run_polling, (self.file_signature(),)
+        else:
+            self.mode = WATCH_INOTIFY
+            with self.lock:
+                self.wake_read, self.wake_write = os.pipe()
+            target, args = self.run_inotify, (fd,)
+        self.thread = threading.Thread(target=target, args=args, name="ConfigWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止监视并等待线程结束，唤醒管道由监视线程退出时关闭"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        with self.lock:
+            if self.wake_write is not None:
+                os.write(self.wake_write, b"\0")
+        self.thread.join(1.0)
+        self.thread = None
+
+    def notify(self):
+        """通知文件已变化，回调出错不会结束监视线程"""
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"处理配置文件变化时出错: {e}")
+
+    def parse_events(self, data):
+        """
+        解析 inotify 事件
+
+        参数:
+            data (bytes): 从 inotify 文件描述符读取的数据
+
+        返回:
+            tuple: (是否涉及配置文件, 配置目录是否已不再被监视)
+        """
+        relevant = False
+        lost = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            start = offset + EVENT_HEADER.size
+            name = data[start:start + length].split(b"\0", 1)[0]
+            offset = start + length
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                lost = True
+            elif mask & IN_Q_OVERFLOW or name == self.name:
+                # 事件队列溢出时无法知道丢失了哪些事件，按配置文件已变化处理
+                relevant = True
+        return relevant, lost
+
+    def run_inotify(self, fd):
+        """监视线程主函数（inotify），退出时关闭 inotify 和唤醒管道的文件描述符"""
+        deadline = None  # 最近一次事件之后 debounce 秒
+        wake_read, wake_write = self.wake_read, self.wake_write
+        try:
+            while not self.stop_event.is_set():
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                readable, _, _ = select.select([fd, wake_read], [], [], timeout)
+                if wake_read in readable:
+                    return
+                if fd in readable:
+                    relevant, lost = self.parse_events(os.read(fd, 65536))
+                    if lost:
+                        # 配置目录被删除或移动后 inotify 不再有事件，改为定期检查
+                        print("配置目录已不再被监视，改为定期检查配置文件")
+                        self.mode = WATCH_POLLING
+                        if relevant or deadline is not None:
+                            self.notify()
+                        self.run_polling(self.file_signature())
+                        return
+                    if relevant:
+                        deadline = time.monotonic() + self.debounce
+                if deadline is not None and time.monotonic() >= deadline:
+                    deadline = None
+                    self.notify()
+        finally:
+            # 在线程真正结束时才关闭，stop() 等待超时也不会让仍在使用的描述符被系统复用
+            with self.lock:
+                if self.wake_write == wake_write:
+                    self.wake_read = self.wake_write = None
+                os.close(wake_write)
+            os.close(wake_read)
+            os.close(fd)
+
+    def file_signature(self):
+        """获取配置文件的修改时间和大小，文件不存在时返回None"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def run_polling(self, last):
+        """
+        监视线程主函数（定期检查），文件在一个检查间隔内不再变化后才通知
+
+        参数:
+            last (tuple): 开始检查时文件的修改时间和大小
+        """
+        changed = False
+        while not self.stop_event.wait(self.poll_interval):
+            signature = self.file_signature()
+            if signature != last:
+                last = signature
+                changed = True
+            elif changed:
+                changed = False
+                self.notify()
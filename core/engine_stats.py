@@ -0,0 +1,229 @@
+import time
+from array import array
+
+from utils.constants import HISTOGRAM_SUB_BITS, HISTOGRAM_MAX_EXPONENT
+
+class LatencyHistogram:
+    """
+    固定桶的对数-线性直方图（HDR风格），以微秒为单位记录
+
+    小于 2^HISTOGRAM_SUB_BITS 微秒的值每微秒一个桶；更大的值每个2的幂区间再等分为
+    2^HISTOGRAM_SUB_BITS 个桶，相对误差约为 1/2^HISTOGRAM_SUB_BITS。
+    桶在创建时一次分配，记录一个值只是一次整数运算和一次数组自增。
+    """
+
+    def __init__(self):
+        """初始化直方图"""
+        self.sub_bits = HISTOGRAM_SUB_BITS
+        self.sub_count = 1 << HISTOGRAM_SUB_BITS
+        self.bucket_count = self.sub_count * (HISTOGRAM_MAX_EXPONENT + 1)
+        self.max_index = self.bucket_count - 1
+        self.counts = array('Q', bytes(8 * self.bucket_count))
+        self.total = 0
+        self.max_value = 0
+
+    def record(self, seconds):
+        """
+        记录一个值
+
+        参数:
+            seconds (float): 要记录的时间，单位为秒，负值按0记录
+        """
+        value = int(seconds * 1000000.0)
+        if value < 0:
+            value = 0
+        if value > self.max_value:
+            self.max_value = value
+        self.counts[self.index_of(value)] += 1
+        self.total += 1
+
+    def index_of(self, value):
+        """获取微秒值所在的桶编号"""
+        sub_count = self.sub_count
+        if value < sub_count:
+            return value
+        exponent = value.bit_length() - self.sub_bits - 1
+        index = sub_count * (exponent + 1) + (value >> exponent) - sub_count
+        return index if index < self.max_index else self.max_index
+
+    def value_of(self, index):
+        """获取桶编号对应的下界（微秒）"""
+        sub_count = self.sub_count
+        if index < sub_count:
+            return index
+        exponent = index // sub_count - 1
+        return (index % sub_count + sub_count) << exponent
+
+    def percentile(self, fraction, counts=None, total=None):
+        """
+        获取分位数
+
+        参数:
+            fraction (float): 0到1之间的分位
+            counts (array): 使用快照中的桶计数，为None时使用当前计数
+            total (int): 快照中的总数
+
+        返回:
+            float: 分位数（所在桶的中点），单位为秒；没有数据时返回0
+        """
+        if counts is None:
+            counts = self.counts
+            total = self.total
+        if not total:
+            return 0.0
+        target = max(1, int(fraction * total + 0.5))
+        seen = 0
+        for index, count in enumerate(counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    # 取桶的中点，并且不超过记录到的最大值
+                    middle = (self.value_of(index) + self.value_of(index + 1)) / 2.0
+                    return min(middle, self.max_value) / 1000000.0
+        return self.max_value / 1000000.0
+
+    def snapshot(self):
+        """
+        复制当前桶计数。数组复制在一条字节码内完成，记录线程不会看到中间状态，
+        因此不需要加锁。
+
+        返回:
+            dict: p50/p90/p99/p999/max（秒）和样本数
+        """
+        counts = self.counts[:]
+        total = sum(counts)
+        return {
+            "count": total,
+            "p50": self.percentile(0.50, counts, total),
+            "p90": self.percentile(0.90, counts, total),
+            "p99": self.percentile(0.99, counts, total),
+            "p999": self.percentile(0.999, counts, total),
+            "max": self.max_value / 1000000.0
+        }
+
+    def reset(self):
+        """清空直方图"""
+        self.counts = array('Q', bytes(8 * self.bucket_count))
+        self.total = 0
+        self.max_value = 0
+
+class EngineStats:
+    """
+    点击引擎的运行统计：点击派发耗时、实际周期和相对截止时间的偏差直方图，
+    以及点击总数和运行时间
+
+    只有引擎线程写入；snapshot() 可以在任意线程调用而无需与点击循环同步，
+    各字段之间可能相差最近的一次点击。
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        初始化统计
+
+        参数:
+            clock (callable): 时间来源，需与引擎使用的时钟一致
+        """
+        self.clock = clock
+        self.latency = LatencyHistogram()
+        self.period = LatencyHistogram()
+        self.drift = LatencyHistogram()
+        self.reset()
+
+    def reset(self, start_time=None):
+        """
+        开始新的统计会话
+
+        参数:
+            start_time (float): 会话的起始时间（如热键按下时），为None时使用当前时间
+        """
+        self.latency.reset()
+        self.period.reset()
+        self.drift.reset()
+        self.click_count = 0
+        self.start_time = start_time if start_time is not None else self.clock()
+        self.wake_latency = None   # 从会话开始到引擎线程开始执行会话的时间
+        self.start_latency = None  # 从会话开始到首次点击的时间
+        self.stop_requested_at = None
+        self.stop_latency = None   # 从请求停止到引擎线程退出定时循环的时间
+        self.last_click = None
+        self.last_drift = 0.0
+        self.total_drift = 0.0
+
+    def record_wake(self):
+        """记录引擎线程开始执行本次会话，由引擎线程调用，同一会话只记录第一次"""
+        if self.wake_latency is None:
+            self.wake_latency = self.clock() - self.start_time
+
+    def record_stop_request(self):
+        """记录请求停止的时间，由调用 stop() 的线程调用"""
+        self.stop_requested_at = self.clock()
+
+    def record_stopped(self):
+        """记录引擎线程已退出定时循环，由引擎线程调用"""
+        if self.stop_requested_at is not None:
+            self.stop_latency = self.clock() - self.stop_requested_at
+
+    def record_click(self, deadline, start, end):
+        """
+        记录一次点击，由引擎线程调用
+
+        参数:
+            deadline (float): 该点击的计划截止时间
+            start (float): 开始派发的时间
+            end (float): 派发完成的时间
+        """
+        self.latency.record(end - start)
+        last_click = self.last_click
+        if last_click is not None:
+            self.period.record(start - last_click)
+        else:
+            self.start_latency = start - self.start_time
+        self.last_click = start
+
+        drift = start - deadline
+        self.drift.record(drift)
+        self.last_drift = drift
+        self.total_drift += drift
+        self.click_count += 1
+
+    def snapshot(self):
+        """
+        获取统计快照，不会阻塞点击循环
+
+        返回:
+            dict: 点击数、会话起始时间、运行时间、平均CPS、唤醒和启动延迟、漂移以及各直方图的分位数（时间单位为秒）
+        """
+        now = self.clock()
+        count = self.click_count
+        uptime = now - self.start_time
+        return {
+            "timestamp": now,
+            "click_count": count,
+            "start_time": self.start_time,
+            "uptime": uptime,
+            "average_cps": count / uptime if uptime > 0 else 0.0,
+            "wake_latency": self.wake_latency,
+            "start_latency": self.start_latency,
+            "last_drift": self.last_drift,
+            "mean_drift": self.total_drift / count if count else 0.0,
+            "latency": self.latency.snapshot(),
+            "period": self.period.snapshot(),
+            "drift": self.drift.snapshot()
+        }
+
+def cps_between(previous, current):
+    """
+    根据两个快照计算这段时间内的实际CPS
+
+    参数:
+        previous (dict): 较早的快照
+        current (dict): 较新的快照
+
+    返回:
+        float: 每秒点击数
+    """
+    elapsed = current["timestamp"] - previous["timestamp"]
+    clicks = current["click_count"] - previous["click_count"]
+    if elapsed <= 0 or clicks < 0:
+        return 0.0
+    return clicks / elapsed
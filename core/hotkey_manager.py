@@ -1,23 +1,25 @@
-import threading
-import time
 from PyQt5.QtCore import QObject, pyqtSignal
-from pynput import keyboard, mouse
-from pynput.keyboard import Key, KeyCode
-from pynput.mouse import Button
+
+from core.hotkey_registry import HotkeyRegistry
+from core.input_hub import KEY_PRESS, KEY_RELEASE, MOUSE_CLICK
+from utils.constants import HOTKEY_TOGGLE
 
 class HotkeyManager(QObject):
     """热键管理器，处理全局热键监听和触发"""
 
-    # 定义信号
-    hotkey_pressed = pyqtSignal()
+    # 定义信号，参数为触发的动作名（见 HOTKEY_ACTIONS）
+    hotkey_triggered = pyqtSignal(str)
 
-    def __init__(self, hotkey=None, enabled=True):
+    def __init__(self, input_hub, hotkey=None, enabled=True, bindings=None, latency_trace=None):
         """
         初始化热键管理器
 
         参数:
-            hotkey (str): 热键字符串，如"F6"或"Ctrl+Shift+C"
+            input_hub (InputHub): 全局输入事件中心
+            hotkey (str): 切换开始/停止的热键字符串，如"F6"或"Ctrl+Shift+C"
             enabled (bool): 热键是否启用
+            bindings (dict): 其他动作的热键，动作名 -> 热键字符串
+            latency_trace (LatencyTrace): 热键延迟追踪，触发热键时在钩子回调中记录第一个时间戳
         """
         super().__init__()
 
@@ -25,96 +27,81 @@ class HotkeyManager(QObject):
         self.default_hotkey = "F6"
         self.current_hotkey = hotkey if hotkey else self.default_hotkey
         self.enabled = enabled
-
-        # 热键监听器
-        self.keyboard_listener = None
-        self.mouse_listener = None
+        self.latency_trace = latency_trace
+
+        # 所有热键编译到同一个注册表中，每个输入事件只需一次查找
+        self.registry = HotkeyRegistry()
+        for action, binding in (bindings or {}).items():
+            self.registry.bind(action, binding)
+        self.registry.bind(HOTKEY_TOGGLE, self.current_hotkey)
+
+        # 在输入事件中心上的订阅，修改热键或禁用热键时不会重建系统钩子
+        self.input_hub = input_hub
+        self.subscriptions = []
+        self.mouse_subscription = None  # 只有热键使用了鼠标按钮时才订阅，否则不安装鼠标钩子
         if self.enabled:
             self.start_listener()
 
     def start_listener(self):
-        """启动热键监听器"""
-        if self.keyboard_listener:
-            self.keyboard_listener.stop()
-        if self.mouse_listener:
-            self.mouse_listener.stop()
-
-        # 解析热键字符串
-        keys = self.parse_hotkey(self.current_hotkey)
-        # 创建一个集合来跟踪当前按下的键
-        self.pressed_keys = set()
-
-        # 定义键盘回调函数
-        def on_press(key):
-            key_str = self.normalize_key(key)
-            self.pressed_keys.add(key_str)
-            if all(k in self.pressed_keys for k in keys):
-                self.pressed_keys.remove(key_str)
-                self.hotkey_pressed.emit()
-
-        def on_release(key):
-            key_str = self.normalize_key(key)
-            if key_str in self.pressed_keys:
-                self.pressed_keys.remove(key_str)
-            return True
-
-        # 定义鼠标回调函数
-        def on_click(x, y, button, pressed):
-            key_str = self.normalize_key(button)
-            
-            if pressed:
-                self.pressed_keys.add(key_str)
-                if all(k in self.pressed_keys for k in keys):
-                    self.pressed_keys.remove(key_str)
-                    self.hotkey_pressed.emit()
-            else:
-                if key_str in self.pressed_keys:
-                    self.pressed_keys.remove(key_str)
-
-        # 启动键盘监听器
-        self.keyboard_listener = keyboard.Listener(on_press=on_press, on_release=on_release)
-        self.keyboard_listener.daemon = True
-        self.keyboard_listener.start()
-
-        # 启动鼠标监听器
-        self.mouse_listener = mouse.Listener(on_click=on_click)
-        self.mouse_listener.daemon = True
-        self.mouse_listener.start()
-
-    def normalize_key(self, key):
-        if isinstance(key, Key):
-            return key.name
-        if isinstance(key, KeyCode):
-            return key.char if key.char else f"KeyCode({key.vk})"
-        if isinstance(key, Button):
-            return f"mouse_{key.name}"
-        return str(key)
-
-    def parse_hotkey(self, hotkey_str):
-        parts = hotkey_str.split('+')
-        result = []
-
-        for part in parts:
-            part = part.strip().lower()
-
-            if part == 'ctrl':
-                result.append('ctrl_l')
-            elif part == 'alt':
-                result.append('alt_l')
-            elif part == 'shift':
-                result.append('shift_l')
-            elif part.startswith('f') and part[1:].isdigit() and 1 <= int(part[1:]) <= 12:
-                result.append(f'f{part[1:]}')
-            elif part in ['mouse_left', 'mouse_right', 'mouse_middle', 'mouse_x1', 'mouse_x2']:
-                result.append(part)
-            else:
-                result.append(part)
-
-        return result
+        """订阅键盘和鼠标事件，已订阅时不重复订阅"""
+        if self.subscriptions:
+            return
+        self.subscriptions = [
+            self.input_hub.subscribe(KEY_PRESS, self.on_press),
+            self.input_hub.subscribe(KEY_RELEASE, self.on_release)
+        ]
+        self.update_mouse_subscription()
+
+    def update_mouse_subscription(self):
+        """按热键是否使用鼠标按钮订阅或取消订阅鼠标点击事件"""
+        needed = bool(self.subscriptions) and self.registry.uses_mouse()
+        if needed and self.mouse_subscription is None:
+            self.mouse_subscription = self.input_hub.subscribe(MOUSE_CLICK, self.on_click)
+        elif not needed and self.mouse_subscription is not None:
+            self.input_hub.unsubscribe(self.mouse_subscription)
+            self.mouse_subscription = None
+
+    def on_press(self, key):
+        """键盘按下回调"""
+        action = self.registry.press(key)
+        if action is not None:
+            if self.latency_trace is not None:
+                self.latency_trace.begin(action)
+            self.hotkey_triggered.emit(action)
+
+    def on_release(self, key):
+        """键盘松开回调"""
+        self.registry.release(key)
+
+    def on_click(self, x, y, button, pressed):
+        """鼠标点击回调"""
+        if pressed:
+            self.on_press(button)
+        else:
+            self.registry.release(button)
 
     def set_hotkey(self, hotkey):
+        """设置切换开始/停止的热键"""
         self.current_hotkey = hotkey
-        self.start_listener()
+        self.registry.bind(HOTKEY_TOGGLE, hotkey)
+        self.update_mouse_subscription()
+
+    def watch_config(self, config_manager):
+        """
+        订阅热键相关的配置项，配置变化时直接更新注册表和订阅状态
+
+        参数:
+            config_manager (ConfigManager): 配置管理器
+        """
+        config_manager.subscribe("hotkey", lambda name, old, new: self.set_hotkey(new))
+        config_manager.subscribe("hotkey_bindings", self.on_bindings_changed)
+        config_manager.subscribe("hotkey_enabled", lambda name, old, new: self.set_enabled(new))
+
+    def on_bindings_changed(self, name, old, new):
+        """热键绑定配置变化时只更新发生变化的动作"""
+        for action in set(old) | set(new):
+            if action != HOTKEY_TOGGLE and old.get(action) != new.get(action):
+                self.set_binding(action, new.get(action))
 
     def get_current_hotkey(self):
         return self.current_hotkey
@@ -122,13 +109,33 @@ class HotkeyManager(QObject):
     def get_current_hotkey_text(self):
         return self.current_hotkey
 
+    def set_binding(self, action, hotkey):
+        """
+        设置动作的热键
+
+        参数:
+            action (str): 动作名，见 HOTKEY_ACTIONS
+            hotkey (str): 热键字符串，为空时取消绑定
+        """
+        if action == HOTKEY_TOGGLE:
+            self.set_hotkey(hotkey)
+        else:
+            self.registry.bind(action, hotkey)
+            self.update_mouse_subscription()
+
+    def get_bindings(self):
+        """获取切换热键以外的热键绑定"""
+        bindings = self.registry.get_bindings()
+        bindings.pop(HOTKEY_TOGGLE, None)
+        return bindings
+
     def unregister_hotkey(self):
-        if self.keyboard_listener:
-            self.keyboard_listener.stop()
-            self.keyboard_listener = None
-        if self.mouse_listener:
-            self.mouse_listener.stop()
-            self.mouse_listener = None
+        """取消订阅键盘和鼠标事件"""
+        for token in self.subscriptions:
+            self.input_hub.unsubscribe(token)
+        self.subscriptions = []
+        self.update_mouse_subscription()
+        self.registry.pressed_mask = 0
 
     def set_enabled(self, enabled):
         """设置热键是否启用
@@ -0,0 +1,181 @@
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+# 左右两侧的修饰键视为同一个键，热键字符串中的写法统一为以下名称
+KEY_ALIASES = {
+    "ctrl": "ctrl_l", "ctrl_r": "ctrl_l", "control": "ctrl_l",
+    "shift": "shift_l", "shift_r": "shift_l",
+    "alt": "alt_l", "alt_r": "alt_l", "alt_gr": "alt_l",
+    "meta": "cmd", "cmd_l": "cmd", "cmd_r": "cmd", "win": "cmd"
+}
+
+# 未参与任何热键的按键共用的索引项: [修饰位, 触发表]
+UNBOUND = (0, None)
+
+class HotkeyRegistry:
+    """
+    多热键注册表：把命名的热键编译为整数键码和按触发键索引的组合键表
+
+    每个按键名称只在首次出现时分配一个整数键码；参与组合的修饰键各占一个位，
+    当前按下的修饰键合成一个整数掩码。组合键表以触发键（热键字符串的最后一个键）为索引，
+    值为 {修饰键掩码: 动作名}。处理一个输入事件只需一次按键对象到索引项的字典查找，
+    触发键再查一次掩码（没有完全一致的组合时再查一次不带修饰键的热键），与已注册的热键数量无关。
+    """
+
+    def __init__(self):
+        """初始化热键注册表"""
+        self.bindings = {}     # 动作名 -> 热键字符串
+        self.codes = {}        # 按键名称 -> 整数键码
+        self.entries = {}      # 整数键码 -> [修饰位, 触发表]，重新编译时原地更新
+        self.key_cache = {}    # pynput 按键对象 -> 索引项
+        self.pressed_mask = 0  # 当前按下的修饰键
+
+    def bind(self, action, hotkey):
+        """
+        注册或修改热键，同一组合键已被其他动作使用时，后注册的动作生效
+
+        参数:
+            action (str): 动作名，见 HOTKEY_ACTIONS
+            hotkey (str): 热键字符串，如"F6"或"Ctrl+Shift+C"；为空时取消绑定
+        """
+        if hotkey:
+            self.bindings[action] = hotkey
+        else:
+            self.bindings.pop(action, None)
+        self.compile()
+
+    def unbind(self, action):
+        """取消动作的热键"""
+        self.bind(action, None)
+
+    def get_binding(self, action):
+        """获取动作的热键字符串，未绑定时返回None"""
+        return self.bindings.get(action)
+
+    def get_bindings(self):
+        """获取所有热键绑定"""
+        return dict(self.bindings)
+
+    def intern(self, name):
+        """
+        获取按键名称的整数键码，首次出现时分配
+
+        参数:
+            name (str): 规范化的按键名称
+
+        返回:
+            int: 键码
+        """
+        name = KEY_ALIASES.get(name, name)
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.codes)
+            self.codes[name] = code
+        return code
+
+    def compile(self):
+        """根据当前的热键绑定重建修饰位和组合键表"""
+        triggers = {}
+        bits = {}
+        for action, hotkey in self.bindings.items():
+            codes = [self.intern(name) for name in self.parse_hotkey(hotkey)]
+            if not codes:
+                continue
+            mask = 0
+            for code in codes[:-1]:
+                if code not in bits:
+                    bits[code] = 1 << len(bits)
+                mask |= bits[code]
+            triggers.setdefault(codes[-1], {})[mask] = action
+
+        # 索引项原地更新，已缓存的按键对象无需重新解析
+        for code, entry in self.entries.items():
+            entry[0] = bits.get(code, 0)
+            entry[1] = triggers.get(code)
+        for code in set(bits) | set(triggers):
+            if code not in self.entries:
+                self.entries[code] = [bits.get(code, 0), triggers.get(code)]
+        # 之前未参与热键的按键可能缓存为共用的 UNBOUND，需要重新解析
+        self.key_cache = {key: entry for key, entry in self.key_cache.items() if entry is not UNBOUND}
+        self.pressed_mask = 0
+
+    def lookup(self, key):
+        """获取按键对象对应的索引项，首次出现时解析并缓存"""
+        entry = self.key_cache.get(key)
+        if entry is None:
+            code = self.intern(self.normalize_key(key))
+            entry = self.entries.get(code, UNBOUND)
+            self.key_cache[key] = entry
+        return entry
+
+    def press(self, key):
+        """
+        处理按键或鼠标按钮按下
+
+        参数:
+            key: pynput 的 Key、KeyCode 或 Button
+
+        返回:
+            str: 触发的动作名，未触发时返回None
+        """
+        bit, triggers = self.lookup(key)
+        mask = self.pressed_mask | bit
+        self.pressed_mask = mask
+        if triggers is None:
+            return None
+        action = triggers.get(mask & ~bit)
+        if action is None:
+            # 没有与按下的修饰键完全一致的组合时，不带修饰键的热键仍然生效（如按住Ctrl时按F6）
+            action = triggers.get(0)
+        return action
+
+    def release(self, key):
+        """
+        处理按键或鼠标按钮松开
+
+        参数:
+            key: pynput 的 Key、KeyCode 或 Button
+        """
+        bit = self.lookup(key)[0]
+        if bit:
+            self.pressed_mask &= ~bit
+
+    def uses_mouse(self):
+        """获取是否有热键使用了鼠标按钮"""
+        return any(name.startswith("mouse_") for hotkey in self.bindings.values()
+                   for name in self.parse_hotkey(hotkey))
+
+    def normalize_key(self, key):
+        """
+        把 pynput 按键对象转换为按键名称
+
+        参数:
+            key: pynput 的 Key、KeyCode 或 Button
+
+        返回:
+            str: 按键名称
+        """
+        if isinstance(key, Key):
+            return key.name
+        if isinstance(key, KeyCode):
+            return key.char.lower() if key.char else f"keycode({key.vk})"
+        if isinstance(key, Button):
+            return f"mouse_{key.name}"
+        return str(key)
+
+    def parse_hotkey(self, hotkey_str):
+        """
+        解析热键字符串
+
+        参数:
+            hotkey_str (str): 如"F6"、"Ctrl+Shift+C"或"mouse_middle"
+
+        返回:
+            list: 规范化的按键名称，最后一个为触发键
+        """
+        result = []
+        for part in hotkey_str.split('+'):
+            part = part.strip().lower()
+            if part:
+                result.append(KEY_ALIASES.get(part, part))
+        return result
@@ -0,0 +1,326 @@
+import threading
+import time
+from collections import deque
+
+from pynput import keyboard, mouse
+
+from core.click_backend import SYNTHETIC_EVENTS, SYNTHETIC_EVENT_INDEX
+from utils.constants import SYNTHETIC_EVENT_WINDOW
+
+# 可订阅的输入事件，回调参数与 pynput 监听器相同
+KEY_PRESS = "key_press"          # callback(key)
+KEY_RELEASE = "key_release"      # callback(key)
+MOUSE_MOVE = "mouse_move"        # callback(x, y)
+MOUSE_CLICK = "mouse_click"      # callback(x, y, button, pressed)
+MOUSE_SCROLL = "mouse_scroll"    # callback(x, y, dx, dy)
+INPUT_EVENTS = (KEY_PRESS, KEY_RELEASE, MOUSE_MOVE, MOUSE_CLICK, MOUSE_SCROLL)
+MOUSE_EVENTS = (MOUSE_MOVE, MOUSE_CLICK, MOUSE_SCROLL)
+
+class SyntheticTracker:
+    """
+    记录本程序自己发出、尚未被钩子收到的点击和按键，钩子收到时直接丢弃
+
+    系统钩子的注入标志无法区分注入事件来自哪个进程，屏幕键盘、远程桌面和辅助工具发出的
+    输入也带有该标志，因此所有平台都只抵消本程序登记过的点击，其他输入一律照常分发。
+    点击后端在发出事件前登记，钩子线程按按钮和按下/松开逐个抵消；
+    登记超过 SYNTHETIC_EVENT_WINDOW 仍未收到的事件不再过滤，避免误吞真实点击。
+    每种事件对应一个预先创建的 deque，append 和 popleft 本身是原子操作，登记和抵消都不需要加锁。
+    按键只区分按下和松开：回放发出的按键在钩子中可能以不同的编码出现（如字符与虚拟键码），无法逐键对应。
+    独立进程中的点击引擎无法调用 expect()，它在共享内存中累加已发出的点击数，见 attach_counters()。
+    """
+
+    def __init__(self, window=SYNTHETIC_EVENT_WINDOW):
+        """
+        初始化合成点击记录
+
+        参数:
+            window (float): 登记的有效时间，单位为秒
+        """
+        self.window = window
+        self.enabled = False  # 鼠标钩子未安装时不需要登记
+        self.keys_enabled = False  # 键盘钩子未安装时不需要登记
+        # (按钮名称, 是否按下) -> 待抵消事件的失效时间
+        self.pending = {event: deque() for event in SYNTHETIC_EVENTS}
+        # 是否按下 -> 待抵消按键的失效时间
+        self.pending_keys = {True: deque(), False: deque()}
+        # 点击引擎子进程累加的已发出点击数（共享内存），以及其中已被钩子抵消的数量
+        self.counters = None
+        self.counter_offset = 0
+        self.consumed = [0] * len(SYNTHETIC_EVENTS)
+
+    def expect(self, button, pressed, count=1):
+        """
+        登记即将发出的点击事件，由点击后端调用
+
+        参数:
+            button (str): 按钮名称
+            pressed (bool): 按下为True，松开为False
+            count (int): 事件数
+        """
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.window
+        queue = self.pending[(button, pressed)]
+        for _ in range(count):
+            queue.append(expires)
+
+    def expect_key(self, pressed):
+        """
+        登记即将发出的按键事件，由点击后端调用
+
+        参数:
+            pressed (bool): 按下为True，松开为False
+        """
+        if self.keys_enabled:
+            self.pending_keys[pressed].append(time.monotonic() + self.window)
+
+    def set_enabled(self, enabled):
+        """
+        启用或停用点击的登记，停用时清空待抵消的点击
+
+        参数:
+            enabled (bool): 鼠标钩子是否已安装
+        """
+        self.enabled = enabled
+        if not enabled:
+            for queue in self.pending.values():
+                queue.clear()
+        # 鼠标钩子未安装期间子进程发出的点击不会被钩子收到，不应再抵消
+        self.sync_counters()
+
+    def set_keys_enabled(self, enabled):
+        """
+        启用或停用按键的登记，停用时清空待抵消的按键
+
+        参数:
+            enabled (bool): 键盘钩子是否已安装
+        """
+        self.keys_enabled = enabled
+        if not enabled:
+            for queue in self.pending_keys.values():
+                queue.clear()
+
+    def attach_counters(self, counters, offset=0):
+        """
+        关联点击引擎子进程的已发出点击计数，钩子收到的点击在没有本地登记时按计数抵消
+
+        参数:
+            counters: 共享内存整数数组，按 SYNTHETIC_EVENTS 的顺序存放各事件的累计数
+            offset (int): 计数在数组中的起始位置
+        """
+        self.counters = counters
+        self.counter_offset = offset
+        self.sync_counters()
+
+    def detach_counters(self):
+        """取消关联子进程的点击计数"""
+        self.counters = None
+
+    def sync_counters(self):
+        """把子进程已发出的点击全部视为已抵消"""
+        counters = self.counters
+        if counters is not None:
+            offset = self.counter_offset
+            self.consumed = [counters[offset + index] for index in range(len(SYNTHETIC_EVENTS))]
+
+    def consume(self, button, pressed):
+        """
+        钩子收到点击事件时调用
+
+        参数:
+            button (str): 按钮名称
+            pressed (bool): 按下为True，松开为False
+
+        返回:
+            bool: 该事件是本程序发出的，应丢弃
+        """
+        if self.pop_pending(self.pending.get((button, pressed))):
+            return True
+        counters = self.counters
+        if counters is None:
+            return False
+        index = SYNTHETIC_EVENT_INDEX.get((button, pressed))
+        if index is None or counters[self.counter_offset + index] <= self.consumed[index]:
+            return False
+        self.consumed[index] += 1
+        return True
+
+    def consume_key(self, pressed):
+        """
+        钩子收到按键事件时调用
+
+        参数:
+            pressed (bool): 按下为True，松开为False
+
+        返回:
+            bool: 该事件是本程序发出的，应丢弃
+        """
+        return self.pop_pending(self.pending_keys[pressed])
+
+    def pop_pending(self, queue):
+        """
+        从登记队列中取出一个未失效的登记
+
+        参数:
+            queue (deque): 登记队列，可以为None
+
+        返回:
+            bool: 取到未失效的登记时返回True
+        """
+        if not queue:
+            return False
+        now = time.monotonic()
+        try:
+            while queue.popleft() < now:
+                pass  # 丢弃已失效的登记
+        except IndexError:
+            return False
+        return True
+
+class InputHub:
+    """
+    全局输入事件中心：整个程序只持有一个键盘钩子和一个鼠标钩子，把事件分发给订阅者
+
+    热键、热键设置对话框和宏录制器都通过订阅获取输入，订阅和取消订阅只修改订阅表，
+    不会创建或停止键盘钩子，监听线程数量在程序运行期间保持不变。
+    鼠标钩子只在有鼠标事件订阅者时安装（例如热键使用了鼠标按钮，或正在录制宏），
+    否则自动点击产生的大量点击根本不会进入Python回调。
+    本程序自己发出的点击和按键在进入订阅者之前丢弃：点击后端在 synthetic 中登记后由钩子抵消。
+    订阅表采用写时复制的元组，分发事件时不需要加锁。
+    回调在监听线程中执行，应尽快返回；需要操作界面的订阅者应通过Qt信号转发。
+    """
+
+    def __init__(self):
+        """初始化输入事件中心，钩子在 start() 时安装"""
+        self.lock = threading.Lock()
+        self.subscribers = {event: () for event in INPUT_EVENTS}
+        self.subscriptions = {}  # 订阅编号 -> (事件, 回调)
+        self.next_token = 1
+        self.started = False
+        self.keyboard_listener = None
+        self.mouse_listener = None
+        # 点击后端应把自己发出的点击登记到这里
+        self.synthetic = SyntheticTracker()
+
+    def start(self):
+        """安装键盘钩子，有鼠标事件订阅者时同时安装鼠标钩子；重复调用不会创建新的钩子"""
+        with self.lock:
+            self.started = True
+            if self.keyboard_listener is None:
+                self.keyboard_listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
+                self.keyboard_listener.daemon = True
+                self.keyboard_listener.start()
+                self.synthetic.set_keys_enabled(True)
+            self.update_mouse_hook()
+
+    def stop(self):
+        """卸载钩子，只在程序退出时调用"""
+        with self.lock:
+            self.started = False
+            if self.keyboard_listener is not None:
+                self.keyboard_listener.stop()
+                self.keyboard_listener = None
+                self.synthetic.set_keys_enabled(False)
+            self.update_mouse_hook()
+
+    def update_mouse_hook(self):
+        """按是否有鼠标事件订阅者安装或卸载鼠标钩子，调用方需持有 self.lock"""
+        needed = self.started and any(self.subscribers[event] for event in MOUSE_EVENTS)
+        if needed and self.mouse_listener is None:
+            self.mouse_listener = mouse.Listener(on_move=self.on_move, on_click=self.on_click,
+                                                 on_scroll=self.on_scroll)
+            self.mouse_listener.daemon = True
+            self.mouse_listener.start()
+        elif not needed and self.mouse_listener is not None:
+            self.mouse_listener.stop()
+            self.mouse_listener = None
+        if self.synthetic is not None:
+            self.synthetic.set_enabled(needed)
+
+    def subscribe(self, event, callback):
+        """
+        订阅输入事件
+
+        参数:
+            event (str): 见 INPUT_EVENTS
+            callback (callable): 回调函数，参数与 pynput 监听器的对应回调相同
+
+        返回:
+            int: 订阅编号，用于取消订阅
+        """
+        if event not in self.subscribers:
+            raise ValueError(f"未知的输入事件: {event}")
+        with self.lock:
+            token = self.next_token
+            self.next_token += 1
+            self.subscriptions[token] = (event, callback)
+            self.subscribers[event] = self.subscribers[event] + (callback,)
+            if event in MOUSE_EVENTS:
+                self.update_mouse_hook()
+        return token
+
+    def unsubscribe(self, token):
+        """
+        取消订阅，订阅编号不存在时忽略
+
+        参数:
+            token (int): subscribe() 返回的订阅编号
+        """
+        with self.lock:
+            subscription = self.subscriptions.pop(token, None)
+            if subscription is None:
+                return
+            event, callback = subscription
+            callbacks = list(self.subscribers[event])
+            callbacks.remove(callback)
+            self.subscribers[event] = tuple(callbacks)
+            if event in MOUSE_EVENTS:
+                self.update_mouse_hook()
+
+    def subscriber_count(self, event=None):
+        """
+        获取订阅数
+
+        参数:
+            event (str): 只统计该事件，为None时统计全部
+
+        返回:
+            int: 订阅数
+        """
+        if event is None:
+            return len(self.subscriptions)
+        return len(self.subscribers[event])
+
+    def on_press(self, key):
+        """键盘按下钩子回调"""
+        synthetic = self.synthetic
+        if synthetic is not None and synthetic.consume_key(True):
+            return
+        for callback in self.subscribers[KEY_PRESS]:
+            callback(key)
+
+    def on_release(self, key):
+        """键盘松开钩子回调"""
+        synthetic = self.synthetic
+        if synthetic is not None and synthetic.consume_key(False):
+            return
+        for callback in self.subscribers[KEY_RELEASE]:
+            callback(key)
+
+    def on_move(self, x, y):
+        """鼠标移动钩子回调"""
+        for callback in self.subscribers[MOUSE_MOVE]:
+            callback(x, y)
+
+    def on_click(self, x, y, button, pressed):
+        """鼠标点击钩子回调"""
+        synthetic = self.synthetic
+        if synthetic is not None and synthetic.consume(button.name, pressed):
+            return
+        for callback in self.subscribers[MOUSE_CLICK]:
+            callback(x, y, button, pressed)
+
+    def on_scroll(self, x, y, dx, dy):
+        """鼠标滚动钩子回调"""
+        for callback in self.subscribers[MOUSE_SCROLL]:
+            callback(x, y, dx, dy)
@@ -0,0 +1,122 @@
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from utils.constants import (JITTER_UNIFORM, JITTER_GAUSSIAN, JITTER_LOGNORMAL, JITTER_EMPIRICAL,
+                             JITTER_DISTRIBUTIONS, DEFAULT_JITTER_DISTRIBUTION, DEFAULT_JITTER_PERCENT,
+                             JITTER_BLOCK_SIZE)
+
+class JitterSchedule:
+    """
+    预生成的抖动因子环形缓冲区
+
+    抖动因子按块从引擎自己的随机数生成器中批量生成（可用时使用NumPy向量化），
+    点击循环每次只需读取一个数组元素；相同的种子总是产生相同的序列。
+    实际间隔 = 基础间隔 × 抖动因子。
+    """
+
+    def __init__(self, distribution=DEFAULT_JITTER_DISTRIBUTION, percent=DEFAULT_JITTER_PERCENT,
+                 seed=None, samples=None, block_size=JITTER_BLOCK_SIZE):
+        """
+        初始化抖动序列
+
+        参数:
+            distribution (str): 分布类型，见 JITTER_DISTRIBUTIONS
+            percent (int): 抖动幅度百分比
+            seed (int): 随机种子，为None时随机选择一个并保存在 self.seed 中以便复现
+            samples (list): 录制的真人点击间隔（毫秒），用于 empirical 分布
+            block_size (int): 每次批量生成的因子数
+        """
+        if distribution not in JITTER_DISTRIBUTIONS:
+            distribution = DEFAULT_JITTER_DISTRIBUTION
+        if distribution == JITTER_EMPIRICAL and not samples:
+            # 没有录制数据时退回均匀分布
+            distribution = JITTER_UNIFORM
+
+        self.distribution = distribution
+        self.percent = percent
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.block_size = block_size
+
+        # 经验分布使用归一化到均值为1的样本
+        self.samples = None
+        if samples:
+            mean = sum(samples) / len(samples)
+            self.samples = [s / mean for s in samples]
+
+        if numpy is not None:
+            self.rng = numpy.random.default_rng(self.seed)
+        else:
+            self.rng = random.Random(self.seed)
+
+        self.buffer = []
+        self.index = 0
+
+    def next_factor(self):
+        """
+        获取下一个抖动因子
+
+        返回:
+            float: 乘在基础间隔上的因子
+        """
+        i = self.index
+        if i >= len(self.buffer):
+            self.refill()
+            i = 0
+        self.index = i + 1
+        return self.buffer[i]
+
+    def set_percent(self, percent):
+        """
+        修改抖动幅度，尚未使用的旧因子会被丢弃
+
+        参数:
+            percent (int): 抖动幅度百分比
+        """
+        self.percent = percent
+        self.buffer = []
+        self.index = 0
+
+    def refill(self):
+        """批量生成一块新的抖动因子"""
+        if numpy is not None:
+            self.buffer = self.generate_numpy(self.block_size).tolist()
+        else:
+            self.buffer = self.generate_python(self.block_size)
+        self.index = 0
+
+    def generate_numpy(self, n):
+        """使用NumPy向量化生成 n 个因子"""
+        rng = self.rng
+        p = self.percent / 100.0
+        if self.distribution == JITTER_GAUSSIAN:
+            # 标准差为幅度的一半，截断在 ±幅度 以内
+            return numpy.clip(rng.normal(1.0, p / 2.0, n), 1.0 - p, 1.0 + p)
+        if self.distribution == JITTER_LOGNORMAL:
+            # 均值为1的右偏分布，更接近人类反应时间
+            sigma = p / 2.0
+            return rng.lognormal(-sigma * sigma / 2.0, sigma, n)
+        if self.distribution == JITTER_EMPIRICAL:
+            return rng.choice(numpy.asarray(self.samples), n)
+        return rng.uniform(1.0 - p, 1.0 + p, n)
+
+    def generate_python(self, n):
+        """没有NumPy时使用标准库生成 n 个因子"""
+        rng = self.rng
+        p = self.percent / 100.0
+        if self.distribution == JITTER_GAUSSIAN:
+            low, high = 1.0 - p, 1.0 + p
+            gauss = rng.gauss
+            return [min(high, max(low, gauss(1.0, p / 2.0))) for _ in range(n)]
+        if self.distribution == JITTER_LOGNORMAL:
+            sigma = p / 2.0
+            mu = -sigma * sigma / 2.0
+            lognormvariate = rng.lognormvariate
+            return [lognormvariate(mu, sigma) for _ in range(n)]
+        if self.distribution == JITTER_EMPIRICAL:
+            return rng.choices(self.samples, k=n)
+        uniform = rng.uniform
+        return [uniform(1.0 - p, 1.0 + p) for _ in range(n)]
@@ -1,8 +1,15 @@
+from PyQt5.QtCore import QObject, pyqtSignal
 
 from utils.constants import TRANSLATIONS
 
-class LanguageManager:
-    """语言管理器，负责处理多语言文本"""
+class LanguageManager(QObject):
+    """
+    语言管理器，负责处理多语言文本
+
+    切换语言时发出 language_changed 信号，界面收到后原地重新设置控件文本，不需要重启程序。
+    """
+
+    language_changed = pyqtSignal(str)  # 新的语言代码
 
     def __init__(self, language_code):
         """
@@ -11,6 +18,8 @@ class LanguageManager:
         参数:
             language_code (str): 语言代码，如"zh_CN"或"en_US"
         """
+        super().__init__()
+        self.language_code = None
         self.set_language(language_code)
 
     def set_language(self, language_code):
@@ -20,11 +29,13 @@ class LanguageManager:
         参数:
             language_code (str): 语言代码
         """
-        self.language_code = language_code
-
         # 确保语言代码有效
         if language_code not in TRANSLATIONS:
-            self.language_code = "zh_CN"  # 默认使用中文
+            language_code = "zh_CN"  # 默认使用中文
+
+        if language_code != self.language_code:
+            self.language_code = language_code
+            self.language_changed.emit(language_code)
 
     def get_text(self, key):
         """
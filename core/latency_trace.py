@@ -0,0 +1,205 @@
+import json
+import math
+import time
+from array import array
+
+from utils.constants import LATENCY_TRACE_CAPACITY
+
+# 一次热键触发经过的阶段，按发生顺序排列
+STAGE_HOOK = 0       # 键盘/鼠标钩子回调中匹配到热键（监听线程）
+STAGE_SIGNAL = 1     # 跨线程的Qt信号送达主窗口（GUI线程）
+STAGE_ACTIVATE = 2   # 主窗口唤醒点击引擎（GUI线程）
+STAGE_ENGINE = 3     # 引擎线程（或子进程）从空闲等待中醒来
+STAGE_CLICK = 4      # 首次点击派发
+STAGE_NAMES = ("hook", "signal", "activate", "engine", "click")
+STAGE_COUNT = len(STAGE_NAMES)
+
+# 汇总的区间: (名称, 起始阶段, 结束阶段)
+SEGMENTS = (
+    ("hook->signal", STAGE_HOOK, STAGE_SIGNAL),
+    ("signal->activate", STAGE_SIGNAL, STAGE_ACTIVATE),
+    ("activate->engine", STAGE_ACTIVATE, STAGE_ENGINE),
+    ("engine->click", STAGE_ENGINE, STAGE_CLICK),
+    ("hook->click", STAGE_HOOK, STAGE_CLICK)
+)
+
+def percentile(sorted_values, fraction):
+    """
+    获取已排序序列的分位数
+
+    参数:
+        sorted_values (list): 升序排列的数值
+        fraction (float): 0到1之间的分位
+
+    返回:
+        float: 分位数，序列为空时返回0
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class LatencyTrace:
+    """
+    热键到点击的延迟追踪：记录每次热键触发在各阶段的时间戳，保存在固定大小的环形缓冲区中
+
+    每次触发占一个槽位，各阶段的时间戳按 STAGE_* 顺序存放在同一个浮点数组中，
+    尚未到达的阶段为NaN。begin() 在监听线程中调用，其余阶段在GUI线程中补记，
+    每次写入只是一次数组元素赋值，不需要加锁；时间戳使用 time.perf_counter()，
+    与引擎统计中的启动请求时间可以直接相减。
+    """
+
+    def __init__(self, capacity=LATENCY_TRACE_CAPACITY, clock=time.perf_counter):
+        """
+        初始化延迟追踪
+
+        参数:
+            capacity (int): 保留最近的触发次数
+            clock (callable): 时间来源
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.stamps = array('d', [math.nan]) * (capacity * STAGE_COUNT)
+        self.actions = [None] * capacity
+        self.count = 0      # 累计触发次数，下一次触发的编号
+        self.current = None  # 正在处理的触发编号，热键动作处理完毕后关闭
+
+    def begin(self, action, timestamp=None):
+        """
+        开始记录一次热键触发，由钩子回调调用
+
+        参数:
+            action (str): 触发的动作名
+            timestamp (float): 钩子回调的时间，为None时使用当前时间
+
+        返回:
+            int: 触发编号
+        """
+        trace_id = self.count
+        offset = (trace_id % self.capacity) * STAGE_COUNT
+        stamps = self.stamps
+        for stage in range(1, STAGE_COUNT):
+            stamps[offset + stage] = math.nan
+        stamps[offset] = timestamp if timestamp is not None else self.clock()
+        self.actions[trace_id % self.capacity] = action
+        self.count = trace_id + 1
+        return trace_id
+
+    def open(self):
+        """
+        把最近一次触发设为正在处理，在GUI线程收到热键信号时调用，同时记录信号送达时间
+
+        返回:
+            int: 触发编号，没有触发记录时返回None
+        """
+        if not self.count:
+            return None
+        self.current = self.count - 1
+        self.mark(STAGE_SIGNAL, trace_id=self.current)
+        return self.current
+
+    def close(self):
+        """热键动作处理完毕，之后的阶段不再记入该次触发"""
+        self.current = None
+
+    def mark(self, stage, timestamp=None, trace_id=None):
+        """
+        记录阶段时间戳，同一阶段只记录第一次
+
+        参数:
+            stage (int): 见 STAGE_*
+            timestamp (float): 时间戳，为None时使用当前时间
+            trace_id (int): 触发编号，为None时使用正在处理的触发
+
+        返回:
+            int: 记入的触发编号；没有正在处理的触发，或该触发已被环形缓冲区覆盖时返回None
+        """
+        if trace_id is None:
+            trace_id = self.current
+        if trace_id is None or trace_id < self.count - self.capacity:
+            return None
+        index = (trace_id % self.capacity) * STAGE_COUNT + stage
+        if math.isnan(self.stamps[index]):
+            self.stamps[index] = timestamp if timestamp is not None else self.clock()
+        return trace_id
+
+    def records(self):
+        """
+        获取缓冲区中的触发记录，按触发顺序排列
+
+        返回:
+            list: 每项为 {"id", "action", 各阶段相对钩子回调的时间（秒），未到达的阶段为None}
+        """
+        result = []
+        stamps = self.stamps[:]
+        for trace_id in range(max(0, self.count - self.capacity), self.count):
+            offset = (trace_id % self.capacity) * STAGE_COUNT
+            origin = stamps[offset]
+            record = {"id": trace_id, "action": self.actions[trace_id % self.capacity]}
+            for stage, name in enumerate(STAGE_NAMES):
+                value = stamps[offset + stage]
+                record[name] = None if math.isnan(value) else value - origin
+            result.append(record)
+        return result
+
+    def summary(self):
+        """
+        按区间汇总延迟分位数，只统计两端阶段都已记录的触发
+
+        返回:
+            dict: 区间名 -> {"count", "p50", "p90", "p99", "max"}，时间单位为秒
+        """
+        records = self.records()
+        result = {}
+        for name, first, last in SEGMENTS:
+            first_name = STAGE_NAMES[first]
+            last_name = STAGE_NAMES[last]
+            values = sorted(r[last_name] - r[first_name] for r in records
+                            if r[first_name] is not None and r[last_name] is not None)
+            result[name] = {
+                "count": len(values),
+                "p50": percentile(values, 0.50),
+                "p90": percentile(values, 0.90),
+                "p99": percentile(values, 0.99),
+                "max": values[-1] if values else 0.0
+            }
+        return result
+
+    def format_report(self):
+        """
+        生成文本形式的汇总，用于调试窗口
+
+        返回:
+            str: 每个区间一行的分位数（毫秒），没有触发记录时返回空字符串
+        """
+        if not self.count:
+            return ""
+        lines = [f"{'':<18}{'n':>5}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for name, values in self.summary().items():
+            lines.append(f"{name:<18}{values['count']:>5}" +
+                         "".join(f"{values[key] * 1000:>9.3f}" for key in ("p50", "p90", "p99", "max")))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        把汇总和原始记录导出为JSON文件
+
+        参数:
+            path (str): 输出路径
+
+        返回:
+            bool: 是否成功导出
+        """
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "triggers": self.count,
+            "summary": self.summary(),
+            "records": self.records()
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"导出延迟统计出错: {e}")
+            return False
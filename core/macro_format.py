@@ -0,0 +1,108 @@
+import struct
+from array import array
+
+# 宏文件格式（小端）:
+#   文件头: 魔数 b"MACR"、版本(uint16)、保留(uint16)、事件数(uint64)，共16字节
+#   随后按 MACRO_COLUMNS 的顺序依次存放各列，每列连续存放并按8字节对齐，
+#   因此回放时可以把文件映射到内存后直接按列访问，不需要逐个解析事件。
+MACRO_MAGIC = b"MACR"
+MACRO_VERSION = 2
+HEADER = struct.Struct("<4sHHQ")
+
+# 列名与类型码：时间(秒，相对录制开始)、事件类型、坐标、编码、附加值
+# 坐标使用32位整数：多显示器的虚拟桌面坐标可能超出16位整数的范围
+MACRO_COLUMNS = (
+    ("time", 'd'),
+    ("kind", 'B'),
+    ("x", 'i'),
+    ("y", 'i'),
+    ("code", 'i'),
+    ("value", 'h')
+)
+# 各版本文件的列，旧版本文件仍可回放
+MACRO_COLUMNS_BY_VERSION = {
+    1: (("time", 'd'), ("kind", 'B'), ("x", 'h'), ("y", 'h'), ("code", 'i'), ("value", 'h')),
+    2: MACRO_COLUMNS
+}
+
+# 事件类型
+EVENT_MOVE = 1         # x, y
+EVENT_PRESS = 2        # x, y, code=按钮编号
+EVENT_RELEASE = 3      # x, y, code=按钮编号
+EVENT_SCROLL = 4       # x, y, code=水平滚动, value=垂直滚动
+EVENT_KEY_DOWN = 5     # code=按键编码, value=编码方式
+EVENT_KEY_UP = 6       # code=按键编码, value=编码方式
+
+# 鼠标按钮编号
+MACRO_BUTTONS = ("left", "right", "middle", "x1", "x2")
+BUTTON_INDEX = {name: index for index, name in enumerate(MACRO_BUTTONS)}
+
+# 按键编码方式
+KEY_SPECIAL = 1  # code 为 pynput.keyboard.Key 的成员名在 SPECIAL_KEYS 中的下标
+KEY_VK = 2       # code 为虚拟键码
+KEY_CHAR = 3     # code 为字符的Unicode码位
+
+# 跨平台固定顺序的特殊键名称，只能在末尾追加
+SPECIAL_KEYS = (
+    "alt", "alt_l", "alt_r", "alt_gr", "backspace", "caps_lock", "cmd", "cmd_l", "cmd_r",
+    "ctrl", "ctrl_l", "ctrl_r", "delete", "down", "end", "enter", "esc", "home", "left",
+    "page_down", "page_up", "right", "shift", "shift_l", "shift_r", "space", "tab", "up",
+    "insert", "menu", "num_lock", "pause", "print_screen", "scroll_lock",
+    "media_play_pause", "media_volume_mute", "media_volume_down", "media_volume_up",
+    "media_previous", "media_next"
+) + tuple(f"f{i}" for i in range(1, 21))
+SPECIAL_KEY_INDEX = {name: index for index, name in enumerate(SPECIAL_KEYS)}
+
+def column_offsets(count, version=MACRO_VERSION):
+    """
+    计算各列在文件中的偏移
+
+    参数:
+        count (int): 事件数
+        version (int): 文件版本
+
+    返回:
+        list: 每列的 (列名, 类型码, 偏移, 字节数)
+    """
+    offsets = []
+    offset = HEADER.size
+    for name, typecode in MACRO_COLUMNS_BY_VERSION[version]:
+        size = array(typecode).itemsize * count
+        offsets.append((name, typecode, offset, size))
+        offset += (size + 7) & ~7
+    return offsets
+
+def write_macro(path, columns):
+    """
+    把按列存放的事件写入宏文件
+
+    参数:
+        path (str): 文件路径
+        columns (dict): 列名到 array 的映射，各列长度相同
+    """
+    count = len(columns["time"])
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MACRO_MAGIC, MACRO_VERSION, 0, count))
+        for name, typecode, offset, size in column_offsets(count):
+            data = columns[name].tobytes()
+            f.write(data)
+            padding = ((size + 7) & ~7) - size
+            if padding:
+                f.write(bytes(padding))
+
+def read_header(buffer):
+    """
+    解析宏文件头
+
+    参数:
+        buffer: 支持缓冲区协议的对象（如 mmap）
+
+    返回:
+        tuple: (事件数, 文件版本)
+    """
+    magic, version, _, count = HEADER.unpack_from(buffer, 0)
+    if magic != MACRO_MAGIC:
+        raise ValueError("不是有效的宏文件")
+    if version not in MACRO_COLUMNS_BY_VERSION:
+        raise ValueError(f"不支持的宏文件版本: {version}")
+    return count, version
@@ -0,0 +1,279 @@
+import mmap
+import threading
+import time
+
+from core.engine_stats import LatencyHistogram
+from core.macro_format import (column_offsets, read_header, MACRO_BUTTONS, EVENT_MOVE, EVENT_PRESS,
+                               EVENT_RELEASE, EVENT_SCROLL, EVENT_KEY_DOWN, EVENT_KEY_UP)
+from utils.constants import SPIN_THRESHOLD, MIN_PLAYBACK_SPEED, MAX_PLAYBACK_SPEED
+
+class MacroPlayer:
+    """
+    宏回放引擎：把宏文件映射到内存，按列直接读取事件并在精确的单调时钟截止时间上发送
+
+    文件不会被整体读入，也不会转换成Python对象列表：打开文件只需映射并解析16字节的文件头，
+    因此数小时的宏也能立即开始回放，内存占用与文件长度无关（页面由操作系统按需换入换出）。
+    回放支持速度倍率和循环，并用直方图记录每个事件相对截止时间的误差。
+    """
+
+    def __init__(self, backend, spin_threshold=SPIN_THRESHOLD, clock=time.perf_counter, sleeper=None):
+        """
+        初始化宏回放引擎
+
+        参数:
+            backend (ClickBackend): 用于发送事件的后端
+            spin_threshold (float): 截止前改为忙等待的时间，单位为秒
+            clock (callable): 单调时钟，单位为秒
+            sleeper (callable): 等待到给定截止时间的函数，返回False表示停止回放；
+                为None时使用可打断的实时等待，见 TimingEngine
+        """
+        self.backend = backend
+        self.clock = clock
+        self.sleeper = sleeper
+        self.spin_threshold = spin_threshold
+        self.condition = threading.Condition()
+        self.running = False
+        self.file = None
+        self.map = None
+        self.view = None
+        self.columns = None
+        self.count = 0
+        self.speed = 1.0
+        self.base_time = 0.0  # 当前循环中时间0对应的 perf_counter 时间
+
+        # 正在按下的按钮和按键，停止时统一松开
+        self.held_buttons = set()
+        self.held_keys = set()
+
+        # 统计
+        self.error = LatencyHistogram()
+        self.events_played = 0
+        self.loops_done = 0
+        self.position = 0
+
+    def open(self, path):
+        """
+        打开宏文件
+
+        参数:
+            path (str): 宏文件路径
+        """
+        self.close()
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            # 提示系统顺序读取，已回放的页面可以尽早回收
+            self.map.madvise(mmap.MADV_SEQUENTIAL)
+
+        self.count, version = read_header(self.map)
+        self.view = memoryview(self.map)
+        self.columns = {}
+        for name, typecode, offset, size in column_offsets(self.count, version):
+            self.columns[name] = self.view[offset:offset + size].cast(typecode)
+        self.arm()
+
+    def arm(self):
+        """
+        准备回放：open() 会自动调用，再次回放同一文件前需重新调用
+
+        在回放开始前调用的 stop() 不会被 play() 覆盖，回放将直接结束。
+        """
+        with self.condition:
+            self.running = True
+
+    def close(self):
+        """关闭宏文件"""
+        if self.columns is not None:
+            for column in self.columns.values():
+                column.release()
+            self.columns = None
+        if self.view is not None:
+            # 映射在所有视图释放后才能关闭
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.count = 0
+
+    def get_duration(self):
+        """获取宏的时长（秒，按原速）"""
+        if not self.count:
+            return 0.0
+        return self.columns["time"][self.count - 1]
+
+    def play(self, loops=1, speed=1.0):
+        """
+        回放已打开的宏，阻塞直到回放完成或 stop() 被调用；回放结束后需调用 arm() 才能再次回放
+
+        参数:
+            loops (int): 循环次数，0表示无限循环
+            speed (float): 速度倍率，2表示两倍速
+        """
+        if not self.count:
+            return
+
+        clock = self.clock
+        times = self.columns["time"]
+        kinds = self.columns["kind"]
+        xs = self.columns["x"]
+        ys = self.columns["y"]
+        codes = self.columns["code"]
+        values = self.columns["value"]
+        record_error = self.error.record
+        handlers = self.make_handlers()
+        count = self.count
+
+        with self.condition:
+            self.speed = min(MAX_PLAYBACK_SPEED, max(MIN_PLAYBACK_SPEED, speed))
+            self.error.reset()
+            self.events_played = 0
+            self.loops_done = 0
+
+        try:
+            while self.running and (loops == 0 or self.loops_done < loops):
+                with self.condition:
+                    self.base_time = clock()
+                for i in range(count):
+                    self.position = i
+                    event_time = times[i]
+                    if not self.wait_until(event_time):
+                        return
+                    deadline = self.base_time + event_time / self.speed
+                    now = clock()
+                    handlers[kinds[i]](xs[i], ys[i], codes[i], values[i])
+                    record_error(now - deadline)
+                    self.events_played += 1
+                self.loops_done += 1
+        finally:
+            self.release_held()
+            self.running = False
+
+    def wait_until(self, event_time):
+        """
+        等待到事件的截止时间；速度修改后截止时间会重新计算
+
+        参数:
+            event_time (float): 事件在宏中的时间（秒，按原速）
+
+        返回:
+            bool: 到达截止时间返回True，被停止时返回False
+        """
+        if self.sleeper is not None:
+            if self.running and not self.sleeper(self.base_time + event_time / self.speed):
+                self.running = False
+            return self.running
+
+        clock = self.clock
+        condition = self.condition
+        spin_threshold = self.spin_threshold
+        with condition:
+            while self.running:
+                remaining = self.base_time + event_time / self.speed - clock() - spin_threshold
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+        while self.running and clock() < self.base_time + event_time / self.speed:
+            pass
+        return self.running
+
+    def make_handlers(self):
+        """
+        按事件类型生成分发表，回放循环中只需一次下标访问
+
+        返回:
+            list: 以事件类型为下标的处理函数
+        """
+        backend = self.backend
+        held_buttons = self.held_buttons
+        held_keys = self.held_keys
+
+        def ignore(x, y, code, value):
+            pass
+
+        def move(x, y, code, value):
+            backend.move(x, y)
+
+        def press(x, y, code, value):
+            button = MACRO_BUTTONS[code]
+            backend.move(x, y)
+            backend.press(button)
+            held_buttons.add(button)
+
+        def release(x, y, code, value):
+            button = MACRO_BUTTONS[code]
+            backend.move(x, y)
+            backend.release(button)
+            held_buttons.discard(button)
+
+        def scroll(x, y, code, value):
+            backend.move(x, y)
+            backend.scroll(code, value)
+
+        def key_down(x, y, code, value):
+            backend.key_down(code, value)
+            held_keys.add((code, value))
+
+        def key_up(x, y, code, value):
+            backend.key_up(code, value)
+            held_keys.discard((code, value))
+
+        handlers = [ignore] * 256
+        handlers[EVENT_MOVE] = move
+        handlers[EVENT_PRESS] = press
+        handlers[EVENT_RELEASE] = release
+        handlers[EVENT_SCROLL] = scroll
+        handlers[EVENT_KEY_DOWN] = key_down
+        handlers[EVENT_KEY_UP] = key_up
+        return handlers
+
+    def release_held(self):
+        """松开回放中仍处于按下状态的按钮和按键"""
+        for button in list(self.held_buttons):
+            self.backend.release(button)
+        for code, encoding in list(self.held_keys):
+            self.backend.key_up(code, encoding)
+        self.held_buttons.clear()
+        self.held_keys.clear()
+
+    def set_speed(self, speed):
+        """
+        修改回放速度，当前位置保持不变
+
+        参数:
+            speed (float): 速度倍率
+        """
+        speed = min(MAX_PLAYBACK_SPEED, max(MIN_PLAYBACK_SPEED, speed))
+        with self.condition:
+            if self.running and self.count:
+                # 以当前时刻在宏中的位置为基准重新计算时间原点
+                now = self.clock()
+                position = (now - self.base_time) * self.speed
+                self.base_time = now - position / speed
+            self.speed = speed
+            self.condition.notify_all()
+
+    def stop(self):
+        """停止回放，正在等待的回放线程会被立即唤醒"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def get_stats(self):
+        """
+        获取回放统计
+
+        返回:
+            dict: 已回放事件数、完成的循环数、当前位置和事件定时误差分位数（秒）
+        """
+        return {
+            "events_played": self.events_played,
+            "loops_done": self.loops_done,
+            "position": self.position,
+            "event_count": self.count,
+            "speed": self.speed,
+            "error": self.error.snapshot()
+        }
@@ -0,0 +1,243 @@
+import threading
+import time
+from array import array
+
+from pynput.keyboard import Key, KeyCode
+
+from core.input_hub import KEY_PRESS, KEY_RELEASE, MOUSE_MOVE, MOUSE_CLICK, MOUSE_SCROLL
+from core.macro_format import (MACRO_COLUMNS, EVENT_MOVE, EVENT_PRESS, EVENT_RELEASE, EVENT_SCROLL,
+                               EVENT_KEY_DOWN, EVENT_KEY_UP, BUTTON_INDEX, KEY_SPECIAL, KEY_VK, KEY_CHAR,
+                               SPECIAL_KEY_INDEX, write_macro)
+from utils.constants import MACRO_MOVE_INTERVAL
+
+class MacroRecorder:
+    """
+    宏录制器：通过输入事件中心捕获鼠标移动、点击、滚动和键盘事件
+
+    事件按列存放在 array 中（列式结构），每个事件只占十几个字节，
+    记录一个事件只是几次数组追加，不会创建字典或事件对象。
+    鼠标移动可以按最小时间间隔降采样，点击前会补记被丢弃的最后一个位置，保证点击坐标准确。
+    """
+
+    def __init__(self, input_hub, record_moves=True, move_interval=MACRO_MOVE_INTERVAL):
+        """
+        初始化宏录制器
+
+        参数:
+            input_hub (InputHub): 全局输入事件中心
+            record_moves (bool): 是否记录鼠标移动
+            move_interval (float): 记录鼠标移动的最小时间间隔（秒），0表示不降采样
+        """
+        self.record_moves = record_moves
+        self.move_interval = move_interval
+        self.lock = threading.Lock()  # 键盘和鼠标回调来自不同的监听线程
+        self.input_hub = input_hub
+        self.subscriptions = []
+        self.recording = False
+        self.clear()
+
+    def clear(self):
+        """清空已录制的事件"""
+        self.columns = {name: array(typecode) for name, typecode in MACRO_COLUMNS}
+        self.start_time = 0.0
+        self.last_move_time = -1.0
+        self.pending_move = None  # 因降采样而未记录的最后一次移动
+        self.dropped_moves = 0
+
+    def start(self):
+        """开始录制，会清空之前的录制内容"""
+        if self.recording:
+            return
+        self.clear()
+        self.start_time = time.perf_counter()
+        self.recording = True
+
+        hub = self.input_hub
+        self.subscriptions = [
+            hub.subscribe(KEY_PRESS, self.on_press),
+            hub.subscribe(KEY_RELEASE, self.on_release),
+            hub.subscribe(MOUSE_CLICK, self.on_click),
+            hub.subscribe(MOUSE_SCROLL, self.on_scroll)
+        ]
+        if self.record_moves:
+            self.subscriptions.append(hub.subscribe(MOUSE_MOVE, self.on_move))
+
+    def stop(self):
+        """停止录制"""
+        self.recording = False
+        for token in self.subscriptions:
+            self.input_hub.unsubscribe(token)
+        self.subscriptions = []
+
+    def is_recording(self):
+        """获取是否正在录制"""
+        return self.recording
+
+    def append(self, kind, x=0, y=0, code=0, value=0, timestamp=None):
+        """
+        追加一个事件，调用方需持有 self.lock
+
+        参数:
+            kind (int): 事件类型
+            x (int): 横坐标
+            y (int): 纵坐标
+            code (int): 按钮或按键编码
+            value (int): 附加值
+            timestamp (float): 时间，为None时使用当前时间
+        """
+        columns = self.columns
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        columns["time"].append(timestamp - self.start_time)
+        columns["kind"].append(kind)
+        columns["x"].append(x)
+        columns["y"].append(y)
+        columns["code"].append(code)
+        columns["value"].append(value)
+
+    def flush_pending_move(self):
+        """补记降采样时丢弃的最后一次移动，调用方需持有 self.lock"""
+        pending = self.pending_move
+        if pending is not None:
+            self.pending_move = None
+            self.append(EVENT_MOVE, pending[1], pending[2], timestamp=pending[0])
+            self.last_move_time = pending[0]
+
+    def on_move(self, x, y):
+        """鼠标移动回调"""
+        if not self.recording:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            if now - self.last_move_time < self.move_interval:
+                if self.pending_move is not None:
+                    self.dropped_moves += 1
+                self.pending_move = (now, int(x), int(y))
+                return
+            self.pending_move = None
+            self.last_move_time = now
+            self.append(EVENT_MOVE, int(x), int(y), timestamp=now)
+
+    def on_click(self, x, y, button, pressed):
+        """鼠标点击回调"""
+        if not self.recording:
+            return
+        code = BUTTON_INDEX.get(button.name)
+        if code is None:
+            return
+        with self.lock:
+            self.flush_pending_move()
+            self.append(EVENT_PRESS if pressed else EVENT_RELEASE, int(x), int(y), code)
+
+    def on_scroll(self, x, y, dx, dy):
+        """鼠标滚动回调"""
+        if not self.recording:
+            return
+        with self.lock:
+            self.flush_pending_move()
+            self.append(EVENT_SCROLL, int(x), int(y), int(dx), int(dy))
+
+    def on_press(self, key):
+        """键盘按下回调"""
+        self.record_key(EVENT_KEY_DOWN, key)
+
+    def on_release(self, key):
+        """键盘松开回调"""
+        self.record_key(EVENT_KEY_UP, key)
+
+    def record_key(self, kind, key):
+        """记录一个键盘事件"""
+        if not self.recording:
+            return
+        encoded = self.encode_key(key)
+        if encoded is None:
+            return
+        with self.lock:
+            self.append(kind, code=encoded[0], value=encoded[1])
+
+    def encode_key(self, key):
+        """
+        把 pynput 按键编码为 (编码, 编码方式)
+
+        返回:
+            tuple: (code, value)，无法编码时返回None
+        """
+        if isinstance(key, Key):
+            index = SPECIAL_KEY_INDEX.get(key.name)
+            if index is not None:
+                return index, KEY_SPECIAL
+            key = key.value
+        if isinstance(key, KeyCode):
+            if key.vk is not None:
+                return key.vk, KEY_VK
+            if key.char:
+                return ord(key.char), KEY_CHAR
+        return None
+
+    def trim_hotkey_inputs(self):
+        """
+        去掉开始和停止录制的热键留下的事件，在停止录制后、保存之前调用
+
+        开始录制的热键只留下松开事件（按下发生在录制开始之前），停止录制的热键只留下按下事件
+        （松开发生在录制停止之后）。去掉所有没有对应按下的松开事件，以及末尾停止时仍按住的按键和按钮，
+        否则回放时会再次按下录制热键。
+        """
+        with self.lock:
+            self.flush_pending_move()
+            columns = self.columns
+            kinds = columns["kind"]
+            codes = columns["code"]
+            values = columns["value"]
+            count = len(kinds)
+
+            def input_id(i):
+                kind = kinds[i]
+                if kind == EVENT_KEY_DOWN or kind == EVENT_KEY_UP:
+                    return "key", codes[i], values[i]
+                if kind == EVENT_PRESS or kind == EVENT_RELEASE:
+                    return "button", codes[i]
+                return None
+
+            keep = [True] * count
+            held = set()
+            for i in range(count):
+                kind = kinds[i]
+                if kind == EVENT_KEY_DOWN or kind == EVENT_PRESS:
+                    held.add(input_id(i))
+                elif kind == EVENT_KEY_UP or kind == EVENT_RELEASE:
+                    identity = input_id(i)
+                    if identity in held:
+                        held.discard(identity)
+                    else:
+                        keep[i] = False
+            for i in range(count - 1, -1, -1):
+                kind = kinds[i]
+                if kind == EVENT_MOVE:
+                    continue
+                if (kind == EVENT_KEY_DOWN or kind == EVENT_PRESS) and input_id(i) in held:
+                    keep[i] = False
+                else:
+                    break
+
+            if not all(keep):
+                self.columns = {name: array(column.typecode, (value for value, kept in zip(column, keep) if kept))
+                                for name, column in columns.items()}
+
+    def event_count(self):
+        """获取已录制的事件数"""
+        return len(self.columns["time"])
+
+    def memory_bytes(self):
+        """获取录制内容占用的内存字节数（不含数组预留空间）"""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    def save(self, path):
+        """
+        把录制内容保存为宏文件
+
+        参数:
+            path (str): 文件路径
+        """
+        with self.lock:
+            self.flush_pending_move()
+            write_macro(path, self.columns)
@@ -0,0 +1,419 @@
+import multiprocessing
+import threading
+import time
+from functools import partial
+
+from core.click_backend import create_backend, SYNTHETIC_EVENTS, SYNTHETIC_EVENT_INDEX
+from core.click_sequence import compile_sequence, SequenceInterpreter
+from core.timing_engine import TimingEngine
+from utils.constants import (CATCH_UP_POLICIES, DEFAULT_CATCH_UP_POLICY, JITTER_DISTRIBUTIONS,
+                             DEFAULT_JITTER_DISTRIBUTION, PROCESS_STATS_PUBLISH_INTERVAL,
+                             PROCESS_PARENT_CHECK_INTERVAL)
+
+# 控制块布局：整数区
+I_GENERATION = 0       # 每次修改控制参数后递增
+I_RUN_STATE = 1        # 期望的运行状态，见 STATE_*
+I_START_SEQ = 2        # 每次启动递增，用于区分连续的两次启动
+I_JITTER_ENABLED = 3
+I_JITTER_PERCENT = 4
+I_CATCH_UP = 5         # CATCH_UP_POLICIES 中的下标
+I_DISTRIBUTION = 6     # JITTER_DISTRIBUTIONS 中的下标
+I_READY = 7            # 子进程完成初始化后置1
+I_ACTIVE = 8           # 子进程中引擎的实际运行状态
+I_CLICK_COUNT = 9
+I_SKIPPED = 10
+I_HAS_START_LATENCY = 11
+I_JITTER_SEED = 12
+I_APPLIED_SEQ = 13     # 子进程最近一次执行的启动序号
+I_FINISHED_SEQ = 14    # 点击序列执行完毕的启动序号
+I_PAUSED = 15          # 期望的暂停状态
+I_HAS_WAKE_LATENCY = 16
+I_SYNTHETIC = 17       # 子进程已发出的各按钮按下/松开事件数，按 SYNTHETIC_EVENTS 的顺序
+INT_FIELDS = I_SYNTHETIC + len(SYNTHETIC_EVENTS)
+
+# 控制块布局：浮点区
+D_INTERVAL = 0         # 点击间隔，单位为毫秒
+D_REQUESTED_AT = 1     # 启动请求时间（time.perf_counter，系统范围的单调时钟）
+D_START_TIME = 2
+D_START_LATENCY = 3
+D_LAST_DRIFT = 4
+D_MEAN_DRIFT = 5
+D_WAKE_LATENCY = 6
+D_HISTOGRAMS = 8       # 延迟、周期、漂移直方图的分位数，每个占 len(HISTOGRAM_KEYS) 个位置
+HISTOGRAM_NAMES = ("latency", "period", "drift")
+HISTOGRAM_KEYS = ("count", "p50", "p90", "p99", "p999", "max")
+DOUBLE_FIELDS = D_HISTOGRAMS + len(HISTOGRAM_NAMES) * len(HISTOGRAM_KEYS)
+
+# 运行状态
+STATE_IDLE = 0
+STATE_ACTIVE = 1
+STATE_SHUTDOWN = 2
+
+class SyntheticCounter:
+    """
+    子进程中代替 SyntheticTracker 的登记对象：把即将发出的点击累加到控制块，
+    父进程的输入钩子按计数抵消，见 SyntheticTracker.attach_counters()
+    """
+
+    def __init__(self, ints):
+        """
+        初始化点击计数
+
+        参数:
+            ints (RawArray): 控制块整数区
+        """
+        self.ints = ints
+
+    def expect(self, button, pressed, count=1):
+        """登记即将发出的点击事件，在发出之前累加，父进程的钩子收到事件时计数已更新"""
+        self.ints[I_SYNTHETIC + SYNTHETIC_EVENT_INDEX[(button, pressed)]] += count
+
+    def expect_key(self, pressed):
+        """子进程中的点击引擎不发送按键"""
+
+def engine_process_main(ints, doubles, doorbell, backend_name, jitter_samples, sequence_source=None,
+                        sequence_receiver=None):
+    """
+    点击引擎子进程入口：按控制块中的参数运行定时引擎，并把统计写回控制块
+
+    参数:
+        ints (RawArray): 控制块整数区
+        doubles (RawArray): 控制块浮点区
+        doorbell (Event): 父进程修改控制块后置位，用于唤醒子进程
+        backend_name (str): 点击后端名称
+        jitter_samples (list): 录制的真人点击间隔（毫秒）
+        sequence_source (str): 点击序列源码，在子进程中编译
+        sequence_receiver (Connection): 父进程之后发送的新点击序列源码
+    """
+    backend = create_backend(backend_name, SyntheticCounter(ints))
+    seed = ints[I_JITTER_SEED]
+    engine = TimingEngine(
+        doubles[D_INTERVAL],
+        bool(ints[I_JITTER_ENABLED]),
+        ints[I_JITTER_PERCENT],
+        CATCH_UP_POLICIES[ints[I_CATCH_UP]],
+        jitter_distribution=JITTER_DISTRIBUTIONS[ints[I_DISTRIBUTION]],
+        jitter_seed=seed if seed >= 0 else None,
+        jitter_samples=jitter_samples
+    )
+    set_sequence_source(engine, backend, sequence_source)
+
+    watcher = threading.Thread(target=watch_control_block,
+                               args=(engine, backend, ints, doubles, doorbell, jitter_samples, sequence_receiver),
+                               daemon=True)
+    publisher = threading.Thread(target=publish_stats, args=(engine, ints, doubles), daemon=True)
+    watcher.start()
+    publisher.start()
+    ints[I_READY] = 1
+
+    # 引擎在子进程主线程上运行，不受GUI进程的GIL影响
+    engine.serve(partial(backend.click, "left"))
+
+def set_sequence_source(engine, backend, source):
+    """
+    在子进程中编译点击序列并交给引擎，下一次开始点击时生效
+
+    参数:
+        engine (TimingEngine): 定时引擎
+        backend (ClickBackend): 点击后端
+        source (str): 点击序列源码，为空时恢复连续单击
+    """
+    if not source:
+        engine.set_sequence(None)
+        return
+    try:
+        engine.set_sequence(SequenceInterpreter(compile_sequence(source), backend))
+    except ValueError as e:
+        print(f"点击序列无效: {e}")
+        engine.set_sequence(None)
+
+def watch_control_block(engine, backend, ints, doubles, doorbell, jitter_samples, sequence_receiver=None):
+    """在子进程中等待门铃，并把控制块中的变化和新的点击序列应用到引擎"""
+    parent = multiprocessing.parent_process()
+    last_generation = -1
+    last_start_seq = 0  # 子进程启动前父进程就可能已经请求启动
+    interval = doubles[D_INTERVAL]
+    jitter_enabled = ints[I_JITTER_ENABLED]
+    jitter_percent = ints[I_JITTER_PERCENT]
+    catch_up = ints[I_CATCH_UP]
+    distribution = ints[I_DISTRIBUTION]
+    paused = 0
+
+    while True:
+        if not doorbell.wait(PROCESS_PARENT_CHECK_INTERVAL):
+            if parent is not None and not parent.is_alive():
+                engine.shutdown()
+                return
+            continue
+        # 先清除门铃再读取，读取期间的修改会再次按响门铃，不会丢失
+        doorbell.clear()
+
+        generation = ints[I_GENERATION]
+        if generation == last_generation:
+            continue
+        last_generation = generation
+
+        if doubles[D_INTERVAL] != interval:
+            interval = doubles[D_INTERVAL]
+            engine.set_interval(interval)
+        if ints[I_JITTER_ENABLED] != jitter_enabled:
+            jitter_enabled = ints[I_JITTER_ENABLED]
+            engine.set_jitter_enabled(bool(jitter_enabled))
+        if ints[I_JITTER_PERCENT] != jitter_percent:
+            jitter_percent = ints[I_JITTER_PERCENT]
+            engine.set_jitter_percent(jitter_percent)
+        if ints[I_CATCH_UP] != catch_up:
+            catch_up = ints[I_CATCH_UP]
+            engine.set_catch_up_policy(CATCH_UP_POLICIES[catch_up])
+        if ints[I_DISTRIBUTION] != distribution:
+            distribution = ints[I_DISTRIBUTION]
+            engine.set_jitter_distribution(JITTER_DISTRIBUTIONS[distribution], jitter_samples)
+        if sequence_receiver is not None and sequence_receiver.poll():
+            # 连续修改时只编译最新的源码
+            source = sequence_receiver.recv()
+            while sequence_receiver.poll():
+                source = sequence_receiver.recv()
+            set_sequence_source(engine, backend, source)
+
+        state = ints[I_RUN_STATE]
+        if state == STATE_SHUTDOWN:
+            engine.shutdown()
+            return
+        start_seq = ints[I_START_SEQ]
+        if state == STATE_ACTIVE and start_seq != last_start_seq:
+            last_start_seq = start_seq
+            ints[I_APPLIED_SEQ] = start_seq
+            engine.start(doubles[D_REQUESTED_AT])
+        elif state == STATE_IDLE and engine.running:
+            engine.stop()
+        if ints[I_PAUSED] != paused:
+            paused = ints[I_PAUSED]
+            if paused:
+                engine.pause()
+            else:
+                engine.resume()
+
+def publish_stats(engine, ints, doubles):
+    """在子进程中定期把引擎统计写入控制块，父进程读取时无需任何往返通信"""
+    last_count = -1
+    while True:
+        time.sleep(PROCESS_STATS_PUBLISH_INTERVAL)
+        stats = engine.stats
+        ints[I_ACTIVE] = int(engine.running)
+        if engine.sequence_completed:
+            ints[I_FINISHED_SEQ] = ints[I_APPLIED_SEQ]
+        if not engine.running and stats.click_count == last_count:
+            # 空闲且没有新的点击，无需重新计算分位数
+            continue
+        last_count = stats.click_count
+        snapshot = stats.snapshot()
+        ints[I_CLICK_COUNT] = snapshot["click_count"]
+        ints[I_SKIPPED] = engine.skipped_count
+        doubles[D_START_TIME] = stats.start_time
+        doubles[D_LAST_DRIFT] = snapshot["last_drift"]
+        doubles[D_MEAN_DRIFT] = snapshot["mean_drift"]
+        if snapshot["wake_latency"] is not None:
+            doubles[D_WAKE_LATENCY] = snapshot["wake_latency"]
+            ints[I_HAS_WAKE_LATENCY] = 1
+        else:
+            ints[I_HAS_WAKE_LATENCY] = 0
+        if snapshot["start_latency"] is not None:
+            doubles[D_START_LATENCY] = snapshot["start_latency"]
+            ints[I_HAS_START_LATENCY] = 1
+        else:
+            ints[I_HAS_START_LATENCY] = 0
+        offset = D_HISTOGRAMS
+        for name in HISTOGRAM_NAMES:
+            histogram = snapshot[name]
+            for key in HISTOGRAM_KEYS:
+                doubles[offset] = histogram[key]
+                offset += 1
+
+class ProcessClickEngine:
+    """
+    在独立进程中运行的点击引擎，接口与 AutoClickerThread 相同
+
+    父子进程通过一小块共享内存（控制块）交换点击间隔、抖动、运行状态和统计计数：
+    修改参数只是写共享内存并按一下门铃，读取统计只是读共享内存，都不需要等待子进程应答。
+    点击循环在子进程中运行，GUI重绘、热键监听回调和配置写入都不会与其争夺GIL。
+    """
+
+    def __init__(self, interval, jitter_enabled=False, jitter_percent=20, catch_up_policy=DEFAULT_CATCH_UP_POLICY,
+                 backend_name="pynput", jitter_distribution=DEFAULT_JITTER_DISTRIBUTION, jitter_seed=None,
+                 jitter_samples=None, sequence=None, synthetic=None):
+        """
+        初始化进程点击引擎
+
+        参数:
+            interval (int): 点击间隔，单位为毫秒
+            jitter_enabled (bool): 是否启用随机抖动
+            jitter_percent (int): 随机抖动幅度百分比
+            catch_up_policy (str): 点击落后时的处理策略
+            backend_name (str): 子进程中使用的点击后端名称
+            jitter_distribution (str): 抖动分布
+            jitter_seed (int): 抖动随机种子，为None时随机选择
+            jitter_samples (list): 录制的真人点击间隔（毫秒）
+            sequence (ClickSequence): 编译后的点击序列，其源码在子进程启动时传入
+            synthetic (SyntheticTracker): 输入钩子的自身点击记录，子进程发出的点击按控制块中的计数抵消
+        """
+        # 使用spawn启动子进程，避免在带有Qt和监听线程的进程中fork
+        self.context = multiprocessing.get_context("spawn")
+        self.ints = self.context.RawArray('q', INT_FIELDS)
+        self.doubles = self.context.RawArray('d', DOUBLE_FIELDS)
+        self.doorbell = self.context.Event()
+        self.backend_name = backend_name
+        self.jitter_samples = jitter_samples
+        self.sequence_source = sequence.source if sequence is not None else None
+        # 点击序列源码长度不定，不放入控制块，子进程启动后经由单向管道发送
+        self.sequence_receiver, self.sequence_sender = self.context.Pipe(duplex=False)
+        self.process = None
+
+        self.doubles[D_INTERVAL] = interval
+        self.ints[I_JITTER_ENABLED] = int(bool(jitter_enabled))
+        self.ints[I_JITTER_PERCENT] = jitter_percent
+        self.ints[I_CATCH_UP] = CATCH_UP_POLICIES.index(catch_up_policy) if catch_up_policy in CATCH_UP_POLICIES else 0
+        self.ints[I_DISTRIBUTION] = JITTER_DISTRIBUTIONS.index(jitter_distribution) if jitter_distribution in JITTER_DISTRIBUTIONS else 0
+        self.ints[I_JITTER_SEED] = jitter_seed if jitter_seed is not None else -1
+        self.synthetic = synthetic
+        if synthetic is not None:
+            synthetic.attach_counters(self.ints, I_SYNTHETIC)
+
+    def start(self):
+        """启动引擎子进程，子进程在空闲状态等待启动命令"""
+        self.process = self.context.Process(
+            target=engine_process_main,
+            args=(self.ints, self.doubles, self.doorbell, self.backend_name, self.jitter_samples,
+                  self.sequence_source, self.sequence_receiver),
+            daemon=True
+        )
+        self.process.start()
+
+    def ring(self):
+        """标记控制块已修改并唤醒子进程"""
+        self.ints[I_GENERATION] += 1
+        self.doorbell.set()
+
+    def activate(self, requested_at=None):
+        """
+        开始点击
+
+        参数:
+            requested_at (float): 触发启动的 time.perf_counter() 时间
+        """
+        self.doubles[D_REQUESTED_AT] = requested_at if requested_at is not None else time.perf_counter()
+        self.ints[I_START_SEQ] += 1
+        self.ints[I_PAUSED] = 0
+        self.ints[I_RUN_STATE] = STATE_ACTIVE
+        self.ring()
+
+    def deactivate(self):
+        """停止点击，子进程回到空闲状态"""
+        self.ints[I_RUN_STATE] = STATE_IDLE
+        self.ints[I_PAUSED] = 0
+        self.ring()
+
+    def pause(self):
+        """暂停点击，子进程保持存活"""
+        self.ints[I_PAUSED] = 1
+        self.ring()
+
+    def resume(self):
+        """恢复点击"""
+        self.ints[I_PAUSED] = 0
+        self.ring()
+
+    def is_active(self):
+        """获取是否正在点击，点击序列执行完毕后返回False"""
+        ints = self.ints
+        return ints[I_RUN_STATE] == STATE_ACTIVE and ints[I_FINISHED_SEQ] != ints[I_START_SEQ]
+
+    def stop(self):
+        """结束引擎子进程"""
+        self.ints[I_RUN_STATE] = STATE_SHUTDOWN
+        self.ring()
+        if self.process is not None:
+            self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.synthetic is not None:
+            self.synthetic.detach_counters()
+
+    def set_interval(self, interval):
+        """更新点击间隔（毫秒）"""
+        self.doubles[D_INTERVAL] = interval
+        self.ring()
+
+    def set_jitter_enabled(self, enabled):
+        """启用或禁用随机抖动"""
+        self.ints[I_JITTER_ENABLED] = int(bool(enabled))
+        self.ring()
+
+    def set_jitter_percent(self, percent):
+        """设置随机抖动幅度"""
+        self.ints[I_JITTER_PERCENT] = percent
+        self.ring()
+
+    def set_jitter_distribution(self, distribution, samples=None):
+        """设置随机抖动分布，录制的样本在子进程启动时传入"""
+        if distribution in JITTER_DISTRIBUTIONS:
+            self.ints[I_DISTRIBUTION] = JITTER_DISTRIBUTIONS.index(distribution)
+            self.ring()
+
+    def set_catch_up_policy(self, policy):
+        """设置点击落后时的处理策略"""
+        if policy in CATCH_UP_POLICIES:
+            self.ints[I_CATCH_UP] = CATCH_UP_POLICIES.index(policy)
+            self.ring()
+
+    def set_sequence(self, sequence):
+        """设置点击序列，下一次开始点击时生效；子进程已启动时发送源码，由子进程重新编译"""
+        self.sequence_source = sequence.source if sequence is not None else None
+        if self.process is not None:
+            self.sequence_sender.send(self.sequence_source)
+            self.ring()
+
+    def get_stats(self):
+        """
+        从控制块读取运行统计快照，格式与 TimingEngine.get_stats() 相同
+
+        返回:
+            dict: 运行统计
+        """
+        ints = self.ints
+        doubles = self.doubles
+        now = time.perf_counter()
+        count = ints[I_CLICK_COUNT]
+        uptime = now - doubles[D_START_TIME] if doubles[D_START_TIME] else 0.0
+        snapshot = {
+            "timestamp": now,
+            "click_count": count,
+            "start_time": doubles[D_START_TIME],
+            "uptime": uptime,
+            "average_cps": count / uptime if uptime > 0 else 0.0,
+            "wake_latency": doubles[D_WAKE_LATENCY] if ints[I_HAS_WAKE_LATENCY] else None,
+            "start_latency": doubles[D_START_LATENCY] if ints[I_HAS_START_LATENCY] else None,
+            "last_drift": doubles[D_LAST_DRIFT],
+            "mean_drift": doubles[D_MEAN_DRIFT],
+            "skipped_count": ints[I_SKIPPED]
+        }
+        offset = D_HISTOGRAMS
+        for name in HISTOGRAM_NAMES:
+            histogram = {}
+            for key in HISTOGRAM_KEYS:
+                histogram[key] = doubles[offset]
+                offset += 1
+            histogram["count"] = int(histogram["count"])
+            snapshot[name] = histogram
+        return snapshot
+
+    def get_drift_stats(self):
+        """获取漂移统计，格式与 TimingEngine.get_drift_stats() 相同"""
+        stats = self.get_stats()
+        return {
+            "click_count": stats["click_count"],
+            "skipped_count": stats["skipped_count"],
+            "last_drift": stats["last_drift"],
+            "max_drift": stats["drift"]["max"],
+            "mean_drift": stats["mean_drift"]
+        }
@@ -0,0 +1,145 @@
+import json
+import os
+
+from core.config_persister import write_atomic
+
+PROFILE_FORMAT_VERSION = 1
+
+class ProfileStore:
+    """
+    配置方案文件：所有方案保存在同一个带索引的文件中，按需加载
+
+    文件第一行是索引（JSON）：方案名称的顺序，以及每个方案在正文中的字节偏移和长度；
+    之后每行是一个方案的设置（JSON，非ASCII字符转义，字符数与字节数相同）。
+    创建时只读取索引行；某个方案第一次被使用时才读取并解析它那一行，之后缓存在内存中，
+    切换方案不会重新解析文件。
+    """
+
+    def __init__(self, path):
+        """
+        初始化配置方案文件，只读取索引
+
+        参数:
+            path (str): 文件路径，不存在时视为没有方案
+        """
+        self.path = path
+        self.order = []       # 方案名称，按添加顺序排列
+        self.index = {}       # 方案名称 -> (正文中的偏移, 长度)
+        self.body_start = 0   # 正文在文件中的起始位置
+        self.cache = {}       # 方案名称 -> 已解析的设置
+        self.load_index()
+
+    def load_index(self):
+        """读取文件的索引行"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get("version") != PROFILE_FORMAT_VERSION:
+                    raise ValueError(f"不支持的配置方案文件版本: {header.get('version')}")
+                self.body_start = f.tell()
+            self.order = list(header["order"])
+            self.index = {name: tuple(entry) for name, entry in header["index"].items()}
+        except Exception as e:
+            print(f"加载配置方案索引时出错: {e}")
+            self.order = []
+            self.index = {}
+
+    def names(self):
+        """获取所有方案名称"""
+        return list(self.order)
+
+    def load(self, name):
+        """
+        获取方案的设置，第一次使用时从文件中读取该方案所在的一行
+
+        参数:
+            name (str): 方案名称
+
+        返回:
+            dict: 方案设置，方案不存在或读取失败时返回None
+        """
+        settings = self.cache.get(name)
+        if settings is None:
+            entry = self.index.get(name)
+            if entry is None:
+                return None
+            try:
+                settings = json.loads(self.read_raw(*entry))
+            except Exception as e:
+                print(f"加载配置方案时出错: {e}")
+                return None
+            self.cache[name] = settings
+        return settings
+
+    def read_raw(self, offset, length):
+        """读取正文中的一段原始文本"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.body_start + offset)
+            return f.read(length).decode('ascii')
+
+    def save(self, name, settings):
+        """
+        添加或覆盖方案并写入文件
+
+        参数:
+            name (str): 方案名称
+            settings (dict): 方案设置
+        """
+        if not name:
+            raise ValueError("配置方案名称不能为空")
+        self.cache[name] = settings
+        if name not in self.order:
+            self.order.append(name)
+        self.write()
+
+    def delete(self, name):
+        """
+        删除方案并写入文件，方案不存在时忽略
+
+        参数:
+            name (str): 方案名称
+        """
+        if name not in self.order:
+            return
+        self.order.remove(name)
+        self.cache.pop(name, None)
+        self.write()
+
+    def next_name(self, current):
+        """
+        获取下一个方案名称，用于循环切换
+
+        参数:
+            current (str): 当前方案名称，为None或不存在时返回第一个方案
+
+        返回:
+            str: 方案名称，没有方案时返回None
+        """
+        if not self.order:
+            return None
+        if current not in self.order:
+            return self.order[0]
+        return self.order[(self.order.index(current) + 1) % len(self.order)]
+
+    def write(self):
+        """重写整个文件，未使用过的方案直接复制原始文本，不需要解析"""
+        lines = []
+        for name in self.order:
+            if name in self.cache:
+                lines.append(json.dumps(self.cache[name], ensure_ascii=True, separators=(",", ":")))
+            else:
+                lines.append(self.read_raw(*self.index[name]))
+
+        index = {}
+        offset = 0
+        for name, line in zip(self.order, lines):
+            index[name] = (offset, len(line))
+            offset += len(line) + 1
+        header = json.dumps({"version": PROFILE_FORMAT_VERSION, "order": self.order, "index": index},
+                            ensure_ascii=True, separators=(",", ":"))
+        # 原样写入换行符，索引中的偏移在所有平台上都与文件内容一致
+        write_atomic(self.path, header + "\n" + "".join(line + "\n" for line in lines), newline="")
+        self.index = index
+        self.body_start = len(header) + 1
@@ -0,0 +1,168 @@
+import hashlib
+from functools import partial
+
+from core.click_backend import RecordingBackend
+from core.click_sequence import SequenceInterpreter
+from core.macro_player import MacroPlayer
+from core.timing_engine import TimingEngine
+from utils.constants import (DEFAULT_INTERVAL, DEFAULT_CATCH_UP_POLICY, DEFAULT_JITTER_DISTRIBUTION,
+                             RECORDING_CAPACITY)
+
+class VirtualClock:
+    """
+    虚拟时钟：等待只是把当前时间直接推进到截止时间，不会真正休眠
+
+    实例本身可作为引擎的 clock 调用，sleep_until 作为 sleeper；
+    数小时的点击计划可以在毫秒级的真实时间内跑完，结果只取决于参数和随机种子。
+    """
+
+    def __init__(self, start=0.0, end=None):
+        """
+        初始化虚拟时钟
+
+        参数:
+            start (float): 起始时间，单位为秒
+            end (float): 模拟终点，等待越过该时间时会话结束；为None表示不限
+        """
+        self.now = start
+        self.end = end
+
+    def __call__(self):
+        """获取当前虚拟时间"""
+        return self.now
+
+    def sleep_until(self, deadline):
+        """
+        把时间推进到截止时间
+
+        参数:
+            deadline (float): 截止时间
+
+        返回:
+            bool: 到达截止时间返回True，截止时间超过模拟终点时返回False
+        """
+        if self.end is not None and deadline > self.end:
+            self.now = self.end
+            return False
+        if deadline > self.now:
+            self.now = deadline
+        return True
+
+    def advance(self, seconds):
+        """
+        推进时间，用于模拟点击本身的耗时
+
+        参数:
+            seconds (float): 推进的秒数
+        """
+        self.now += seconds
+
+def recording_digest(backend):
+    """
+    计算记录后端中事件序列的摘要，相同参数和种子下的两次模拟摘要相同，可用于回归对比
+
+    参数:
+        backend (RecordingBackend): 记录后端
+
+    返回:
+        str: SHA-256 十六进制摘要
+    """
+    count = backend.count
+    digest = hashlib.sha256()
+    for column in (backend.timestamps, backend.kinds, backend.buttons, backend.xs, backend.ys):
+        digest.update(column[:count].tobytes())
+    return digest.hexdigest()
+
+def simulation_result(clock, backend, stats):
+    """汇总一次模拟的结果"""
+    return {
+        "virtual_time": clock.now,
+        "event_count": backend.count,
+        "dropped": backend.dropped,
+        "digest": recording_digest(backend),
+        "backend": backend,
+        "stats": stats
+    }
+
+def simulate_schedule(interval, duration, jitter_enabled=False, jitter_percent=20,
+                      catch_up_policy=DEFAULT_CATCH_UP_POLICY, jitter_distribution=DEFAULT_JITTER_DISTRIBUTION,
+                      jitter_seed=0, jitter_samples=None, dispatch_cost=0.0, capacity=RECORDING_CAPACITY):
+    """
+    在虚拟时钟上运行连续点击计划
+
+    参数:
+        interval (int): 点击间隔，单位为毫秒
+        duration (float): 模拟时长，单位为秒
+        jitter_enabled (bool): 是否启用随机抖动
+        jitter_percent (int): 随机抖动幅度百分比
+        catch_up_policy (str): 点击落后时的处理策略
+        jitter_distribution (str): 抖动分布
+        jitter_seed (int): 抖动随机种子，固定种子保证结果可复现
+        jitter_samples (list): 录制的真人点击间隔（毫秒）
+        dispatch_cost (float): 每次点击消耗的虚拟时间（秒），用于检验落后处理策略
+        capacity (int): 记录后端预分配的事件数
+
+    返回:
+        dict: 虚拟时长、事件数、事件摘要、记录后端和引擎统计
+    """
+    clock = VirtualClock(end=duration)
+    backend = RecordingBackend(capacity, clock)
+    engine = TimingEngine(interval, jitter_enabled, jitter_percent, catch_up_policy,
+                          jitter_distribution=jitter_distribution, jitter_seed=jitter_seed,
+                          jitter_samples=jitter_samples, clock=clock, sleeper=clock.sleep_until)
+
+    click = partial(backend.click, "left")
+    if dispatch_cost:
+        def dispatch():
+            click()
+            clock.advance(dispatch_cost)
+    else:
+        dispatch = click
+
+    engine.run(dispatch)
+    return simulation_result(clock, backend, engine.get_stats())
+
+def simulate_sequence(sequence, duration=None, capacity=RECORDING_CAPACITY):
+    """
+    在虚拟时钟上执行一遍点击序列
+
+    参数:
+        sequence (ClickSequence): 编译后的点击序列
+        duration (float): 模拟时长上限（秒），用于含无限循环的序列；为None表示执行到结束
+        capacity (int): 记录后端预分配的事件数
+
+    返回:
+        dict: 同 simulate_schedule()，另含序列是否执行完毕
+    """
+    clock = VirtualClock(end=duration)
+    backend = RecordingBackend(capacity, clock)
+    engine = TimingEngine(DEFAULT_INTERVAL, clock=clock, sleeper=clock.sleep_until)
+    engine.start()
+    completed = SequenceInterpreter(sequence, backend).run(engine)
+    result = simulation_result(clock, backend, engine.get_stats())
+    result["completed"] = completed
+    return result
+
+def simulate_macro(path, loops=1, speed=1.0, duration=None, capacity=RECORDING_CAPACITY):
+    """
+    在虚拟时钟上回放宏文件
+
+    参数:
+        path (str): 宏文件路径
+        loops (int): 循环次数，0表示无限循环（此时应指定 duration）
+        speed (float): 速度倍率
+        duration (float): 模拟时长上限（秒），为None表示不限
+        capacity (int): 记录后端预分配的事件数
+
+    返回:
+        dict: 同 simulate_schedule()，统计为回放统计
+    """
+    clock = VirtualClock(end=duration)
+    backend = RecordingBackend(capacity, clock)
+    player = MacroPlayer(backend, clock=clock, sleeper=clock.sleep_until)
+    player.open(path)
+    try:
+        player.play(loops, speed)
+        return simulation_result(clock, backend, player.get_stats())
+    finally:
+        player.close()
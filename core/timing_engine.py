@@ -0,0 +1,435 @@
+import time
+import threading
+
+from core.engine_stats import EngineStats
+from core.jitter import JitterSchedule
+from utils.constants import (MIN_INTERVAL, SPIN_THRESHOLD, MAX_CATCH_UP_CLICKS,
+                             CATCH_UP_SKIP, CATCH_UP_BURST, CATCH_UP_POLICIES,
+                             DEFAULT_CATCH_UP_POLICY, DEFAULT_JITTER_DISTRIBUTION)
+
+class TimingEngine:
+    """
+    基于绝对截止时间的定时引擎，点击周期不会随点击耗时和sleep误差累积漂移
+
+    线程交接规则:
+        - 调度参数（间隔、抖动、策略）和 next_deadline 只在持有 condition 时修改；
+          Qt线程调用 set_* 时会基于上一次点击的截止时间重新计算待执行的截止时间，
+          并唤醒引擎线程，新参数在下一个节拍立即生效。
+        - 引擎线程在持有 condition 时认领一个到期的截止时间后才执行点击，
+          因此一次点击要么按旧参数执行，要么按新参数重新调度，不会两者混用。
+        - 点击本身在锁外执行，参数修改不会被点击耗时阻塞。
+    """
+
+    def __init__(self, interval, jitter_enabled=False, jitter_percent=20,
+                 catch_up_policy=DEFAULT_CATCH_UP_POLICY, spin_threshold=SPIN_THRESHOLD,
+                 jitter_distribution=DEFAULT_JITTER_DISTRIBUTION, jitter_seed=None, jitter_samples=None,
+                 clock=time.perf_counter, sleeper=None):
+        """
+        初始化定时引擎
+
+        参数:
+            interval (int): 点击间隔，单位为毫秒
+            jitter_enabled (bool): 是否启用随机抖动
+            jitter_percent (int): 随机抖动幅度百分比
+            catch_up_policy (str): 落后时的处理策略，见 CATCH_UP_POLICIES
+            spin_threshold (float): 截止前改为忙等待的时间，单位为秒
+            jitter_distribution (str): 抖动分布，见 JITTER_DISTRIBUTIONS
+            jitter_seed (int): 抖动随机种子，为None时随机选择
+            jitter_samples (list): 录制的真人点击间隔（毫秒），用于 empirical 分布
+            clock (callable): 单调时钟，单位为秒
+            sleeper (callable): 等待到给定截止时间的函数，返回False表示结束会话；
+                为None时在条件变量上等待并忙等待最后一小段（实时模式），
+                虚拟时钟下由它直接推进时间，见 core/simulation.py
+        """
+        self.clock = clock
+        self.sleeper = sleeper
+        self.interval = interval / 1000.0  # 转换为秒
+        self.jitter_enabled = jitter_enabled
+        self.jitter_percent = jitter_percent
+        self.jitter = JitterSchedule(jitter_distribution, jitter_percent, jitter_seed, jitter_samples)
+        self.catch_up_policy = catch_up_policy if catch_up_policy in CATCH_UP_POLICIES else DEFAULT_CATCH_UP_POLICY
+        self.spin_threshold = spin_threshold
+        self.running = False
+        self.paused = False
+        self.shutting_down = False
+        self.session = 0          # 每次 start() 递增，用于识别上一次会话遗留的点击
+        self.claimed_session = 0  # 引擎线程认领截止时间时所属的会话
+
+        # 所有等待都在该条件变量上进行，停止、暂停和参数修改可以立即唤醒引擎线程
+        self.condition = threading.Condition()
+
+        # 调度状态
+        self.next_deadline = 0.0
+        self.last_deadline = None  # 上一次点击的截止时间，尚未点击时为None
+
+        # 运行统计，snapshot() 可在任意线程读取
+        self.stats = EngineStats(clock)
+        self.skipped_count = 0
+
+        # 点击序列解释器，为None时按点击间隔重复调用 dispatch
+        self.sequence = None
+        self.sequence_completed = False  # 最近一次会话是否因序列执行完毕而结束
+
+    def start(self, requested_at=None):
+        """
+        开始一次点击会话，可在任意线程调用；正在 serve() 中空闲等待的引擎线程会被立即唤醒
+
+        参数:
+            requested_at (float): 触发启动的时间（如热键按下时），用于统计启动到首次点击的延迟
+        """
+        with self.condition:
+            now = self.clock()
+            self.session += 1
+            self.running = True
+            self.paused = False
+            self.last_deadline = None
+            self.skipped_count = 0
+            self.sequence_completed = False
+            self.stats.reset(requested_at if requested_at is not None else now)
+            self.next_deadline = now
+            self.condition.notify_all()
+
+    def run(self, dispatch):
+        """
+        执行一次点击会话，按绝对截止时间调用 dispatch，直到 stop() 被调用
+
+        参数:
+            dispatch (callable): 每个节拍调用一次的无参函数
+        """
+        self.start()
+        self.stats.record_wake()
+        self.loop(dispatch)
+
+    def serve(self, dispatch):
+        """
+        作为常驻工作线程运行：空闲时在条件变量上等待 start()，会话结束后回到空闲，
+        直到 shutdown() 被调用。线程和点击后端在多次启停之间复用。
+        设置了点击序列时，会话改为执行一遍序列，执行完毕后自动结束。
+
+        参数:
+            dispatch (callable): 每个节拍调用一次的无参函数
+        """
+        condition = self.condition
+        while True:
+            with condition:
+                while not self.running and not self.shutting_down:
+                    condition.wait()
+                if self.shutting_down:
+                    return
+                sequence = self.sequence
+            self.stats.record_wake()
+            if sequence is None:
+                self.loop(dispatch)
+            elif sequence.run(self):
+                self.finish_session()
+
+    def loop(self, dispatch):
+        """
+        定时主循环，直到 stop() 被调用
+
+        参数:
+            dispatch (callable): 每个节拍调用一次的无参函数
+        """
+        clock = self.clock
+        condition = self.condition
+        record_click = self.stats.record_click
+
+        while self.running:
+            deadline = self.wait_for_deadline()
+            if deadline is None:
+                continue
+
+            session = self.claimed_session
+            now = clock()
+            dispatch()
+            finished = clock()
+
+            with condition:
+                # 点击期间发生了 stop() 和 start()：这次点击属于上一次会话，不计入新会话的统计和调度
+                if self.session != session:
+                    continue
+                record_click(deadline, now, finished)
+                self.last_deadline = deadline
+                self.next_deadline = self.schedule_next(deadline, clock())
+        self.stats.record_stopped()
+
+    def wait_for_deadline(self):
+        """
+        等待到 next_deadline：先在条件变量上粗粒度等待，最后一小段忙等待。
+        等待期间可被 stop()、pause() 随时唤醒，参数修改后会按新的截止时间继续等待。
+
+        返回:
+            float: 认领的截止时间；被停止或暂停打断时返回None
+        """
+        clock = self.clock
+        condition = self.condition
+        spin_threshold = self.spin_threshold
+        if self.sleeper is not None:
+            return self.sleep_for_deadline()
+        while True:
+            with condition:
+                while self.running:
+                    if self.paused:
+                        condition.wait()
+                        return None
+                    remaining = self.next_deadline - clock() - spin_threshold
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+
+            # 忙等待期间每次都重新读取截止时间，以便感知参数修改
+            while self.running and not self.paused and clock() < self.next_deadline:
+                pass
+
+            with condition:
+                if not self.running or self.paused:
+                    return None
+                deadline = self.next_deadline
+                if clock() >= deadline:
+                    self.claimed_session = self.session
+                    return deadline
+                # 截止时间在忙等待期间被推后，重新等待
+
+    def sleep_for_deadline(self):
+        """
+        使用注入的 sleeper 等待到 next_deadline（虚拟时钟模式）
+
+        返回:
+            float: 认领的截止时间；会话结束时返回None
+        """
+        with self.condition:
+            if not self.running or self.paused:
+                return None
+            deadline = self.next_deadline
+            self.claimed_session = self.session
+        if not self.sleeper(deadline):
+            self.finish_session()
+            return None
+        return deadline
+
+    def wait_until(self, deadline):
+        """
+        等待到给定的截止时间，供点击序列解释器使用。可被 stop() 随时打断；
+        暂停期间截止时间随暂停时长顺延，恢复后保持原有的相对节奏。
+
+        参数:
+            deadline (float): 截止时间（引擎时钟）
+
+        返回:
+            float: 实际使用的截止时间；被停止时返回None
+        """
+        if self.sleeper is not None:
+            with self.condition:
+                if not self.running:
+                    return None
+            if not self.sleeper(deadline):
+                self.finish_session()
+                return None
+            return deadline
+
+        clock = self.clock
+        condition = self.condition
+        spin_threshold = self.spin_threshold
+        with condition:
+            while self.running:
+                if self.paused:
+                    paused_at = clock()
+                    while self.paused and self.running:
+                        condition.wait()
+                    deadline += clock() - paused_at
+                    continue
+                remaining = deadline - clock() - spin_threshold
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+            if not self.running:
+                return None
+
+        while clock() < deadline:
+            pass
+        return deadline if self.running else None
+
+    def finish_session(self):
+        """会话自行结束（点击序列执行完毕，或虚拟时钟到达模拟终点）"""
+        with self.condition:
+            if self.running:
+                self.running = False
+                self.sequence_completed = True
+                self.condition.notify_all()
+
+    def set_sequence(self, sequence):
+        """
+        设置点击序列，下一次 start() 时生效
+
+        参数:
+            sequence (SequenceInterpreter): 点击序列解释器，为None时恢复连续单击
+        """
+        with self.condition:
+            self.sequence = sequence
+
+    def reschedule(self):
+        """基于上一次点击重新计算待执行的截止时间，调用方需持有 condition"""
+        if self.running and self.last_deadline is not None:
+            self.next_deadline = max(self.last_deadline + self.calculate_wait_time(), self.clock())
+        self.condition.notify_all()
+
+    def schedule_next(self, deadline, now):
+        """
+        根据上一个截止时间计算下一个截止时间，并处理落后的情况
+
+        参数:
+            deadline (float): 刚刚执行的点击的截止时间
+            now (float): 当前时间
+
+        返回:
+            float: 下一次点击的截止时间
+        """
+        next_deadline = deadline + self.calculate_wait_time()
+        behind = now - next_deadline
+        if behind <= self.interval:
+            # 落后不足一个周期，照常调度，下一次点击会立即执行
+            return next_deadline
+
+        missed = int(behind / self.interval)
+        if self.catch_up_policy == CATCH_UP_BURST and missed <= MAX_CATCH_UP_CLICKS:
+            # 保留原时间线，随后的点击会连续补发
+            return next_deadline
+        if self.catch_up_policy == CATCH_UP_SKIP:
+            # 丢弃更早错过的节拍，只补发原时间线上最近的一个
+            self.skipped_count += missed
+            return next_deadline + missed * self.interval
+
+        # 重新计时（补发超过上限时同样如此）
+        self.skipped_count += missed
+        return now
+
+    def calculate_wait_time(self):
+        """计算实际等待时间，考虑随机抖动"""
+        if not self.jitter_enabled:
+            return self.interval
+
+        # 抖动因子预先批量生成，这里只读取一个数组元素；确保最终间隔不小于最小间隔
+        return max(MIN_INTERVAL / 1000.0, self.interval * self.jitter.next_factor())
+
+    def stop(self):
+        """请求停止定时循环，正在等待的引擎线程会被立即唤醒"""
+        with self.condition:
+            if self.running:
+                self.stats.record_stop_request()
+            self.running = False
+            self.paused = False
+            self.condition.notify_all()
+
+    def shutdown(self):
+        """停止点击并让 serve() 退出"""
+        with self.condition:
+            self.shutting_down = True
+            self.running = False
+            self.paused = False
+            self.condition.notify_all()
+
+    def pause(self):
+        """暂停点击，引擎线程在条件变量上挂起而不消耗CPU"""
+        with self.condition:
+            self.paused = True
+            self.condition.notify_all()
+
+    def resume(self):
+        """恢复点击，从当前时刻重新开始计时"""
+        with self.condition:
+            if self.paused:
+                self.paused = False
+                self.next_deadline = self.clock()
+                self.condition.notify_all()
+
+    def is_paused(self):
+        """获取是否处于暂停状态"""
+        return self.paused
+
+    def set_interval(self, interval):
+        """
+        更新点击间隔
+
+        参数:
+            interval (int): 新的点击间隔，单位为毫秒
+        """
+        with self.condition:
+            self.interval = interval / 1000.0
+            self.reschedule()
+
+    def set_jitter_enabled(self, enabled):
+        """
+        启用或禁用随机抖动
+
+        参数:
+            enabled (bool): 是否启用随机抖动
+        """
+        with self.condition:
+            self.jitter_enabled = enabled
+            self.reschedule()
+
+    def set_jitter_percent(self, percent):
+        """
+        设置随机抖动幅度
+
+        参数:
+            percent (int): 随机抖动幅度百分比
+        """
+        with self.condition:
+            self.jitter_percent = percent
+            self.jitter.set_percent(percent)
+            self.reschedule()
+
+    def set_jitter_distribution(self, distribution, samples=None):
+        """
+        设置抖动分布，沿用当前的随机种子
+
+        参数:
+            distribution (str): 见 JITTER_DISTRIBUTIONS
+            samples (list): 录制的真人点击间隔（毫秒），用于 empirical 分布
+        """
+        with self.condition:
+            self.jitter = JitterSchedule(distribution, self.jitter_percent, self.jitter.seed, samples)
+            self.reschedule()
+
+    def get_jitter_seed(self):
+        """获取抖动随机种子，用于复现本次运行的点击序列"""
+        return self.jitter.seed
+
+    def set_catch_up_policy(self, policy):
+        """
+        设置落后时的处理策略
+
+        参数:
+            policy (str): 见 CATCH_UP_POLICIES
+        """
+        if policy in CATCH_UP_POLICIES:
+            with self.condition:
+                self.catch_up_policy = policy
+
+    def get_drift_stats(self):
+        """
+        获取漂移统计
+
+        返回:
+            dict: 点击数、跳过数，以及最近/最大/平均漂移（秒）
+        """
+        stats = self.stats
+        return {
+            "click_count": stats.click_count,
+            "skipped_count": self.skipped_count,
+            "last_drift": stats.last_drift,
+            "max_drift": stats.drift.max_value / 1000000.0,
+            "mean_drift": stats.total_drift / stats.click_count if stats.click_count else 0.0
+        }
+
+    def get_stats(self):
+        """
+        获取运行统计快照，不会阻塞点击循环
+
+        返回:
+            dict: 见 EngineStats.snapshot()，另含跳过的点击数
+        """
+        snapshot = self.stats.snapshot()
+        snapshot["skipped_count"] = self.skipped_count
+        return snapshot
@@ -1,6 +1,8 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QIcon
 from utils.path_helper import resource_path
 from utils.singleton import SingleInstanceManager
@@ -9,6 +11,9 @@ from ui.main_window import MainWindow
 from core.config_manager import ConfigManager
 
 def main():
+    # 打包后以独立进程运行点击引擎时需要
+    multiprocessing.freeze_support()
+
     # 检查程序是否已在运行
     instance_manager = SingleInstanceManager()
     if not instance_manager.try_acquire_lock():
@@ -24,6 +29,13 @@ def main():
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon(resource_path("resources/icon.png")))
 
+    # 收到终止信号时先写入尚未保存的配置；Qt事件循环中Python信号处理函数只在执行Python代码时运行，
+    # 因此用定时器定期回到Python
+    config_manager.persister.install_signal_handlers()
+    signal_timer = QTimer()
+    signal_timer.timeout.connect(lambda: None)
+    signal_timer.start(500)
+
     # 创建并显示主窗口
     window = MainWindow(config_manager)
     window.show()
@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from core.click_backend import RecordingBackend, EVENT_MOVE, EVENT_CLICK
+from core.click_scheduler import ClickScheduler
+
+JOB_COUNT = 300
+RUN_TIME = 1.0             # 秒
+MAX_PERIOD_ERROR = 0.001   # 周期误差中位数的上限（秒）
+# 空闲机器上中位数远小于1毫秒；为负载较高的测试机器留出余量，调度线程可能被系统抢占一个时间片
+PERIOD_ERROR_MARGIN = 5
+
+def record_jobs(intervals, run_time):
+    """
+    在记录后端上同时运行多个点击任务
+
+    每个任务在坐标 (任务下标, 0) 处点击，记录中移动事件之后的点击即属于该任务。
+
+    参数:
+        intervals (list): 各任务的点击间隔（毫秒）
+        run_time (float): 运行时长（秒）
+
+    返回:
+        list: 每个任务的点击时间列表
+    """
+    backend = RecordingBackend()
+    scheduler = ClickScheduler(backend)
+    scheduler.start()
+    try:
+        for index, interval in enumerate(intervals):
+            scheduler.add_job(interval, position=(index, 0))
+        time.sleep(run_time)
+    finally:
+        scheduler.stop()
+
+    clicks = [[] for _ in intervals]
+    job = None
+    for i in range(backend.count):
+        kind = backend.kinds[i]
+        if kind == EVENT_MOVE:
+            job = backend.xs[i]
+        elif kind == EVENT_CLICK:
+            clicks[job].append(backend.timestamps[i])
+    return clicks
+
+def test_many_jobs_keep_their_rate():
+    """数百个任务由同一个调度线程驱动时，每个任务的点击数和周期仍与各自的间隔一致"""
+    intervals = [50 + index for index in range(JOB_COUNT)]
+    clicks = record_jobs(intervals, RUN_TIME)
+
+    errors = []
+    for interval, times in zip(intervals, clicks):
+        expected = RUN_TIME * 1000 / interval
+        assert abs(len(times) - expected) <= 2, f"间隔 {interval}ms 的任务点击了 {len(times)} 次"
+        period = interval / 1000.0
+        errors.extend(abs(b - a - period) for a, b in zip(times, times[1:]))
+
+    median = statistics.median(errors)
+    assert median < MAX_PERIOD_ERROR * PERIOD_ERROR_MARGIN, f"周期误差中位数 {median * 1000:.3f}ms"
@@ -0,0 +1,47 @@
+import pytest
+
+import core.jitter
+from core.click_backend import EVENT_PRESS, EVENT_RELEASE, EVENT_CLICK, EVENT_MOVE
+from core.click_sequence import compile_sequence
+from core.simulation import simulate_schedule, simulate_sequence
+
+@pytest.fixture(autouse=True)
+def pure_python_jitter(monkeypatch):
+    """固定使用纯Python的抖动生成：安装NumPy后同一种子会生成不同的序列，摘要也会不同"""
+    monkeypatch.setattr(core.jitter, "numpy", None)
+
+def test_jittered_schedule_digest():
+    """一小时的抖动点击计划，相同种子下事件数和摘要保持不变"""
+    result = simulate_schedule(100, 3600, jitter_enabled=True, jitter_percent=20, jitter_seed=42)
+    assert result["virtual_time"] == 3600
+    assert result["event_count"] == 36008
+    assert result["digest"] == "97d1fc23a96d41b67ad1836f5a59f6a66f23fa4e687648f5109c035466c72bd9"
+
+def test_schedule_is_reproducible():
+    """相同种子的两次模拟完全一致，不同种子的结果不同"""
+    first = simulate_schedule(50, 600, jitter_enabled=True, jitter_percent=30, jitter_seed=7)
+    second = simulate_schedule(50, 600, jitter_enabled=True, jitter_percent=30, jitter_seed=7)
+    other = simulate_schedule(50, 600, jitter_enabled=True, jitter_percent=30, jitter_seed=8)
+    assert first["digest"] == second["digest"]
+    assert first["digest"] != other["digest"]
+
+def test_schedule_without_jitter():
+    """不启用抖动时严格按间隔点击"""
+    result = simulate_schedule(10, 1.0)
+    assert result["event_count"] == 100
+    assert result["digest"] == "4534687b4e40bc0e098e19d604fe71e8354dd4547159f9d36fdd9e151d8e7cf9"
+
+def test_sequence_events():
+    """点击序列按时间线执行一遍后结束"""
+    sequence = compile_sequence("click left 100 200; wait 120ms; double right; hold right 500ms; "
+                                "repeat 3; click; wait 50ms; end")
+    result = simulate_sequence(sequence)
+    backend = result["backend"]
+    count = backend.count
+
+    assert result["completed"]
+    assert result["virtual_time"] == pytest.approx(0.77)
+    assert list(backend.kinds[:count]) == [EVENT_MOVE, EVENT_CLICK, EVENT_CLICK, EVENT_CLICK, EVENT_PRESS,
+                                           EVENT_RELEASE, EVENT_CLICK, EVENT_CLICK, EVENT_CLICK]
+    assert backend.timestamps[:count].tolist() == pytest.approx([0.0, 0.0, 0.12, 0.12, 0.12, 0.62, 0.62, 0.67, 0.72])
+    assert result["digest"] == "5b192dd1fead1fb00b980abb5eb57ec6186646b56ad2752e95cfb5406951e588"
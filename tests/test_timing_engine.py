@@ -0,0 +1,44 @@
+import statistics
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from core.click_backend import NullBackend
+from core.timing_engine import TimingEngine
+
+MAX_STOP_LATENCY = 0.001  # 秒
+# 取多次测量的中位数，并为负载较高的测试机器留出2倍余量：单次测量可能被系统调度偶然拖慢
+REPEATS = 9
+STOP_LATENCY_MARGIN = 2
+
+def measure_stop_latency(interval):
+    """
+    运行一次点击会话后停止，返回引擎记录的停止延迟
+
+    从 stop() 被调用到引擎线程退出定时循环，不包含线程结束和 join() 的时间
+
+    参数:
+        interval (int): 点击间隔，单位为毫秒
+
+    返回:
+        float: 停止延迟（秒）
+    """
+    engine = TimingEngine(interval)
+    backend = NullBackend()
+    thread = threading.Thread(target=engine.run, args=(partial(backend.click, "left"),), daemon=True)
+    thread.start()
+    time.sleep(0.05)  # 让引擎进入等待（长间隔）或忙等待（短间隔）
+
+    engine.stop()
+    thread.join(1.0)
+    assert not thread.is_alive()
+    return engine.stats.stop_latency
+
+@pytest.mark.parametrize("interval", [1, 50, 1000, 60000])
+def test_stop_latency(interval):
+    """stop() 之后引擎线程在1毫秒内退出定时循环，与点击间隔无关"""
+    latencies = [measure_stop_latency(interval) for _ in range(REPEATS)]
+    median = statistics.median(latencies)
+    assert median < MAX_STOP_LATENCY * STOP_LATENCY_MARGIN, f"停止耗时中位数 {median * 1000:.3f}ms: {latencies}"
@@ -1,61 +1,74 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal
 from PyQt5.QtGui import QKeySequence
 from pynput import mouse
 
+from core.input_hub import MOUSE_CLICK
+
 class HotkeyDialog(QDialog):
-    def __init__(self, current_hotkey=None, parent=None):
+    # 鼠标事件来自输入事件中心的监听线程，通过信号转到GUI线程处理
+    mouse_hotkey_captured = pyqtSignal(str)
+
+    def __init__(self, input_hub, language_manager, current_hotkey=None, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("设置热键")
         self.setMinimumWidth(300)
         self.setMinimumHeight(150)
 
         self.current_hotkey = current_hotkey
         self.new_hotkey = None
         self.is_listening = False
+        self.input_hub = input_hub
+        self.language_manager = language_manager
+        self.mouse_subscription = None
+        self.mouse_hotkey_captured.connect(self.on_mouse_hotkey)
 
         self.setup_ui()
 
+        # 对话框打开期间切换语言（如配置文件被修改）时原地更新文本
+        self.language_manager.language_changed.connect(self.retranslate_ui)
+
     def setup_ui(self):
         """设置对话框UI"""
         layout = QVBoxLayout()
 
         # 指令标签
-        instruction = QLabel("请按下您想要设置的热键组合。支持单个按键、组合键和鼠标侧键。")
-        instruction.setAlignment(Qt.AlignCenter)
-        layout.addWidget(instruction)
+        self.instruction_label = QLabel()
+        self.instruction_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.instruction_label)
 
         # 当前热键显示
         current_layout = QHBoxLayout()
-        current_layout.addWidget(QLabel("当前热键:"))
+        self.current_title_label = QLabel()
+        current_layout.addWidget(self.current_title_label)
 
-        self.current_label = QLabel(self.current_hotkey_text())
+        self.current_label = QLabel()
         current_layout.addWidget(self.current_label)
 
         layout.addLayout(current_layout)
 
         # 新热键显示
         new_layout = QHBoxLayout()
-        new_layout.addWidget(QLabel("新热键:"))
+        self.new_title_label = QLabel()
+        new_layout.addWidget(self.new_title_label)
 
-        self.new_label = QLabel("等待输入...")
+        self.new_label = QLabel()
         new_layout.addWidget(self.new_label)
 
         layout.addLayout(new_layout)
 
         # 监听按钮
-        self.listen_button = QPushButton("开始监听")
+        self.listen_button = QPushButton()
         self.listen_button.clicked.connect(self.toggle_listening)
         layout.addWidget(self.listen_button)
 
         # 底部按钮
         button_layout = QHBoxLayout()
 
-        cancel_button = QPushButton("取消")
-        cancel_button.clicked.connect(self.reject)
-        button_layout.addWidget(cancel_button)
+        self.cancel_button = QPushButton()
+        self.cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.cancel_button)
 
-        self.ok_button = QPushButton("确定")
+        self.ok_button = QPushButton()
         self.ok_button.setEnabled(False)
         self.ok_button.clicked.connect(self.accept)
         button_layout.addWidget(self.ok_button)
@@ -63,37 +76,70 @@ class HotkeyDialog(QDialog):
         layout.addLayout(button_layout)
 
         self.setLayout(layout)
+        self.retranslate_ui()
+
+    def retranslate_ui(self):
+        """按当前语言设置所有文本，随监听状态变化的文本按当前状态设置"""
+        get_text = self.language_manager.get_text
+        self.setWindowTitle(get_text("hotkey_dialog_title"))
+        self.instruction_label.setText(get_text("hotkey_dialog_instruction"))
+        self.current_title_label.setText(get_text("hotkey_dialog_current"))
+        self.current_label.setText(self.current_hotkey_text())
+        self.new_title_label.setText(get_text("hotkey_dialog_new"))
+        if self.new_hotkey:
+            self.new_label.setText(self.new_hotkey)
+        else:
+            self.new_label.setText(get_text("hotkey_dialog_press" if self.is_listening else "hotkey_dialog_waiting"))
+        self.listen_button.setText(get_text("hotkey_dialog_stop_listen" if self.is_listening else "hotkey_dialog_listen"))
+        self.cancel_button.setText(get_text("cancel_button"))
+        self.ok_button.setText(get_text("ok_button"))
 
     def toggle_listening(self):
         """切换热键监听状态"""
         self.is_listening = not self.is_listening
 
         if self.is_listening:
-            self.listen_button.setText("停止监听")
-            self.new_label.setText("请按下热键...")
+            self.listen_button.setText(self.language_manager.get_text("hotkey_dialog_stop_listen"))
+            self.new_label.setText(self.language_manager.get_text("hotkey_dialog_press"))
             self.grabKeyboard()  # 捕获键盘输入
             
-            # 启动鼠标监听器
-            self.mouse_listener = mouse.Listener(on_click=self.on_click)
-            self.mouse_listener.start()
+            # 订阅鼠标点击事件
+            self.mouse_subscription = self.input_hub.subscribe(MOUSE_CLICK, self.on_click)
         else:
-            self.listen_button.setText("开始监听")
+            self.listen_button.setText(self.language_manager.get_text("hotkey_dialog_listen"))
             self.releaseKeyboard()
             
-            # 停止鼠标监听器
-            if self.mouse_listener:
-                self.mouse_listener.stop()
+            # 取消订阅鼠标点击事件
+            if self.mouse_subscription is not None:
+                self.input_hub.unsubscribe(self.mouse_subscription)
+                self.mouse_subscription = None
 
     def on_click(self, x, y, button, pressed):
-        """鼠标点击事件处理"""
+        """鼠标点击事件处理，在监听线程中调用"""
         if not self.is_listening:
             return
         if pressed:
             if button == mouse.Button.middle:
-                self.new_hotkey = "mouse_middle"
-                self.new_label.setText("mouse_middle")
-                self.ok_button.setEnabled(True)
-                self.toggle_listening()
+                self.mouse_hotkey_captured.emit("mouse_middle")
+
+    def on_mouse_hotkey(self, hotkey):
+        """在GUI线程中应用捕获到的鼠标热键"""
+        if not self.is_listening:
+            return
+        self.new_hotkey = hotkey
+        self.new_label.setText(hotkey)
+        self.ok_button.setEnabled(True)
+        self.toggle_listening()
+
+    def done(self, result):
+        """对话框关闭（确定、取消或关闭窗口）时停止监听"""
+        if self.is_listening:
+            self.toggle_listening()
+        try:
+            self.language_manager.language_changed.disconnect(self.retranslate_ui)
+        except TypeError:
+            pass  # 已经断开（对话框被多次关闭）
+        super().done(result)
 
     def keyPressEvent(self, event):
         """键盘按下事件处理"""
@@ -135,7 +181,7 @@ class HotkeyDialog(QDialog):
     def current_hotkey_text(self):
         """获取当前热键的显示文本"""
         if not self.current_hotkey:
-            return "无"
+            return self.language_manager.get_text("hotkey_none")
         return self.current_hotkey
 
     def get_hotkey(self):
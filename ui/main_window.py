@@ -1,19 +1,44 @@
 import sys
 import os
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+import time
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                             QPushButton, QLabel, QSpinBox, QComboBox,
                             QSystemTrayIcon, QMenu, QAction, QGroupBox, 
-                            QRadioButton, QMessageBox, QApplication)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings
+                            QRadioButton, QMessageBox, QApplication, QInputDialog)
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QSettings
 from PyQt5.QtGui import QIcon, QKeySequence, QCursor
 
-from core.auto_clicker import AutoClickerThread
+from core.auto_clicker import AutoClickerThread, MacroPlaybackThread
+from core.click_backend import PynputBackend
+from core.click_scheduler import ClickScheduler
+from core.click_sequence import compile_sequence
+from core.engine_stats import cps_between
 from core.hotkey_manager import HotkeyManager
+from core.input_hub import InputHub
 from core.language_manager import LanguageManager
-from utils.constants import DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL, LANGUAGES
+from core.latency_trace import LatencyTrace, STAGE_ACTIVATE, STAGE_ENGINE, STAGE_CLICK
+from core.macro_recorder import MacroRecorder
+from core.process_engine import ProcessClickEngine
+from core.profile_store import ProfileStore
+from utils.constants import (DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL, LANGUAGES, JITTER_DISTRIBUTIONS,
+                             STATS_REFRESH_INTERVAL, ENGINE_MODE_PROCESS, HOTKEY_TOGGLE, HOTKEY_START,
+                             HOTKEY_STOP, HOTKEY_PAUSE, HOTKEY_SPEED_UP, HOTKEY_SPEED_DOWN, HOTKEY_MACRO_RECORD,
+                             HOTKEY_MACRO_PLAY, HOTKEY_CLICK_JOBS, HOTKEY_PROFILE_NEXT, SPEED_STEP_FACTOR, MACRO_FILE_NAME,
+                             LATENCY_TRACE_FILE_NAME, PROFILES_FILE_NAME, MIN_JITTER_PERCENT, MAX_JITTER_PERCENT)
 from utils.path_helper import resource_path
 
+# 点击引擎直接使用的配置项 -> 点击线程（或点击进程）的设置方法
+ENGINE_SETTERS = {
+    "click_interval": "set_interval",
+    "jitter_enabled": "set_jitter_enabled",
+    "jitter_percent": "set_jitter_percent",
+    "catch_up_policy": "set_catch_up_policy"
+}
+
 class MainWindow(QMainWindow):
+    # 配置文件被外部修改，由监视线程发出，在GUI线程中处理
+    config_file_changed = pyqtSignal()
+
     def __init__(self, config_manager):
         super().__init__()
 
@@ -26,11 +51,53 @@ class MainWindow(QMainWindow):
         # 初始化变量
         self.auto_clicker_thread = None
         self.is_clicking = False
+        self.is_paused = False
+        self.macro_recorder = None  # 首次按下录制热键时创建
+        self.macro_playback = None  # 正在进行的宏回放线程
+        self.click_scheduler = None  # 多任务点击调度器，首次开始点击任务时创建
+        self.click_job_ids = []      # 正在运行的点击任务编号
+        self.click_jobs_paused = False
         self.click_interval = self.config_manager.get_click_interval()
 
+        # 配置方案只读取索引，方案内容在第一次切换到它时才加载
+        self.profile_store = ProfileStore(os.path.join(self.config_manager.config_dir, PROFILES_FILE_NAME))
+
+        # 全局输入事件中心，热键、热键设置和宏录制共用同一组系统钩子
+        self.input_hub = InputHub()
+        self.input_hub.start()
+
+        # 热键到首次点击的各阶段延迟，托盘菜单中可查看汇总
+        self.latency_trace = LatencyTrace()
+        self.pending_trace = None  # (触发编号, 启动请求时间)，等待引擎统计中出现首次点击
+
         # 初始化热键管理器
-        self.hotkey_manager = HotkeyManager(self.config_manager.get_hotkey(), self.config_manager.get_hotkey_enabled())
-        self.hotkey_manager.hotkey_pressed.connect(self.toggle_clicking)
+        self.hotkey_manager = HotkeyManager(self.input_hub, self.config_manager.get_hotkey(),
+                                            self.config_manager.get_hotkey_enabled(),
+                                            self.config_manager.get_hotkey_bindings(),
+                                            self.latency_trace)
+        self.hotkey_manager.hotkey_triggered.connect(self.handle_hotkey_action)
+        self.hotkey_manager.watch_config(self.config_manager)
+        self.hotkey_actions = {
+            HOTKEY_TOGGLE: self.toggle_clicking,
+            HOTKEY_START: self.start_clicking,
+            HOTKEY_STOP: self.stop_clicking,
+            HOTKEY_PAUSE: self.toggle_pause,
+            HOTKEY_SPEED_UP: lambda: self.change_speed(1 / SPEED_STEP_FACTOR),
+            HOTKEY_SPEED_DOWN: lambda: self.change_speed(SPEED_STEP_FACTOR),
+            HOTKEY_PROFILE_NEXT: self.next_profile,
+            HOTKEY_MACRO_RECORD: self.toggle_macro_recording,
+            HOTKEY_MACRO_PLAY: self.toggle_macro_playback,
+            HOTKEY_CLICK_JOBS: self.toggle_click_jobs
+        }
+
+        # 预先创建常驻点击线程，启停时只切换其状态
+        self.start_click_worker()
+
+        # 运行统计以固定频率轮询引擎快照，而不是每次点击发送信号
+        self.last_stats = None
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(STATS_REFRESH_INTERVAL)
+        self.stats_timer.timeout.connect(self.refresh_stats)
 
         # 设置UI
         self.setup_ui()
@@ -39,11 +106,91 @@ class MainWindow(QMainWindow):
         self.setup_system_tray()
         self.setWindowIcon(QIcon(resource_path("resources/icon.png")))
 
+        # 订阅配置项的变更，修改设置时只通知用到该配置项的组件
+        self.connect_config()
+
+        # 配置文件被外部修改时无需重启，只应用发生变化的配置项
+        self.config_file_changed.connect(self.reload_config)
+        self.config_manager.start_watching(self.config_file_changed.emit)
+
+    def connect_config(self):
+        """订阅配置项的变更：点击引擎和界面各自只订阅用到的配置项，热键管理器自行订阅"""
+        subscribe = self.config_manager.subscribe
+        # 点击引擎
+        subscribe(tuple(ENGINE_SETTERS), self.apply_engine_config)
+        subscribe("jitter_distribution", self.on_jitter_distribution_changed)
+        subscribe("click_sequence", self.on_click_sequence_changed)
+        subscribe("macro_playback_speed", self.on_macro_playback_speed_changed)
+        subscribe("click_jobs", self.on_click_jobs_changed)
+        # 界面
+        subscribe("click_interval", self.on_interval_changed)
+        subscribe("jitter_enabled", self.on_jitter_enabled_changed)
+        subscribe("jitter_percent", lambda name, old, new: self.jitter_percent_spinbox.setValue(new))
+        subscribe("hotkey", lambda name, old, new: self.update_hotkey_label())
+        subscribe("hotkey_enabled", lambda name, old, new: self.update_tray_menu_info())
+        subscribe("language", self.on_language_changed)
+        subscribe("active_profile", lambda name, old, new: self.rebuild_profile_menu())
+        # 切换语言时原地更新界面文本
+        self.language_manager.language_changed.connect(self.retranslate_ui)
+
+    def reload_config(self):
+        """应用配置文件的外部修改，点击引擎、热键和界面经由配置变更通知更新"""
+        if self.config_manager.reload_config():
+            self.tray_icon.showMessage(
+                self.language_manager.get_text("app_title"),
+                self.language_manager.get_text("config_reloaded"),
+                QSystemTrayIcon.Information,
+                2000
+            )
+
+    def apply_engine_config(self, name, old, new):
+        """把点击引擎使用的配置项应用到常驻点击线程，新参数在下一个节拍生效"""
+        if self.auto_clicker_thread:
+            getattr(self.auto_clicker_thread, ENGINE_SETTERS[name])(new)
+
+    def on_jitter_distribution_changed(self, name, old, new):
+        """抖动分布变化：更新点击引擎和下拉框"""
+        if self.auto_clicker_thread:
+            self.auto_clicker_thread.set_jitter_distribution(new, self.config_manager.get_jitter_samples())
+        if new in JITTER_DISTRIBUTIONS:
+            self.jitter_distribution_combo.setCurrentIndex(JITTER_DISTRIBUTIONS.index(new))
+
+    def on_click_sequence_changed(self, name, old, new):
+        """点击序列变化：重新编译，在下一次开始点击时生效"""
+        if self.auto_clicker_thread:
+            self.auto_clicker_thread.set_sequence(self.load_click_sequence())
+
+    def on_interval_changed(self, name, old, new):
+        """点击间隔变化：同步输入框和托盘菜单中的间隔信息"""
+        self.click_interval = new
+        self.interval_spinbox.setValue(new)
+        self.update_tray_menu_info()
+
+    def on_jitter_enabled_changed(self, name, old, new):
+        """抖动开关变化：同步单选按钮和相关控件的可用状态"""
+        # 单选按钮处于自动互斥状态时不能被程序取消选中
+        self.jitter_checkbox.setAutoExclusive(False)
+        self.jitter_checkbox.setChecked(new)
+        self.jitter_checkbox.setAutoExclusive(True)
+        self.jitter_percent_spinbox.setEnabled(new)
+        self.jitter_distribution_combo.setEnabled(new)
+
+    def update_hotkey_label(self):
+        """更新当前热键标签"""
+        self.current_hotkey_label.setText(f"{self.language_manager.get_text('current_hotkey')}: {self.hotkey_manager.get_current_hotkey_text()}")
+
+    def on_language_changed(self, name, old, new):
+        """语言变化：切换语言管理器（界面经由 language_changed 信号原地更新）并同步语言下拉框"""
+        self.language_manager.set_language(new)
+        if new in LANGUAGES and self.language_combo.currentData() != new:
+            self.language_combo.setCurrentIndex(list(LANGUAGES).index(new))
+
     def setup_ui(self):
         """设置用户界面"""
         # 设置窗口属性
-        self.setWindowTitle(self.language_manager.get_text("app_title"))
-        self.setFixedSize(400, 400)
+        self.translated_texts = []  # (设置文本的方法, 文本键)，切换语言时按当前语言重新设置
+        self.set_translated_text(self.setWindowTitle, "app_title")
+        self.setFixedSize(400, 490)
         self.setWindowIcon(QIcon(resource_path("resources/icon.png")))
 
         # 创建中心部件
@@ -57,16 +204,34 @@ class MainWindow(QMainWindow):
         # 状态指示器
         status_layout = QHBoxLayout()
         self.status_label = QLabel(self.language_manager.get_text("status_inactive"))
-        status_layout.addWidget(QLabel(self.language_manager.get_text("status_label")))
+        status_layout.addWidget(self.translated(QLabel(), "status_label"))
         status_layout.addWidget(self.status_label)
         status_layout.addStretch()
         main_layout.addLayout(status_layout)
 
+        # 运行统计
+        stats_group = self.translated(QGroupBox(), "stats_group")
+        stats_layout = QGridLayout()
+        self.stats_cps_label = QLabel("-")
+        self.stats_clicks_label = QLabel("-")
+        self.stats_session_label = QLabel("-")
+        self.stats_drift_label = QLabel("-")
+        stats_layout.addWidget(self.translated(QLabel(), "stats_cps"), 0, 0)
+        stats_layout.addWidget(self.stats_cps_label, 0, 1)
+        stats_layout.addWidget(self.translated(QLabel(), "stats_clicks"), 0, 2)
+        stats_layout.addWidget(self.stats_clicks_label, 0, 3)
+        stats_layout.addWidget(self.translated(QLabel(), "stats_session"), 1, 0)
+        stats_layout.addWidget(self.stats_session_label, 1, 1)
+        stats_layout.addWidget(self.translated(QLabel(), "stats_drift"), 1, 2)
+        stats_layout.addWidget(self.stats_drift_label, 1, 3)
+        stats_group.setLayout(stats_layout)
+        main_layout.addWidget(stats_group)
+
         # 点击间隔设置
-        interval_group = QGroupBox(self.language_manager.get_text("interval_group"))
+        interval_group = self.translated(QGroupBox(), "interval_group")
         interval_layout = QHBoxLayout()
 
-        interval_layout.addWidget(QLabel(self.language_manager.get_text("interval_label")))
+        interval_layout.addWidget(self.translated(QLabel(), "interval_label"))
 
         self.interval_spinbox = QSpinBox()
         self.interval_spinbox.setMinimum(MIN_INTERVAL)
@@ -75,24 +240,24 @@ class MainWindow(QMainWindow):
         self.interval_spinbox.valueChanged.connect(self.update_interval)
         interval_layout.addWidget(self.interval_spinbox)
 
-        interval_layout.addWidget(QLabel(self.language_manager.get_text("ms_label")))
+        interval_layout.addWidget(self.translated(QLabel(), "ms_label"))
         interval_layout.addStretch()
 
         interval_group.setLayout(interval_layout)
         main_layout.addWidget(interval_group)
         
         # 随机抖动设置
-        jitter_group = QGroupBox(self.language_manager.get_text("jitter_group"))
+        jitter_group = self.translated(QGroupBox(), "jitter_group")
         jitter_layout = QVBoxLayout()
         
         # 随机抖动提示信息
-        jitter_tip = QLabel(self.language_manager.get_text("jitter_tip"))
+        jitter_tip = self.translated(QLabel(), "jitter_tip")
         jitter_tip.setWordWrap(True)
         jitter_layout.addWidget(jitter_tip)
         
         # 启用随机抖动选项
         jitter_check_layout = QHBoxLayout()
-        self.jitter_checkbox = QRadioButton(self.language_manager.get_text("jitter_enable"))
+        self.jitter_checkbox = self.translated(QRadioButton(), "jitter_enable")
         self.jitter_checkbox.setChecked(self.config_manager.get_jitter_enabled())
         self.jitter_checkbox.toggled.connect(self.toggle_jitter)
         jitter_check_layout.addWidget(self.jitter_checkbox)
@@ -101,35 +266,52 @@ class MainWindow(QMainWindow):
         
         # 抖动幅度设置
         jitter_percent_layout = QHBoxLayout()
-        jitter_percent_layout.addWidget(QLabel(self.language_manager.get_text("jitter_percent_label")))
+        jitter_percent_layout.addWidget(self.translated(QLabel(), "jitter_percent_label"))
         
         self.jitter_percent_spinbox = QSpinBox()
-        self.jitter_percent_spinbox.setMinimum(5)
-        self.jitter_percent_spinbox.setMaximum(50)
+        self.jitter_percent_spinbox.setMinimum(MIN_JITTER_PERCENT)
+        self.jitter_percent_spinbox.setMaximum(MAX_JITTER_PERCENT)
         self.jitter_percent_spinbox.setValue(self.config_manager.get_jitter_percent())
         self.jitter_percent_spinbox.valueChanged.connect(self.update_jitter_percent)
         self.jitter_percent_spinbox.setEnabled(self.config_manager.get_jitter_enabled())
         jitter_percent_layout.addWidget(self.jitter_percent_spinbox)
         
-        jitter_percent_layout.addWidget(QLabel(self.language_manager.get_text("percent_label")))
+        jitter_percent_layout.addWidget(self.translated(QLabel(), "percent_label"))
         jitter_percent_layout.addStretch()
         jitter_layout.addLayout(jitter_percent_layout)
+
+        # 抖动分布选择
+        jitter_distribution_layout = QHBoxLayout()
+        jitter_distribution_layout.addWidget(self.translated(QLabel(), "jitter_distribution_label"))
+
+        self.jitter_distribution_combo = QComboBox()
+        for distribution in JITTER_DISTRIBUTIONS:
+            self.jitter_distribution_combo.addItem(self.language_manager.get_text(f"jitter_{distribution}"), distribution)
+        current_distribution = self.config_manager.get_jitter_distribution()
+        if current_distribution in JITTER_DISTRIBUTIONS:
+            self.jitter_distribution_combo.setCurrentIndex(JITTER_DISTRIBUTIONS.index(current_distribution))
+        self.jitter_distribution_combo.currentIndexChanged.connect(self.change_jitter_distribution)
+        self.jitter_distribution_combo.setEnabled(self.config_manager.get_jitter_enabled())
+        jitter_distribution_layout.addWidget(self.jitter_distribution_combo)
+        jitter_distribution_layout.addStretch()
+        jitter_layout.addLayout(jitter_distribution_layout)
         
         jitter_group.setLayout(jitter_layout)
         main_layout.addWidget(jitter_group)
 
         # 热键设置
-        hotkey_group = QGroupBox(self.language_manager.get_text("hotkey_group"))
+        hotkey_group = self.translated(QGroupBox(), "hotkey_group")
         hotkey_layout = QVBoxLayout()
 
-        hotkey_info = QLabel(self.language_manager.get_text("hotkey_info"))
+        hotkey_info = self.translated(QLabel(), "hotkey_info")
         hotkey_info.setWordWrap(True)
         hotkey_layout.addWidget(hotkey_info)
 
-        self.current_hotkey_label = QLabel(f"{self.language_manager.get_text('current_hotkey')}: {self.hotkey_manager.get_current_hotkey_text()}")
+        self.current_hotkey_label = QLabel()
+        self.update_hotkey_label()
         hotkey_layout.addWidget(self.current_hotkey_label)
 
-        change_hotkey_button = QPushButton(self.language_manager.get_text("change_hotkey_button"))
+        change_hotkey_button = self.translated(QPushButton(), "change_hotkey_button")
         change_hotkey_button.clicked.connect(self.change_hotkey)
         hotkey_layout.addWidget(change_hotkey_button)
 
@@ -138,7 +320,7 @@ class MainWindow(QMainWindow):
 
         # 语言选择
         language_layout = QHBoxLayout()
-        language_layout.addWidget(QLabel(self.language_manager.get_text("language_label")))
+        language_layout.addWidget(self.translated(QLabel(), "language_label"))
 
         self.language_combo = QComboBox()
         for lang_code, lang_name in LANGUAGES.items():
@@ -160,7 +342,7 @@ class MainWindow(QMainWindow):
         self.start_stop_button.clicked.connect(self.toggle_clicking)
         button_layout.addWidget(self.start_stop_button)
         
-        exit_button = QPushButton(self.language_manager.get_text("exit"))
+        exit_button = self.translated(QPushButton(), "exit")
         exit_button.clicked.connect(self.close_application)
         button_layout.addWidget(exit_button)
 
@@ -168,10 +350,66 @@ class MainWindow(QMainWindow):
         main_layout.addStretch()
 
         # 底部信息
-        info_label = QLabel(self.language_manager.get_text("tray_info"))
+        info_label = self.translated(QLabel(), "tray_info")
         info_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(info_label)
 
+    def set_translated_text(self, setter, key):
+        """
+        按当前语言设置文本并登记，切换语言时 retranslate_ui() 重新设置
+
+        参数:
+            setter (callable): 设置文本的方法，如 QLabel.setText
+            key (str): 文本键
+        """
+        setter(self.language_manager.get_text(key))
+        self.translated_texts.append((setter, key))
+
+    def translated(self, widget, key):
+        """
+        设置控件的文本（分组框为标题）并登记，切换语言时重新设置
+
+        参数:
+            widget (QWidget): 控件
+            key (str): 文本键
+
+        返回:
+            QWidget: 控件本身，便于直接加入布局
+        """
+        self.set_translated_text(widget.setTitle if isinstance(widget, QGroupBox) else widget.setText, key)
+        return widget
+
+    def retranslate_ui(self, language_code=None):
+        """
+        语言切换后原地更新窗口、托盘菜单和状态文本，不重建控件
+
+        参数:
+            language_code (str): 新的语言代码，由 language_changed 信号传入
+        """
+        get_text = self.language_manager.get_text
+        for setter, key in self.translated_texts:
+            setter(get_text(key))
+        for index, distribution in enumerate(JITTER_DISTRIBUTIONS):
+            self.jitter_distribution_combo.setItemText(index, get_text(f"jitter_{distribution}"))
+        self.update_hotkey_label()
+        self.update_state_texts()
+        self.update_tray_menu_info()
+        self.rebuild_profile_menu()
+        # 点击期间托盘提示由 refresh_stats() 定期更新
+        if not self.is_clicking:
+            self.tray_icon.setToolTip(get_text("app_title"))
+
+    def update_state_texts(self):
+        """按当前点击状态设置状态标签和开始/停止按钮的文本"""
+        get_text = self.language_manager.get_text
+        if not self.is_clicking:
+            self.status_label.setText(get_text("status_inactive"))
+        else:
+            self.status_label.setText(get_text("status_paused" if self.is_paused else "status_active"))
+        button_text = get_text("stop_button" if self.is_clicking else "start_button")
+        self.start_stop_button.setText(button_text)
+        self.tray_action_toggle.setText(button_text)
+
     def setup_system_tray(self):
         """设置系统托盘"""
         self.tray_icon = QSystemTrayIcon(self)
@@ -180,18 +418,17 @@ class MainWindow(QMainWindow):
         # 创建托盘菜单
         self.tray_menu = QMenu()
 
-        # 状态信息（不可点击的标签）
-        self.tray_info_interval = QAction(f"点击间隔: {self.click_interval}ms")
+        # 状态信息（不可点击的标签），文本由 update_tray_menu_info() 设置
+        self.tray_info_interval = QAction()
         self.tray_info_interval.setEnabled(False)
         self.tray_menu.addAction(self.tray_info_interval)
         
-        self.tray_info_language = QAction(f"语言模式: {LANGUAGES[self.config_manager.get_language()]}")
+        self.tray_info_language = QAction()
         self.tray_info_language.setEnabled(False)
         self.tray_menu.addAction(self.tray_info_language)
 
         # 添加热键状态信息
-        hotkey_text = "已启用" if self.config_manager.get_hotkey_enabled() else "已禁用"
-        self.tray_info_hotkey = QAction(f"热键状态: {hotkey_text}")
+        self.tray_info_hotkey = QAction()
         self.tray_info_hotkey.setEnabled(False)
         self.tray_menu.addAction(self.tray_info_hotkey)
         
@@ -203,25 +440,35 @@ class MainWindow(QMainWindow):
         self.tray_menu.addAction(self.tray_action_toggle)
 
         # 添加热键启用/禁用菜单项
-        toggle_text = "禁用热键" if self.config_manager.get_hotkey_enabled() else "启用热键"
-        self.tray_action_toggle_hotkey = QAction(toggle_text)
+        self.tray_action_toggle_hotkey = QAction()
         self.tray_action_toggle_hotkey.triggered.connect(self.toggle_hotkey_enabled)
         self.tray_menu.addAction(self.tray_action_toggle_hotkey)
 
-        self.tray_action_show = QAction(self.language_manager.get_text("show_window"))
+        # 配置方案子菜单
+        self.tray_menu_profiles = QMenu()
+        self.tray_menu.addMenu(self.tray_menu_profiles)
+        self.rebuild_profile_menu()
+
+        self.tray_action_show = QAction()
         self.tray_action_show.triggered.connect(self.show_and_activate)
         self.tray_menu.addAction(self.tray_action_show)
         
-        self.tray_action_restart = QAction(self.language_manager.get_text("restart"))
+        self.tray_action_latency = QAction()
+        self.tray_action_latency.triggered.connect(self.show_latency_report)
+        self.tray_menu.addAction(self.tray_action_latency)
+
+        self.tray_action_restart = QAction()
         self.tray_action_restart.triggered.connect(self.restart_application)
         self.tray_menu.addAction(self.tray_action_restart)
 
         self.tray_menu.addSeparator()
 
-        self.tray_action_exit = QAction(self.language_manager.get_text("exit"))
+        self.tray_action_exit = QAction()
         self.tray_action_exit.triggered.connect(self.close_application)
         self.tray_menu.addAction(self.tray_action_exit)
+        self.update_tray_menu_info()
 
+        self.tray_icon.setToolTip(self.language_manager.get_text("app_title"))
         self.tray_icon.setContextMenu(self.tray_menu)
         self.tray_icon.activated.connect(self.tray_icon_activated)
         self.tray_icon.show()
@@ -245,21 +492,55 @@ class MainWindow(QMainWindow):
         self.activateWindow()  # 确保窗口获得焦点
         
     def update_tray_menu_info(self):
-        """更新托盘菜单中的状态信息"""
+        """按当前语言更新托盘菜单中的状态信息和菜单项文本"""
+        get_text = self.language_manager.get_text
+        hotkey_enabled = self.config_manager.get_hotkey_enabled()
         # 更新点击间隔信息
-        self.tray_info_interval.setText(f"点击间隔: {self.click_interval}ms")
+        self.tray_info_interval.setText(f"{get_text('tray_interval')}: {self.click_interval}ms")
         # 更新语言模式信息
-        self.tray_info_language.setText(f"语言模式: {LANGUAGES[self.config_manager.get_language()]}")
+        self.tray_info_language.setText(f"{get_text('tray_language')}: {LANGUAGES[self.config_manager.get_language()]}")
         # 更新热键状态信息
-        hotkey_text = "已启用" if self.hotkey_manager.is_enabled() else "已禁用"
-        self.tray_info_hotkey.setText(f"热键状态: {hotkey_text}")
+        hotkey_text = get_text("hotkey_state_enabled" if hotkey_enabled else "hotkey_state_disabled")
+        self.tray_info_hotkey.setText(f"{get_text('tray_hotkey_status')}: {hotkey_text}")
         # 更新热键开关菜单项的文本
-        toggle_text = "禁用热键" if self.hotkey_manager.is_enabled() else "启用热键"
-        self.tray_action_toggle_hotkey.setText(toggle_text)
+        self.tray_action_toggle_hotkey.setText(get_text("hotkey_disable" if hotkey_enabled else "hotkey_enable"))
         # 更新菜单项的文本
-        self.tray_action_show.setText(self.language_manager.get_text("show_window"))
-        self.tray_action_restart.setText(self.language_manager.get_text("restart"))
-        self.tray_action_exit.setText(self.language_manager.get_text("exit"))
+        self.tray_action_show.setText(get_text("show_window"))
+        self.tray_menu_profiles.setTitle(get_text("profiles"))
+        self.tray_action_latency.setText(get_text("latency_report"))
+        self.tray_action_restart.setText(get_text("restart"))
+        self.tray_action_exit.setText(get_text("exit"))
+
+    def handle_hotkey_action(self, action):
+        """
+        执行热键触发的动作
+
+        参数:
+            action (str): 动作名，见 HOTKEY_ACTIONS
+        """
+        handler = self.hotkey_actions.get(action)
+        if self.macro_playback is not None and action != HOTKEY_MACRO_PLAY:
+            # 宏回放期间只响应停止回放的热键
+            return
+        if handler:
+            # 信号送达时间和处理过程中的启动请求都记入本次触发
+            self.latency_trace.open()
+            try:
+                handler()
+            finally:
+                self.latency_trace.close()
+
+    def show_latency_report(self):
+        """显示热键延迟各阶段的分位数，并导出原始记录到配置目录"""
+        report = self.latency_trace.format_report()
+        if not report:
+            report = self.language_manager.get_text("latency_report_empty")
+        else:
+            path = os.path.join(self.config_manager.config_dir, LATENCY_TRACE_FILE_NAME)
+            if self.latency_trace.dump(path):
+                report += f"\n\n{path}"
+        QMessageBox.information(self, self.language_manager.get_text("latency_report"), report)
+
     def toggle_clicking(self):
         """切换自动点击状态"""
         if self.is_clicking:
@@ -267,11 +548,252 @@ class MainWindow(QMainWindow):
         else:
             self.start_clicking()
 
+    def toggle_pause(self):
+        """暂停或继续自动点击；没有在自动点击时暂停或继续点击任务"""
+        if not self.is_clicking:
+            if self.click_job_ids:
+                self.set_click_jobs_paused(not self.click_jobs_paused)
+            return
+        self.is_paused = not self.is_paused
+        if self.is_paused:
+            self.auto_clicker_thread.pause()
+            self.status_label.setText(self.language_manager.get_text("status_paused"))
+        else:
+            self.auto_clicker_thread.resume()
+            self.status_label.setText(self.language_manager.get_text("status_active"))
+
+    def change_speed(self, factor):
+        """
+        按倍数调整点击间隔，经由间隔输入框生效并保存
+
+        参数:
+            factor (float): 间隔的倍数，小于1表示加快
+        """
+        interval = int(round(self.click_interval * factor))
+        if interval == self.click_interval:
+            interval += 1 if factor > 1 else -1
+        self.interval_spinbox.setValue(max(MIN_INTERVAL, min(MAX_INTERVAL, interval)))
+
+    def rebuild_profile_menu(self):
+        """重建托盘菜单中的配置方案列表，当前方案前显示勾选标记"""
+        menu = self.tray_menu_profiles
+        menu.clear()
+        active = self.config_manager.get_active_profile()
+        names = self.profile_store.names()
+        for name in names:
+            action = menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == active)
+            action.triggered.connect(lambda checked, name=name: self.switch_profile(name))
+        if not names:
+            placeholder = menu.addAction(self.language_manager.get_text("profiles_empty"))
+            placeholder.setEnabled(False)
+        menu.addSeparator()
+        save_action = menu.addAction(self.language_manager.get_text("profile_save"))
+        save_action.triggered.connect(self.save_profile)
+
+    def switch_profile(self, name):
+        """
+        切换到配置方案，正在运行的点击引擎在下一个节拍按新参数点击，点击序列在下一次开始点击时生效
+
+        参数:
+            name (str): 方案名称
+        """
+        settings = self.profile_store.load(name)
+        if settings is None:
+            return
+        # 只有发生变化的设置项会通知点击引擎、热键管理器和界面
+        self.config_manager.apply_profile_settings(settings)
+        self.config_manager.set_active_profile(name)
+        self.tray_icon.showMessage(
+            self.language_manager.get_text("app_title"),
+            f"{self.language_manager.get_text('profile_switched')}: {name}",
+            QSystemTrayIcon.Information,
+            2000
+        )
+
+    def next_profile(self):
+        """切换到下一个配置方案"""
+        name = self.profile_store.next_name(self.config_manager.get_active_profile())
+        if name is not None:
+            self.switch_profile(name)
+
+    def save_profile(self):
+        """把当前设置保存为配置方案"""
+        name, ok = QInputDialog.getText(self, self.language_manager.get_text("profiles"),
+                                        self.language_manager.get_text("profile_name"),
+                                        text=self.config_manager.get_active_profile() or "")
+        name = name.strip()
+        if not ok or not name:
+            return
+        try:
+            self.profile_store.save(name, self.config_manager.get_profile_settings())
+        except Exception as e:
+            print(f"保存配置方案时出错: {e}")
+            return
+        self.config_manager.set_active_profile(name)
+        self.rebuild_profile_menu()  # 覆盖当前方案时名称不变，也不会收到变更通知
+
+    def toggle_macro_recording(self):
+        """开始或停止录制宏，停止时保存到配置目录；回放期间不录制"""
+        if self.macro_playback is not None:
+            return
+        if self.macro_recorder is None:
+            self.macro_recorder = MacroRecorder(self.input_hub)
+        if not self.macro_recorder.is_recording():
+            self.macro_recorder.start()
+            message = self.language_manager.get_text("macro_recording_started")
+        else:
+            self.macro_recorder.stop()
+            # 录制热键本身不应出现在宏中，否则回放时会再次触发录制
+            self.macro_recorder.trim_hotkey_inputs()
+            path = os.path.join(self.config_manager.config_dir, MACRO_FILE_NAME)
+            self.macro_recorder.save(path)
+            message = f"{self.language_manager.get_text('macro_saved')}: {path}"
+        self.tray_icon.showMessage(
+            self.language_manager.get_text("app_title"),
+            message,
+            QSystemTrayIcon.Information,
+            3000
+        )
+
+    def toggle_macro_playback(self):
+        """开始或停止回放配置目录下录制的宏，录制期间不回放"""
+        if self.macro_playback is not None:
+            self.macro_playback.stop()
+            return
+        if self.macro_recorder is not None and self.macro_recorder.is_recording():
+            return
+        path = os.path.join(self.config_manager.config_dir, MACRO_FILE_NAME)
+        try:
+            playback = MacroPlaybackThread(path, speed=self.config_manager.get_macro_playback_speed(),
+                                           backend=PynputBackend(self.input_hub.synthetic))
+        except FileNotFoundError:
+            message = self.language_manager.get_text("macro_missing")
+        except Exception as e:
+            print(f"打开宏文件时出错: {e}")
+            return
+        else:
+            self.macro_playback = playback
+            playback.finished_playback.connect(self.on_macro_playback_finished)
+            playback.start()
+            message = self.language_manager.get_text("macro_playback_started")
+        self.tray_icon.showMessage(
+            self.language_manager.get_text("app_title"),
+            message,
+            QSystemTrayIcon.Information,
+            3000
+        )
+
+    def on_macro_playback_finished(self, stats):
+        """宏回放结束（播放完毕或被停止）"""
+        if self.macro_playback is not None:
+            # 信号在 run() 返回前发出，等线程真正结束后再释放
+            self.macro_playback.wait()
+            self.macro_playback = None
+        self.tray_icon.showMessage(
+            self.language_manager.get_text("app_title"),
+            self.language_manager.get_text("macro_playback_finished"),
+            QSystemTrayIcon.Information,
+            2000
+        )
+
+    def on_macro_playback_speed_changed(self, name, old, new):
+        """回放速度修改后，正在进行的回放从当前位置起按新速度继续"""
+        if self.macro_playback is not None:
+            self.macro_playback.set_speed(new)
+
+    def stop_macro_playback(self):
+        """停止宏回放并等待回放线程结束"""
+        if self.macro_playback is not None:
+            self.macro_playback.stop()
+            self.macro_playback = None
+
+    def get_click_scheduler(self):
+        """获取多任务点击调度器，首次调用时创建并启动；没有任务时调度线程在条件变量上等待"""
+        if self.click_scheduler is None:
+            # 登记自身发出的点击，鼠标热键监听不会把它们当作用户输入
+            self.click_scheduler = ClickScheduler(PynputBackend(self.input_hub.synthetic))
+            self.click_scheduler.start()
+        return self.click_scheduler
+
+    def start_click_jobs(self):
+        """
+        按配置文件中的 click_jobs 创建点击任务，所有任务由同一个调度线程驱动
+
+        返回:
+            bool: 配置中有点击任务时返回True
+        """
+        jobs = self.config_manager.get_click_jobs()
+        if not jobs:
+            return False
+        scheduler = self.get_click_scheduler()
+        self.click_job_ids = [scheduler.add_job(job["interval"], job["button"],
+                                                tuple(job["position"]) if job["position"] else None)
+                              for job in jobs]
+        self.click_jobs_paused = False
+        return True
+
+    def stop_click_jobs(self):
+        """移除所有点击任务，调度线程保持空闲等待"""
+        for job_id in self.click_job_ids:
+            self.click_scheduler.remove_job(job_id)
+        self.click_job_ids = []
+        self.click_jobs_paused = False
+
+    def toggle_click_jobs(self):
+        """开始或停止配置文件中的点击任务"""
+        if self.click_job_ids:
+            self.stop_click_jobs()
+            message = self.language_manager.get_text("click_jobs_stopped")
+        elif self.start_click_jobs():
+            message = self.language_manager.get_text("click_jobs_started")
+        else:
+            message = self.language_manager.get_text("click_jobs_missing")
+        self.tray_icon.showMessage(
+            self.language_manager.get_text("app_title"),
+            message,
+            QSystemTrayIcon.Information,
+            2000
+        )
+
+    def set_click_jobs_paused(self, paused):
+        """
+        暂停或恢复所有点击任务，恢复后每个任务从当前时刻重新计时
+
+        参数:
+            paused (bool): 是否暂停
+        """
+        for job_id in self.click_job_ids:
+            if paused:
+                self.click_scheduler.pause_job(job_id)
+            else:
+                self.click_scheduler.resume_job(job_id)
+        self.click_jobs_paused = paused
+
+    def on_click_jobs_changed(self, name, old, new):
+        """任务列表修改后，正在运行的点击任务按新列表重新创建"""
+        if self.click_job_ids:
+            paused = self.click_jobs_paused
+            self.stop_click_jobs()
+            if self.start_click_jobs() and paused:
+                self.set_click_jobs_paused(True)
+
+    def stop_click_scheduler(self):
+        """停止多任务点击调度器"""
+        if self.click_scheduler:
+            self.click_scheduler.stop()
+            self.click_scheduler = None
+            self.click_job_ids = []
+
     def start_clicking(self):
         """开始自动点击"""
         if not self.is_clicking:
+            requested_at = time.perf_counter()
+
             # 更新状态
             self.is_clicking = True
+            self.is_paused = False
 
             # 更新UI
             self.status_label.setText(self.language_manager.get_text("status_active"))
@@ -279,20 +801,21 @@ class MainWindow(QMainWindow):
             self.tray_action_toggle.setText(self.language_manager.get_text("stop_button"))
             self.tray_icon.setIcon(QIcon(resource_path("resources/icon_active.png")))
 
-            # 创建并启动自动点击线程
-            self.auto_clicker_thread = AutoClickerThread(
-                self.click_interval,
-                self.config_manager.get_jitter_enabled(),
-                self.config_manager.get_jitter_percent()
-            )
-            # 不连接调试信号
-            self.auto_clicker_thread.start()
+            # 唤醒常驻点击线程
+            trace_id = self.latency_trace.mark(STAGE_ACTIVATE)
+            self.pending_trace = (trace_id, requested_at) if trace_id is not None else None
+            self.auto_clicker_thread.activate(requested_at)
+
+            # 开始轮询运行统计
+            self.last_stats = None
+            self.stats_timer.start()
 
     def stop_clicking(self):
         """停止自动点击"""
         if self.is_clicking:
             # 更新状态
             self.is_clicking = False
+            self.is_paused = False
 
             # 更新UI
             self.status_label.setText(self.language_manager.get_text("status_inactive"))
@@ -300,102 +823,157 @@ class MainWindow(QMainWindow):
             self.tray_action_toggle.setText(self.language_manager.get_text("start_button"))
             self.tray_icon.setIcon(QIcon(resource_path("resources/icon_inactive.png")))
 
-            # 停止自动点击线程
+            # 让点击线程回到空闲状态，停止前最后刷新一次统计
+            self.stats_timer.stop()
             if self.auto_clicker_thread:
-                self.auto_clicker_thread.stop()
-                self.auto_clicker_thread = None
+                self.refresh_stats()
+                self.auto_clicker_thread.deactivate()
+            self.pending_trace = None
+            self.tray_icon.setToolTip(self.language_manager.get_text("app_title"))
+
+    def start_click_worker(self):
+        """创建并启动常驻点击线程（或独立的点击进程），在空闲状态等待启动命令"""
+        options = dict(
+            jitter_distribution=self.config_manager.get_jitter_distribution(),
+            jitter_seed=self.config_manager.get_jitter_seed(),
+            jitter_samples=self.config_manager.get_jitter_samples(),
+            sequence=self.load_click_sequence()
+        )
+        # 登记自身发出的点击，鼠标热键监听不会把它们当作用户输入
+        if self.config_manager.get_engine_mode() == ENGINE_MODE_PROCESS:
+            engine_class = ProcessClickEngine
+            options["synthetic"] = self.input_hub.synthetic
+        else:
+            engine_class = AutoClickerThread
+            options["backend"] = PynputBackend(self.input_hub.synthetic)
+        self.auto_clicker_thread = engine_class(
+            self.click_interval,
+            self.config_manager.get_jitter_enabled(),
+            self.config_manager.get_jitter_percent(),
+            self.config_manager.get_catch_up_policy(),
+            **options
+        )
+        self.auto_clicker_thread.start()
+
+    def load_click_sequence(self):
+        """
+        编译配置中的点击序列
+
+        返回:
+            ClickSequence: 编译结果，未设置或无效时返回None（按点击间隔连续单击）
+        """
+        source = self.config_manager.get_click_sequence()
+        if not source:
+            return None
+        try:
+            return compile_sequence(source)
+        except ValueError as e:
+            print(f"点击序列无效: {e}")
+            return None
+
+    def stop_click_worker(self):
+        """结束常驻点击线程"""
+        if self.auto_clicker_thread:
+            self.auto_clicker_thread.stop()
+            self.auto_clicker_thread = None
+
+    def refresh_stats(self):
+        """刷新运行统计面板和托盘提示，由定时器以固定频率调用"""
+        if not self.auto_clicker_thread:
+            return
+
+        stats = self.auto_clicker_thread.get_stats()
+        if self.last_stats is not None:
+            cps = cps_between(self.last_stats, stats)
+        else:
+            cps = stats["average_cps"]
+        self.last_stats = stats
+        if self.pending_trace is not None:
+            self.complete_latency_trace(stats)
+
+        cps_text = f"{cps:.1f}"
+        clicks_text = str(stats["click_count"])
+        session_text = self.format_duration(stats["uptime"])
+        drift_text = f"{stats['mean_drift'] * 1000:.3f} ms (p99 {stats['drift']['p99'] * 1000:.3f} ms)"
+
+        self.stats_cps_label.setText(cps_text)
+        self.stats_clicks_label.setText(clicks_text)
+        self.stats_session_label.setText(session_text)
+        self.stats_drift_label.setText(drift_text)
+
+        self.tray_icon.setToolTip(
+            f"{self.language_manager.get_text('app_title')}\n"
+            f"{self.language_manager.get_text('stats_cps')}: {cps_text}\n"
+            f"{self.language_manager.get_text('stats_clicks')}: {clicks_text}\n"
+            f"{self.language_manager.get_text('stats_session')}: {session_text}"
+        )
+
+        # 点击序列执行完毕后引擎自行结束会话，同步界面状态
+        if self.is_clicking and not self.auto_clicker_thread.is_active():
+            self.stop_clicking()
+
+    def complete_latency_trace(self, stats):
+        """
+        用引擎统计补记本次启动的唤醒和首次点击时间，统计属于本次启动且已有首次点击时才记录
+
+        参数:
+            stats (dict): 引擎统计快照
+        """
+        trace_id, requested_at = self.pending_trace
+        if stats["start_time"] != requested_at or stats["start_latency"] is None:
+            return
+        if stats["wake_latency"] is not None:
+            self.latency_trace.mark(STAGE_ENGINE, requested_at + stats["wake_latency"], trace_id)
+        self.latency_trace.mark(STAGE_CLICK, requested_at + stats["start_latency"], trace_id)
+        self.pending_trace = None
+
+    def format_duration(self, seconds):
+        """将秒数格式化为 H:MM:SS"""
+        seconds = int(seconds)
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
 
     def update_interval(self, value):
-        """更新点击间隔"""
-        self.click_interval = value
+        """更新点击间隔，点击引擎、托盘菜单和配置文件经由配置变更通知更新"""
         self.config_manager.set_click_interval(value)
-        # 立即保存配置到磁盘，确保点击间隔设置被记住
-        self.config_manager.save_config()
-
-        # 如果正在点击，更新线程的点击间隔
-        if self.is_clicking and self.auto_clicker_thread:
-            self.auto_clicker_thread.set_interval(value)
-            
-        # 更新托盘菜单中的间隔信息
-        self.update_tray_menu_info()
 
     def toggle_jitter(self, enabled):
         """启用或禁用随机抖动"""
         self.config_manager.set_jitter_enabled(enabled)
-        # 立即保存配置到磁盘
-        self.config_manager.save_config()
-        
-        # 更新UI状态
-        self.jitter_percent_spinbox.setEnabled(enabled)
-        
-        # 如果正在点击，更新线程的抖动设置
-        if self.is_clicking and self.auto_clicker_thread:
-            self.auto_clicker_thread.set_jitter_enabled(enabled)
-            
+
     def update_jitter_percent(self, value):
         """更新随机抖动幅度"""
         self.config_manager.set_jitter_percent(value)
-        # 立即保存配置到磁盘
-        self.config_manager.save_config()
-        
-        # 如果正在点击，更新线程的抖动幅度
-        if self.is_clicking and self.auto_clicker_thread:
-            self.auto_clicker_thread.set_jitter_percent(value)
-            
-    def change_language(self, index):
-        """更改界面语言"""
-        language_code = self.language_combo.itemData(index)
-        self.config_manager.set_language(language_code)
-        # 立即保存配置到磁盘，确保语言设置被记住
-        self.config_manager.save_config()
-        
-        # 更新托盘菜单中的语言信息
-        self.update_tray_menu_info()
 
-        # 显示需要重启应用程序的提示
-        QMessageBox.information(
-            self,
-            self.language_manager.get_text("language_changed_title"),
-            self.language_manager.get_text("language_changed_message")
-        )
+    def change_jitter_distribution(self, index):
+        """更改随机抖动分布"""
+        self.config_manager.set_jitter_distribution(self.jitter_distribution_combo.itemData(index))
+
+    def change_language(self, index):
+        """更改界面语言，立即生效"""
+        self.config_manager.set_language(self.language_combo.itemData(index))
 
     def change_hotkey(self):
         """更改热键"""
         # 显示热键设置对话框（简化版，实际应用中可能需要更复杂的对话框）
         from ui.hotkey_dialog import HotkeyDialog
-        dialog = HotkeyDialog(self.hotkey_manager.get_current_hotkey(), self)
+        dialog = HotkeyDialog(self.input_hub, self.language_manager, self.hotkey_manager.get_current_hotkey(), self)
         if dialog.exec_():
             new_hotkey = dialog.get_hotkey()
             if new_hotkey:
-                # 更新热键
-                self.hotkey_manager.set_hotkey(new_hotkey)
-                self.current_hotkey_label.setText(f"{self.language_manager.get_text('current_hotkey')}: {self.hotkey_manager.get_current_hotkey_text()}")
+                # 热键管理器和当前热键标签经由配置变更通知更新
                 self.config_manager.set_hotkey(new_hotkey)
-                # 立即保存配置到磁盘，确保热键设置被记住
-                self.config_manager.save_config()
 
 
     def toggle_hotkey_enabled(self):
         """切换热键启用/禁用状态"""
-        # 获取当前状态并切换
-        current_state = self.hotkey_manager.is_enabled()
-        new_state = not current_state
-
-        # 更新热键管理器状态
-        self.hotkey_manager.set_enabled(new_state)
-
-        # 更新配置
+        # 获取当前状态并切换，热键管理器和托盘菜单经由配置变更通知更新
+        new_state = not self.hotkey_manager.is_enabled()
         self.config_manager.set_hotkey_enabled(new_state)
-        self.config_manager.save_config()
-
-        # 更新托盘菜单信息
-        self.update_tray_menu_info()
 
         # 显示状态变更提示
-        status_text = "启用" if new_state else "禁用"
         self.tray_icon.showMessage(
             self.language_manager.get_text("app_title"),
-            f"热键已{status_text}",
+            self.language_manager.get_text("hotkey_turned_on" if new_state else "hotkey_turned_off"),
             QSystemTrayIcon.Information,
             3000
         )
@@ -423,12 +1001,20 @@ class MainWindow(QMainWindow):
         # 停止自动点击
         if self.is_clicking:
             self.stop_clicking()
+        self.stop_click_worker()
+        self.stop_click_scheduler()
+        if self.macro_recorder:
+            self.macro_recorder.stop()
+        self.stop_macro_playback()
 
-        # 移除热键监听器
+        # 移除热键监听器并卸载系统钩子
         self.hotkey_manager.unregister_hotkey()
+        self.input_hub.stop()
 
-        # 保存配置
+        # 保存配置，并等待尚未写入的配置写入磁盘
+        self.config_manager.stop_watching()
         self.config_manager.save_config()
+        self.config_manager.flush_config()
 
         # 确保托盘图标被移除
         self.tray_icon.setVisible(False)
@@ -441,15 +1027,21 @@ class MainWindow(QMainWindow):
         
     def restart_application(self):
         """重新启动应用程序"""
-        # 保存当前的配置
+        # 保存当前的配置，os.execl 不会执行 atexit，因此需要立即写入
+        self.config_manager.stop_watching()
         self.config_manager.save_config()
+        self.config_manager.flush_config()
         
         # 停止点击（如果正在进行）
         if self.is_clicking:
             self.stop_clicking()
+        self.stop_click_worker()
+        self.stop_click_scheduler()
+        self.stop_macro_playback()
             
-        # 移除热键监听器
+        # 移除热键监听器并卸载系统钩子
         self.hotkey_manager.unregister_hotkey()
+        self.input_hub.stop()
         
         # 移除托盘图标
         self.tray_icon.setVisible(False)
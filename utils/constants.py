@@ -1,15 +1,97 @@
 
 # 点击间隔设置
 DEFAULT_INTERVAL = 1000  # 默认间隔：1000毫秒（1秒）
-MIN_INTERVAL = 50       # 最小间隔：50毫秒
+MIN_INTERVAL = 1        # 最小间隔：1毫秒（由绝对截止时间定时引擎保证精度）
 MAX_INTERVAL = 60000    # 最大间隔：60000毫秒（60秒）
 
+# 定时引擎设置
+SPIN_THRESHOLD = 0.001  # 距离截止时间不足1毫秒时改为忙等待，避免sleep的调度误差
+MAX_CATCH_UP_CLICKS = 5  # 补点策略下允许连续补发的最大点击数
+
+# 落后时的处理策略
+CATCH_UP_SKIP = "skip"    # 跳过错过的点击，对齐到下一个节拍
+CATCH_UP_BURST = "burst"  # 立即补发错过的点击（有上限）
+CATCH_UP_RESET = "reset"  # 从当前时刻重新计时
+CATCH_UP_POLICIES = (CATCH_UP_SKIP, CATCH_UP_BURST, CATCH_UP_RESET)
+DEFAULT_CATCH_UP_POLICY = CATCH_UP_SKIP
+
+# 统计直方图设置
+HISTOGRAM_SUB_BITS = 5        # 每个2的幂区间分为32个桶，相对误差约3%
+HISTOGRAM_MAX_EXPONENT = 31   # 可记录到约2^36微秒（约19小时），更大的值计入最后一个桶
+
+# 界面统计刷新间隔：200毫秒（5Hz），与点击速率无关
+STATS_REFRESH_INTERVAL = 200
+
+# 配置保存：保存请求在该时间（秒）内合并为一次后台写入
+CONFIG_SAVE_DELAY = 0.5
+CONFIG_CACHE_FILE_NAME = "config.cache.json"  # 配置文件的JSON缓存，启动时YAML未修改则直接读取
+# 配置文件热重载：文件停止变化该时间（秒）后才重新读取；不支持 inotify 时按该间隔（秒）检查文件
+CONFIG_WATCH_DEBOUNCE = 0.3
+CONFIG_WATCH_POLL_INTERVAL = 1.0
+
+# 点击引擎运行方式
+ENGINE_MODE_THREAD = "thread"    # 在GUI进程的线程中运行
+ENGINE_MODE_PROCESS = "process"  # 在独立进程中运行，通过共享内存控制块通信
+ENGINE_MODES = (ENGINE_MODE_THREAD, ENGINE_MODE_PROCESS)
+DEFAULT_ENGINE_MODE = ENGINE_MODE_THREAD
+PROCESS_STATS_PUBLISH_INTERVAL = 0.1  # 子进程向控制块发布统计的间隔（秒）
+PROCESS_PARENT_CHECK_INTERVAL = 1.0   # 子进程检查父进程是否存活的间隔（秒）
+
+# 宏录制设置
+MACRO_MOVE_INTERVAL = 1 / 60.0  # 鼠标移动降采样：最多每秒记录60次
+MIN_PLAYBACK_SPEED = 0.1        # 宏回放最低速度倍率
+MAX_PLAYBACK_SPEED = 10.0       # 宏回放最高速度倍率
+DEFAULT_PLAYBACK_SPEED = 1.0    # 宏回放默认速度倍率
+
+# 点击后端设置
+CLICK_BUTTONS = ("left", "right", "middle")  # 支持的鼠标按钮
+RECORDING_CAPACITY = 1000000  # 记录后端预分配的事件数
+
+# 点击序列设置
+DEFAULT_CLICK_SEQUENCE = ""  # 为空时按点击间隔连续单击左键
+MAX_SEQUENCE_DEPTH = 8       # repeat 最大嵌套层数
+
 # 随机抖动设置
 DEFAULT_JITTER_ENABLED = False  # 默认不启用随机抖动
 DEFAULT_JITTER_PERCENT = 20    # 默认抖动幅度：20%
+MIN_JITTER_PERCENT = 5         # 最小抖动幅度：5%
+MAX_JITTER_PERCENT = 50        # 最大抖动幅度：50%
+JITTER_BLOCK_SIZE = 1024       # 每次批量预生成的抖动因子数
+
+# 抖动分布
+JITTER_UNIFORM = "uniform"      # 均匀分布
+JITTER_GAUSSIAN = "gaussian"    # 正态分布
+JITTER_LOGNORMAL = "lognormal"  # 对数正态分布
+JITTER_EMPIRICAL = "empirical"  # 录制的真人点击间隔
+JITTER_DISTRIBUTIONS = (JITTER_UNIFORM, JITTER_GAUSSIAN, JITTER_LOGNORMAL, JITTER_EMPIRICAL)
+DEFAULT_JITTER_DISTRIBUTION = JITTER_UNIFORM
 
 # 热键设置
-DEFAULT_HOTKEY = "F6"   # 默认热键
+DEFAULT_HOTKEY = "F6"   # 默认热键（切换开始/停止）
+
+# 热键动作
+HOTKEY_TOGGLE = "toggle"              # 切换开始/停止
+HOTKEY_START = "start"                # 开始点击
+HOTKEY_STOP = "stop"                  # 停止点击
+HOTKEY_PAUSE = "pause"                # 暂停/继续
+HOTKEY_SPEED_UP = "speed_up"          # 加快点击
+HOTKEY_SPEED_DOWN = "speed_down"      # 减慢点击
+HOTKEY_PROFILE_NEXT = "profile_next"  # 切换到下一个配置方案
+HOTKEY_MACRO_RECORD = "macro_record"  # 开始/停止录制宏
+HOTKEY_MACRO_PLAY = "macro_play"      # 开始/停止回放录制的宏
+HOTKEY_CLICK_JOBS = "click_jobs"      # 开始/停止配置文件中的多个点击任务
+HOTKEY_ACTIONS = (HOTKEY_TOGGLE, HOTKEY_START, HOTKEY_STOP, HOTKEY_PAUSE, HOTKEY_SPEED_UP,
+                  HOTKEY_SPEED_DOWN, HOTKEY_PROFILE_NEXT, HOTKEY_MACRO_RECORD, HOTKEY_MACRO_PLAY,
+                  HOTKEY_CLICK_JOBS)
+SYNTHETIC_EVENT_WINDOW = 0.5  # 自身发出的点击在该时间（秒）内未被钩子收到则不再过滤
+SPEED_STEP_FACTOR = 1.25  # 加快/减慢热键每次调整点击间隔的倍数
+MACRO_FILE_NAME = "macro.bin"  # 热键录制的宏保存在配置目录下的该文件中
+PROFILES_FILE_NAME = "profiles.jsonl"  # 配置方案保存在配置目录下的该文件中
+# 配置方案包含的设置项，点击按钮和坐标由点击序列描述
+PROFILE_FIELDS = ("click_interval", "click_sequence", "jitter_enabled", "jitter_percent", "jitter_distribution",
+                  "catch_up_policy", "hotkey", "hotkey_bindings")
+LATENCY_TRACE_CAPACITY = 256  # 热键延迟追踪保留最近的触发次数
+LATENCY_TRACE_FILE_NAME = "latency_trace.json"  # 延迟统计导出到配置目录下的该文件中
 
 # 语言设置
 DEFAULT_LANGUAGE = "zh_CN"  # 默认语言：中文
@@ -30,6 +112,14 @@ TRANSLATIONS = {
         "status_label": "状态:",
         "status_active": "活跃 - 正在点击",
         "status_inactive": "非活跃 - 已停止",
+        "status_paused": "已暂停",
+
+        # 运行统计相关
+        "stats_group": "运行统计",
+        "stats_cps": "实际CPS",
+        "stats_clicks": "点击次数",
+        "stats_session": "运行时间",
+        "stats_drift": "漂移",
 
         # 间隔设置相关
         "interval_group": "点击间隔设置",
@@ -42,17 +132,31 @@ TRANSLATIONS = {
         "jitter_percent_label": "抖动幅度:",
         "percent_label": "%",
         "jitter_tip": "启用随机抖动可以使点击间隔在设定值附近随机变化，更像真人操作",
+        "jitter_distribution_label": "抖动分布:",
+        "jitter_uniform": "均匀分布",
+        "jitter_gaussian": "正态分布",
+        "jitter_lognormal": "对数正态分布",
+        "jitter_empirical": "录制的真人间隔",
 
         # 热键相关
         "hotkey_group": "热键设置",
         "hotkey_info": "您可以使用热键来切换自动点击的开启/关闭状态，即使在应用程序最小化时也能生效。",
         "current_hotkey": "当前热键",
         "change_hotkey_button": "更改热键",
+        "hotkey_dialog_title": "设置热键",
+        "hotkey_dialog_instruction": "请按下您想要设置的热键组合。支持单个按键、组合键和鼠标侧键。",
+        "hotkey_dialog_current": "当前热键:",
+        "hotkey_dialog_new": "新热键:",
+        "hotkey_dialog_waiting": "等待输入...",
+        "hotkey_dialog_press": "请按下热键...",
+        "hotkey_dialog_listen": "开始监听",
+        "hotkey_dialog_stop_listen": "停止监听",
+        "hotkey_none": "无",
+        "ok_button": "确定",
+        "cancel_button": "取消",
 
         # 语言相关
         "language_label": "界面语言:",
-        "language_changed_title": "语言已更改",
-        "language_changed_message": "语言设置已更改，重启应用程序后生效。",
 
         # 按钮相关
         "start_button": "开始点击",
@@ -61,7 +165,32 @@ TRANSLATIONS = {
         # 系统托盘相关
         "tray_info": "应用程序将在最小化时继续在系统托盘运行",
         "show_window": "显示主窗口",
+        "tray_interval": "点击间隔",
+        "tray_language": "语言模式",
+        "tray_hotkey_status": "热键状态",
+        "hotkey_state_enabled": "已启用",
+        "hotkey_state_disabled": "已禁用",
+        "hotkey_enable": "启用热键",
+        "hotkey_disable": "禁用热键",
+        "hotkey_turned_on": "热键已启用",
+        "hotkey_turned_off": "热键已禁用",
         "minimized_to_tray": "自动点击器已最小化到系统托盘",
+        "macro_recording_started": "开始录制宏，再次按下录制热键停止",
+        "macro_saved": "宏已保存",
+        "macro_playback_started": "开始回放宏，再次按下回放热键停止",
+        "macro_playback_finished": "宏回放结束",
+        "macro_missing": "还没有录制的宏",
+        "click_jobs_started": "点击任务已开始",
+        "click_jobs_stopped": "点击任务已停止",
+        "click_jobs_missing": "配置文件中没有点击任务（click_jobs）",
+        "latency_report": "热键延迟统计",
+        "latency_report_empty": "尚无热键触发记录",
+        "profiles": "配置方案",
+        "profiles_empty": "尚无配置方案",
+        "profile_save": "保存当前设置为方案...",
+        "profile_name": "方案名称:",
+        "profile_switched": "已切换到配置方案",
+        "config_reloaded": "配置文件已修改，新设置已生效",
         "restart": "重新启动",
         "exit": "退出"
     },
@@ -73,6 +202,14 @@ TRANSLATIONS = {
         "status_label": "Status:",
         "status_active": "Active - Clicking",
         "status_inactive": "Inactive - Stopped",
+        "status_paused": "Paused",
+
+        # 运行统计相关
+        "stats_group": "Statistics",
+        "stats_cps": "Actual CPS",
+        "stats_clicks": "Clicks",
+        "stats_session": "Session",
+        "stats_drift": "Drift",
 
         # 间隔设置相关
         "interval_group": "Click Interval Settings",
@@ -85,17 +222,31 @@ TRANSLATIONS = {
         "jitter_percent_label": "Jitter Amount:",
         "percent_label": "%",
         "jitter_tip": "Enabling random jitter makes click intervals vary randomly around the set value, more like human operation",
+        "jitter_distribution_label": "Distribution:",
+        "jitter_uniform": "Uniform",
+        "jitter_gaussian": "Gaussian",
+        "jitter_lognormal": "Log-normal",
+        "jitter_empirical": "Recorded human intervals",
 
         # 热键相关
         "hotkey_group": "Hotkey Settings",
         "hotkey_info": "You can use a hotkey to toggle auto-clicking on/off, even when the application is minimized.",
         "current_hotkey": "Current Hotkey",
         "change_hotkey_button": "Change Hotkey",
+        "hotkey_dialog_title": "Set Hotkey",
+        "hotkey_dialog_instruction": "Press the hotkey combination you want to use. Single keys, key combinations and mouse side buttons are supported.",
+        "hotkey_dialog_current": "Current hotkey:",
+        "hotkey_dialog_new": "New hotkey:",
+        "hotkey_dialog_waiting": "Waiting for input...",
+        "hotkey_dialog_press": "Press a hotkey...",
+        "hotkey_dialog_listen": "Start Listening",
+        "hotkey_dialog_stop_listen": "Stop Listening",
+        "hotkey_none": "None",
+        "ok_button": "OK",
+        "cancel_button": "Cancel",
 
         # 语言相关
         "language_label": "Interface Language:",
-        "language_changed_title": "Language Changed",
-        "language_changed_message": "Language setting has been changed. It will take effect after restarting the application.",
 
         # 按钮相关
         "start_button": "Start Clicking",
@@ -104,7 +255,32 @@ TRANSLATIONS = {
         # 系统托盘相关
         "tray_info": "The application will continue running in the system tray when minimized",
         "show_window": "Show Main Window",
+        "tray_interval": "Click Interval",
+        "tray_language": "Language",
+        "tray_hotkey_status": "Hotkey Status",
+        "hotkey_state_enabled": "Enabled",
+        "hotkey_state_disabled": "Disabled",
+        "hotkey_enable": "Enable Hotkey",
+        "hotkey_disable": "Disable Hotkey",
+        "hotkey_turned_on": "Hotkey enabled",
+        "hotkey_turned_off": "Hotkey disabled",
         "minimized_to_tray": "Auto Clicker has been minimized to the system tray",
+        "macro_recording_started": "Macro recording started, press the record hotkey again to stop",
+        "macro_saved": "Macro saved",
+        "macro_playback_started": "Macro playback started, press the playback hotkey again to stop",
+        "macro_playback_finished": "Macro playback finished",
+        "macro_missing": "No macro has been recorded yet",
+        "click_jobs_started": "Click jobs started",
+        "click_jobs_stopped": "Click jobs stopped",
+        "click_jobs_missing": "No click jobs (click_jobs) in the configuration file",
+        "latency_report": "Hotkey Latency",
+        "latency_report_empty": "No hotkey triggers recorded yet",
+        "profiles": "Profiles",
+        "profiles_empty": "No profiles yet",
+        "profile_save": "Save Current Settings as Profile...",
+        "profile_name": "Profile name:",
+        "profile_switched": "Switched to profile",
+        "config_reloaded": "Config file changed, new settings applied",
         "restart": "Restart",
         "exit": "Exit"
     }